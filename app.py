@@ -2,15 +2,37 @@ import customtkinter as ctk
 import tkinter as tk
 import threading
 import time
-import uvicorn
+import queue
 from typing import Dict, Any
 
 from gui_client import api_client
-from local_llm_backend.main import app as fastapi_app
+
+BACKEND_READY_TIMEOUT = 30.0 # Seconds to wait for the backend before loading data anyway
+
+backend_server = None # Created on the backend thread, so the window can appear while the backend loads
+backend_exited = False
 
 def run_backend():
-    """Runs the FastAPI backend in a uvicorn server."""
-    uvicorn.run(fastapi_app, host="127.0.0.1", port=8000)
+    """Imports the FastAPI backend and runs it in a uvicorn server."""
+    global backend_server, backend_exited
+    import uvicorn
+    from local_llm_backend.main import app
+    backend_server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=8000))
+    try:
+        backend_server.run()
+    finally:
+        backend_exited = True # uvicorn exits the thread if it cannot bind, e.g. the port is taken
+
+def backend_listening() -> bool:
+    # uvicorn sets `started` after startup has run and the socket is bound
+    return backend_server is not None and backend_server.started
+
+def backend_is_ready() -> bool:
+    """True once our server is listening and answers GET /ready, the same probe external monitors use."""
+    return backend_listening() and api_client.is_ready()
+
+def backend_failed() -> bool:
+    return backend_exited and not backend_listening()
 
 class MinerManagerWindow(ctk.CTkToplevel):
     def __init__(self, master):
@@ -60,12 +82,17 @@ class MinerManagerWindow(ctk.CTkToplevel):
             except (ValueError, TypeError): new_data['device'] = None
         else:
             new_data['device'] = None
-        full_config = self.master_app.config.copy()
         if selected_name == "Add New Miner":
-            full_config.get('miners', []).append(new_data)
+            updated_config = api_client.patch_config([{"op": "add", "path": "/miners/-", "value": new_data}])
         else:
-            full_config['miners'] = [new_data if m['name'] == selected_name else m for m in full_config.get('miners', [])]
-        updated_config = api_client.update_config(full_config)
+            # Only the fields that changed are sent
+            current = next((m for m in self.master_app.config.get('miners', []) if m['name'] == selected_name), {})
+            operations = [{"op": "add", "path": f"/{field}", "value": value} for field, value in new_data.items() if current.get(field) != value]
+            updated_miner = api_client.patch_miner_config(selected_name, operations) if operations else None
+            updated_config = None
+            if updated_miner:
+                updated_config = dict(self.master_app.config)
+                updated_config['miners'] = [updated_miner if m['name'] == selected_name else m for m in updated_config.get('miners', [])]
         if updated_config:
             self.master_app.config = updated_config
             self.refresh_selectors()
@@ -73,9 +100,15 @@ class MinerManagerWindow(ctk.CTkToplevel):
     def delete_miner(self):
         selected_name = self.miner_selector.get()
         if selected_name != "Add New Miner":
-            full_config = self.master_app.config.copy()
-            full_config['miners'] = [m for m in full_config.get('miners', []) if m['name'] != selected_name]
-            updated_config = api_client.update_config(full_config)
+            miners = self.master_app.config.get('miners', [])
+            index = next((i for i, m in enumerate(miners) if m['name'] == selected_name), None)
+            if index is None:
+                return
+            # The test op makes the removal fail (409) rather than delete the wrong miner if the list changed meanwhile
+            updated_config = api_client.patch_config([
+                {"op": "test", "path": f"/miners/{index}/name", "value": selected_name},
+                {"op": "remove", "path": f"/miners/{index}"},
+            ])
             if updated_config:
                 self.master_app.config = updated_config
                 self.refresh_selectors()
@@ -93,7 +126,7 @@ class MinerManagerWindow(ctk.CTkToplevel):
         self.destroy()
 
 class LocalLLMApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, backend_ready=None, backend_failed=None):
         super().__init__()
         self.title("Local LLM Controller")
         self.geometry("1000x600")
@@ -101,6 +134,12 @@ class LocalLLMApp(ctk.CTk):
         self.grid_rowconfigure(0, weight=1)
         self.config: Dict[str, Any] = {}
         self.miner_widgets = {}
+        self.miner_statuses: Dict[str, str] = {}
+        self.widget_state: Dict[Any, Any] = {} # Last value applied to each live widget
+        self.event_queue: queue.Queue = queue.Queue()
+        self.event_listener_stop = None
+        self.llm_stream = None
+        self.llm_stop_requested = False
         self.miner_manager_window = None
         self.tab_view = ctk.CTkTabview(self)
         self.tab_view.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
@@ -108,7 +147,22 @@ class LocalLLMApp(ctk.CTk):
         self.create_ai_tab(self.tab_view.tab("AI"))
         self.create_crypto_tab(self.tab_view.tab("Crypto"))
         self.create_dashboard_tab(self.tab_view.tab("Dashboard"))
-        self.load_initial_data()
+        self.wait_for_backend(backend_ready, backend_failed, time.monotonic() + BACKEND_READY_TIMEOUT)
+
+    def wait_for_backend(self, backend_ready, backend_failed, deadline: float):
+        """Polls `backend_ready()` from the Tk loop, so the window is drawn and responsive while the backend starts."""
+        if backend_ready is None or backend_ready():
+            self.load_initial_data()
+        elif backend_failed is not None and backend_failed():
+            # Whatever holds the port is not this backend, so don't load its config or stream its events
+            print("Error: backend failed to start (is port 8000 already in use?).")
+            self.config = {"miners": [], "llm": {"provider": "unknown"}}
+            self.refresh_miner_list()
+        elif time.monotonic() > deadline:
+            print(f"Warning: backend not ready after {BACKEND_READY_TIMEOUT:.0f}s; loading anyway.")
+            self.load_initial_data()
+        else:
+            self.after(20, self.wait_for_backend, backend_ready, backend_failed, deadline)
 
     def load_initial_data(self):
         self.config = api_client.get_config()
@@ -117,8 +171,42 @@ class LocalLLMApp(ctk.CTk):
             self.config = {"miners": [], "llm": {"provider": "unknown"}}
         self.refresh_miner_list()
         self.refresh_recipe_list()
-        self.update_dashboard()
-        self.update_crypto_tab()
+        # Backend pushes stat/status deltas; the listener thread only queues them, Tk applies them
+        self.event_listener_stop = api_client.start_event_listener(lambda name, data: self.event_queue.put((name, data)))
+        self.process_backend_events()
+
+    def process_backend_events(self):
+        # Tokens queued since the last pass are inserted in one batch
+        pending_tokens = []
+        try:
+            while True:
+                name, data = self.event_queue.get_nowait()
+                if name == "system_stats":
+                    self.update_dashboard(data)
+                elif name == "miner_status":
+                    self.update_crypto_tab(data)
+                elif name == "llm_token":
+                    pending_tokens.append(data)
+                elif name == "llm_done":
+                    if pending_tokens:
+                        self.append_output_text("".join(pending_tokens)); pending_tokens = []
+                    self.finish_llm_call(data)
+        except queue.Empty:
+            pass
+        if pending_tokens:
+            self.append_output_text("".join(pending_tokens))
+        self.after(100, self.process_backend_events)
+
+    def set_if_changed(self, widget, value, **configure_kwargs):
+        """Applies a progress value or configure() options only when they differ from what is displayed."""
+        state = (value, configure_kwargs)
+        if self.widget_state.get(widget) == state:
+            return
+        self.widget_state[widget] = state
+        if value is not None:
+            widget.set(value)
+        if configure_kwargs:
+            widget.configure(**configure_kwargs)
 
     def create_ai_tab(self, tab):
         tab.grid_columnconfigure(0, weight=2)
@@ -131,37 +219,72 @@ class LocalLLMApp(ctk.CTk):
         self.prompt_textbox = ctk.CTkTextbox(left_frame)
         self.prompt_textbox.grid(row=0, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
         self.prompt_textbox.insert("0.0", "Enter your prompt here...")
-        run_button = ctk.CTkButton(left_frame, text="Run LLM", command=self.run_llm)
-        run_button.grid(row=1, column=0, padx=10, pady=10, sticky="sw")
+        self.run_button = ctk.CTkButton(left_frame, text="Run LLM", command=self.run_llm)
+        self.run_button.grid(row=1, column=0, padx=10, pady=10, sticky="sw")
+        self.stop_llm_button = ctk.CTkButton(left_frame, text="Stop", command=self.stop_llm, state="disabled", fg_color="#D32F2F", hover_color="#E57373")
+        self.stop_llm_button.grid(row=1, column=1, padx=10, pady=10, sticky="se")
         self.output_textbox = ctk.CTkTextbox(left_frame, state="disabled")
         self.output_textbox.grid(row=2, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="nsew")
         recipe_frame = ctk.CTkFrame(tab)
         recipe_frame.grid(row=0, column=1, rowspan=3, padx=(5, 10), pady=10, sticky="nsew")
         recipe_frame.grid_columnconfigure(0, weight=1)
         ctk.CTkLabel(recipe_frame, text="Recipes").grid(row=0, column=0, padx=10, pady=10)
+        self.recipe_search_entry = ctk.CTkEntry(recipe_frame, placeholder_text="Search recipes...")
+        self.recipe_search_entry.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        self.recipe_search_entry.bind("<Return>", lambda event: self.search_recipes())
         self.recipe_menu = ctk.CTkOptionMenu(recipe_frame, values=[], command=self.load_recipe)
-        self.recipe_menu.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        self.recipe_menu.grid(row=2, column=0, padx=10, pady=5, sticky="ew")
 
     def run_llm(self):
-        prompt = self.prompt_textbox.get("1.0", tk.END)
-        self.output_textbox.configure(state="normal")
-        self.output_textbox.delete("1.0", tk.END)
-        self.output_textbox.insert("1.0", "Generating... Please wait.")
-        self.output_textbox.configure(state="disabled")
-        threading.Thread(target=self.execute_llm_call, args=(prompt,)).start()
-
-    def execute_llm_call(self, prompt):
         if not self.config or 'llm' not in self.config:
             self.update_output_textbox("LLM configuration not loaded.")
             return
-        llm_config = self.config['llm']
-        model = llm_config.get('default_model', 'unknown')
-        response = api_client.generate_llm(model=model, prompt=prompt)
-        if response and response.get('choices'):
-            content = response['choices'][0]['delta']['content']
-            self.update_output_textbox(content)
+        prompt = self.prompt_textbox.get("1.0", tk.END)
+        model = self.config['llm'].get('default_model', 'unknown')
+        self.update_output_textbox("")
+        self.run_button.configure(state="disabled")
+        self.stop_llm_button.configure(state="normal")
+        self.llm_stop_requested = False
+        threading.Thread(target=self.execute_llm_call, args=(model, prompt), daemon=True).start()
+
+    def execute_llm_call(self, model, prompt):
+        # Runs off the Tk thread; tokens are handed to process_backend_events for batched display
+        llm_stream = api_client.stream_llm(model=model, prompt=prompt)
+        if llm_stream is None:
+            self.event_queue.put(("llm_done", "Error: Failed to get a valid response from the backend."))
+            return
+        self.llm_stream = llm_stream
+        if self.llm_stop_requested:
+            llm_stream.cancel()
+        received = False
+        for content in llm_stream:
+            received = True
+            self.event_queue.put(("llm_token", content))
+        if llm_stream.cancelled:
+            message = "\n[Generation stopped]"
+        elif llm_stream.error or not received:
+            message = "Error: Failed to get a valid response from the backend."
         else:
-            self.update_output_textbox("Error: Failed to get a valid response from the backend.")
+            message = None
+        self.event_queue.put(("llm_done", message))
+
+    def stop_llm(self):
+        self.llm_stop_requested = True
+        if self.llm_stream is not None:
+            self.llm_stream.cancel()
+
+    def finish_llm_call(self, message):
+        if message:
+            self.append_output_text(message)
+        self.llm_stream = None
+        self.run_button.configure(state="normal")
+        self.stop_llm_button.configure(state="disabled")
+
+    def append_output_text(self, text):
+        self.output_textbox.configure(state="normal")
+        self.output_textbox.insert(tk.END, text)
+        self.output_textbox.see(tk.END)
+        self.output_textbox.configure(state="disabled")
 
     def update_output_textbox(self, text):
         self.output_textbox.configure(state="normal")
@@ -180,6 +303,18 @@ class LocalLLMApp(ctk.CTk):
             self.recipe_menu.configure(values=["No Recipes Found"])
             self.recipe_menu.set("No Recipes Found")
 
+    def search_recipes(self):
+        query = self.recipe_search_entry.get().strip()
+        if not query:
+            self.refresh_recipe_list()
+            return
+        results = api_client.search_recipes(query)
+        recipe_names = [f"{r['category']}/{r['name']}" for r in results or []] or ["No Recipes Found"]
+        self.recipe_menu.configure(values=recipe_names)
+        self.recipe_menu.set(recipe_names[0])
+        if results:
+            self.load_recipe(recipe_names[0])
+
     def load_recipe(self, selection):
         if selection == "No Recipes Found" or '/' not in selection: return
         category, name = selection.split('/', 1)
@@ -200,6 +335,8 @@ class LocalLLMApp(ctk.CTk):
         self.miners_frame.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
 
     def refresh_miner_list(self):
+        for widgets in self.miner_widgets.values():
+            for widget in widgets.values(): self.widget_state.pop(widget, None)
         for widget in self.miners_frame.winfo_children(): widget.destroy()
         self.miner_widgets = {}
         miners = self.config.get('miners', [])
@@ -211,17 +348,22 @@ class LocalLLMApp(ctk.CTk):
             start_btn = ctk.CTkButton(frame, text="Start", width=60, command=lambda n=miner_name: api_client.start_miner(n)); start_btn.grid(row=0, column=2, padx=5, pady=5)
             stop_btn = ctk.CTkButton(frame, text="Stop", width=60, command=lambda n=miner_name: api_client.stop_miner(n)); stop_btn.grid(row=0, column=3, padx=5, pady=5)
             self.miner_widgets[miner_name] = {'status': status, 'start_button': start_btn, 'stop_button': stop_btn}
+        self.update_crypto_tab(self.miner_statuses)
 
-    def update_crypto_tab(self):
-        statuses = api_client.get_all_miner_status()
-        if statuses:
-            for name, widgets in self.miner_widgets.items():
-                status = statuses.get(name, "NOT_FOUND")
-                if status == "RUNNING":
-                    widgets['status'].configure(text="Running", text_color="#81C784"); widgets['start_button'].configure(state="disabled"); widgets['stop_button'].configure(state="normal")
-                else:
-                    widgets['status'].configure(text="Stopped", text_color="#E57373"); widgets['start_button'].configure(state="normal"); widgets['stop_button'].configure(state="disabled")
-        self.after(2000, self.update_crypto_tab)
+    def update_crypto_tab(self, changed_statuses: Dict[str, str]):
+        self.miner_statuses.update({name: status for name, status in changed_statuses.items() if status is not None})
+        for name, status in changed_statuses.items():
+            widgets = self.miner_widgets.get(name)
+            if not widgets:
+                continue
+            if status == "RUNNING":
+                self.set_if_changed(widgets['status'], None, text="Running", text_color="#81C784"); self.set_if_changed(widgets['start_button'], None, state="disabled"); self.set_if_changed(widgets['stop_button'], None, state="normal")
+            elif status == "PAUSED":
+                self.set_if_changed(widgets['status'], None, text="Paused (LLM)", text_color="#FFB74D"); self.set_if_changed(widgets['start_button'], None, state="disabled"); self.set_if_changed(widgets['stop_button'], None, state="normal")
+            elif status == "RESTARTING":
+                self.set_if_changed(widgets['status'], None, text="Restarting", text_color="#FFB74D"); self.set_if_changed(widgets['start_button'], None, state="disabled"); self.set_if_changed(widgets['stop_button'], None, state="normal")
+            else:
+                self.set_if_changed(widgets['status'], None, text="Stopped", text_color="#E57373"); self.set_if_changed(widgets['start_button'], None, state="normal"); self.set_if_changed(widgets['stop_button'], None, state="disabled")
 
     def start_all_miners(self):
         for miner_config in self.config.get('miners', []):
@@ -249,17 +391,17 @@ class LocalLLMApp(ctk.CTk):
         self.ram_label = ctk.CTkLabel(ram_frame, text="0% (0.0/0.0 GB)"); self.ram_label.grid(row=0, column=2, padx=10, pady=5)
         self.gpu_frames = []
 
-    def update_dashboard(self):
-        stats = api_client.get_system_stats()
+    def update_dashboard(self, stats: Dict[str, Any]):
+        # `stats` holds only the sections that changed since the last push
         if stats:
-            if 'cpu' in stats and 'percent' in stats['cpu']:
-                self.cpu_progress.set(stats['cpu']['percent'] / 100)
-                self.cpu_label.configure(text=f"{stats['cpu']['percent']:.1f}%")
-            if 'ram' in stats and all(k in stats['ram'] for k in ['percent', 'used', 'total']):
+            if stats.get('cpu') and 'percent' in stats['cpu']:
+                self.set_if_changed(self.cpu_progress, stats['cpu']['percent'] / 100)
+                self.set_if_changed(self.cpu_label, None, text=f"{stats['cpu']['percent']:.1f}%")
+            if stats.get('ram') and all(k in stats['ram'] for k in ['percent', 'used', 'total']):
                 ram_used_gb = stats['ram']['used'] / (1024**3); ram_total_gb = stats['ram']['total'] / (1024**3)
-                self.ram_progress.set(stats['ram']['percent'] / 100)
-                self.ram_label.configure(text=f"{stats['ram']['percent']:.1f}% ({ram_used_gb:.1f}/{ram_total_gb:.1f} GB)")
-            if 'gpus' in stats and stats['gpus'] and not self.gpu_frames:
+                self.set_if_changed(self.ram_progress, stats['ram']['percent'] / 100)
+                self.set_if_changed(self.ram_label, None, text=f"{stats['ram']['percent']:.1f}% ({ram_used_gb:.1f}/{ram_total_gb:.1f} GB)")
+            if stats.get('gpus') and not self.gpu_frames:
                 for i, gpu_stat in enumerate(stats['gpus']):
                     gpu_frame = ctk.CTkFrame(self.tab_view.tab("Dashboard")); gpu_frame.grid(row=2+i, column=0, padx=10, pady=10, sticky="nsew"); gpu_frame.grid_columnconfigure(1, weight=1)
                     ctk.CTkLabel(gpu_frame, text=f"GPU {i}: {gpu_stat.get('name', 'N/A')}").grid(row=0, column=0, columnspan=3, padx=10, pady=5, sticky="w")
@@ -272,22 +414,19 @@ class LocalLLMApp(ctk.CTk):
                     ctk.CTkLabel(gpu_frame, text="Temp").grid(row=3, column=0, padx=10, pady=2, sticky="w")
                     gpu_temp_label = ctk.CTkLabel(gpu_frame, text="0°C"); gpu_temp_label.grid(row=3, column=1, padx=10, pady=2, sticky="w")
                     self.gpu_frames.append({'frame': gpu_frame, 'usage_progress': gpu_usage_progress, 'usage_label': gpu_usage_label, 'mem_progress': gpu_mem_progress, 'mem_label': gpu_mem_label, 'temp_label': gpu_temp_label})
-            if 'gpus' in stats:
+            if stats.get('gpus'):
                 for i, gpu_stat in enumerate(stats['gpus']):
                     if i < len(self.gpu_frames):
                         frame_info = self.gpu_frames[i]
                         usage = gpu_stat.get('usage', 0); mem_usage = gpu_stat.get('memory_usage', 0); temp = gpu_stat.get('temperature', 0)
-                        frame_info['usage_progress'].set(usage / 100); frame_info['usage_label'].configure(text=f"{usage}%")
-                        frame_info['mem_progress'].set(mem_usage / 100); frame_info['mem_label'].configure(text=f"{mem_usage}%")
-                        frame_info['temp_label'].configure(text=f"{temp}°C")
-        self.after(2000, self.update_dashboard)
+                        self.set_if_changed(frame_info['usage_progress'], usage / 100); self.set_if_changed(frame_info['usage_label'], None, text=f"{usage}%")
+                        self.set_if_changed(frame_info['mem_progress'], mem_usage / 100); self.set_if_changed(frame_info['mem_label'], None, text=f"{mem_usage}%")
+                        self.set_if_changed(frame_info['temp_label'], None, text=f"{temp}°C")
 
 if __name__ == "__main__":
-    # Start the backend in a daemon thread
+    # Start the backend in a daemon thread; the GUI loads its data as soon as the backend reports ready
     backend_thread = threading.Thread(target=run_backend, daemon=True)
     backend_thread.start()
-    # Give the server a moment to start before launching the GUI
-    time.sleep(5)
-    
-    app = LocalLLMApp()
+
+    app = LocalLLMApp(backend_ready=backend_is_ready, backend_failed=backend_failed)
     app.mainloop()
\ No newline at end of file
@@ -1,6 +1,41 @@
 import requests
 import json
-from typing import Dict, Any, Optional
+import threading
+from typing import Callable, Dict, Any, Iterator, List, Optional
+
+class LLMStream:
+    """
+    Handle for an in-flight streamed generation. Iterate it for content deltas as they arrive;
+    cancel() closes the connection, which aborts the generation upstream.
+    """
+    def __init__(self, response: requests.Response):
+        self.response = response
+        self.cancelled = False
+        self.error: Optional[str] = None
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            self.response.raise_for_status()
+            for line in self.response.iter_lines(decode_unicode=True):
+                if self.cancelled:
+                    return
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                for choice in chunk.get('choices', []):
+                    content = (choice.get('delta') or choice.get('message') or {}).get('content')
+                    if content:
+                        yield content
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            if not self.cancelled: # Closing the response mid-read surfaces as an error; that one is expected
+                self.error = str(e)
+                print(f"API Error: LLM stream failed: {e}")
+        finally:
+            self.response.close()
+
+    def cancel(self):
+        self.cancelled = True
+        self.response.close()
 
 class ApiClient:
     """
@@ -8,6 +43,27 @@ class ApiClient:
     """
     def __init__(self, base_url: str = "http://127.0.0.1:8000"):
         self.base_url = base_url
+        self._etag_cache: Dict[str, tuple] = {} # url -> (etag, payload) for conditional GETs
+
+    def _get_cached(self, url: str) -> Any:
+        """GET with If-None-Match, reusing the cached payload on 304."""
+        cached = self._etag_cache.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = requests.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        payload = response.json()
+        if response.headers.get("ETag"):
+            self._etag_cache[url] = (response.headers["ETag"], payload)
+        return payload
+
+    def is_ready(self) -> bool:
+        """True if the backend answers its readiness probe (GET /ready) with 200."""
+        try:
+            return requests.get(f"{self.base_url}/ready", timeout=1).status_code == 200
+        except requests.RequestException:
+            return False
 
     def get_system_stats(self) -> Optional[Dict[str, Any]]:
         """Fetches system statistics from the backend."""
@@ -19,6 +75,47 @@ class ApiClient:
             print(f"API Error: Could not get system stats: {e}")
             return None
 
+    def get_system_stats_history(self, since: Optional[float] = None, resolution: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Fetches downsampled CPU/RAM/GPU history newer than `since`."""
+        params = {k: v for k, v in {"since": since, "resolution": resolution}.items() if v is not None}
+        try:
+            response = requests.get(f"{self.base_url}/system/stats/history", params=params)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            print(f"API Error: Could not get system stats history: {e}")
+            return None
+
+    def listen_events(self, on_event: Callable[[str, Dict[str, Any]], None], stop_event: threading.Event, retry_delay: float = 2.0):
+        """
+        Consumes the backend's /events stream, calling on_event(name, data) for every pushed delta.
+        Blocks and reconnects until stop_event is set, so run it on a background thread.
+        """
+        while not stop_event.is_set():
+            try:
+                # The backend sends a keepalive well within the read timeout
+                with requests.get(f"{self.base_url}/events", stream=True, timeout=(5, 60)) as response:
+                    response.raise_for_status()
+                    event_name = None
+                    for line in response.iter_lines(decode_unicode=True):
+                        if stop_event.is_set():
+                            return
+                        if line.startswith("event:"):
+                            event_name = line[len("event:"):].strip()
+                        elif line.startswith("data:") and event_name:
+                            on_event(event_name, json.loads(line[len("data:"):]))
+                        elif not line:
+                            event_name = None
+            except (requests.RequestException, ValueError) as e:
+                print(f"API Error: Event stream interrupted: {e}")
+            stop_event.wait(retry_delay)
+
+    def start_event_listener(self, on_event: Callable[[str, Dict[str, Any]], None]) -> threading.Event:
+        """Starts listen_events on a daemon thread. Set the returned event to stop it."""
+        stop_event = threading.Event()
+        threading.Thread(target=self.listen_events, args=(on_event, stop_event), daemon=True).start()
+        return stop_event
+
     def start_miner(self, miner_name: str) -> Optional[Dict[str, Any]]:
         """Sends a request to start a specific miner."""
         try:
@@ -49,8 +146,8 @@ class ApiClient:
             print(f"API Error: Could not stop all miners: {e}")
             return None
             
-    def get_all_miner_status(self) -> Dict[str, str]:
-        """Fetches the status of all configured miners."""
+    def get_all_miner_status(self) -> Dict[str, Dict[str, Any]]:
+        """Fetches the status and parsed telemetry of all configured miners."""
         try:
             response = requests.get(f"{self.base_url}/miner/all_status")
             response.raise_for_status()
@@ -79,6 +176,26 @@ class ApiClient:
             print(f"API Error: Could not update config: {e}")
             return None
 
+    def patch_config(self, operations: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Applies a JSON Patch to the backend configuration and returns the updated config."""
+        try:
+            response = requests.patch(f"{self.base_url}/config", json=operations)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            print(f"API Error: Could not patch config: {e}")
+            return None
+
+    def patch_miner_config(self, miner_name: str, operations: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Applies a JSON Patch to one miner's configuration and returns the updated miner."""
+        try:
+            response = requests.patch(f"{self.base_url}/config/miners/{miner_name}", json=operations)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            print(f"API Error: Could not update miner {miner_name}: {e}")
+            return None
+
     def generate_llm(self, model: str, prompt: str, stream: bool = False, max_tokens: int = 100) -> Any:
         """Requests a text generation from the LLM."""
         payload = {
@@ -100,6 +217,23 @@ class ApiClient:
             print(f"API Error: Could not generate LLM text: {e}")
             return None
 
+    def stream_llm(self, model: str, prompt: str, max_tokens: int = 100) -> Optional[LLMStream]:
+        """Starts a streamed generation and returns a handle yielding content deltas."""
+        response = self.generate_llm(model=model, prompt=prompt, stream=True, max_tokens=max_tokens)
+        return LLMStream(response) if response is not None else None
+
+    def generate_llm_batch(self, model: str, prompts: Optional[list] = None, recipe: Optional[str] = None, inputs: Optional[list] = None, max_tokens: int = 100) -> Iterator[Dict[str, Any]]:
+        """Runs a batch generation, yielding `{"index", "status", ...}` results as each item finishes."""
+        payload = {"model": model, "prompts": prompts, "recipe": recipe, "inputs": inputs, "max_tokens": max_tokens}
+        try:
+            with requests.post(f"{self.base_url}/llm/generate/batch", json=payload, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        yield json.loads(line)
+        except (requests.RequestException, ValueError) as e:
+            print(f"API Error: Batch generation failed: {e}")
+
     def get_llm_models(self) -> Optional[Dict[str, Any]]:
         """Fetches the list of available LLM models."""
         try:
@@ -115,9 +249,7 @@ class ApiClient:
         try:
             # The backend expects the .txt extension to be stripped
             recipe_name = name.replace('.txt', '')
-            response = requests.get(f"{self.base_url}/recipes/{category}/{recipe_name}")
-            response.raise_for_status()
-            return response.json()
+            return self._get_cached(f"{self.base_url}/recipes/{category}/{recipe_name}")
         except requests.RequestException as e:
             print(f"API Error: Could not get recipe {category}/{name}: {e}")
             return None
@@ -125,11 +257,19 @@ class ApiClient:
     def get_recipes(self) -> Optional[Dict[str, Any]]:
         """Fetches the available recipes."""
         try:
-            response = requests.get(f"{self.base_url}/recipes")
+            return self._get_cached(f"{self.base_url}/recipes")
+        except requests.RequestException as e:
+            print(f"API Error: Could not get recipes: {e}")
+            return None
+
+    def search_recipes(self, query: str, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """Ranks recipes against a free-text query."""
+        try:
+            response = requests.get(f"{self.base_url}/recipes/search", params={"q": query, "limit": limit})
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
-            print(f"API Error: Could not get recipes: {e}")
+            print(f"API Error: Could not search recipes: {e}")
             return None
 
 # Global client instance for the GUI to use
@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import json
+import math
+import socket
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+SCENARIOS = ("generate", "generate_stream", "system_stats", "recipes")
+LATENCY_METRICS = ("p50", "p95", "p99", "ttft_p50", "ttft_p95", "ttft_p99") # Lower is better
+THROUGHPUT_METRICS = ("requests_per_second",) # Higher is better
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class ServerThread:
+    """Runs an ASGI app under uvicorn on a background thread, for the duration of a benchmark."""
+    def __init__(self, app, port: Optional[int] = None):
+        import uvicorn
+
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        # One event loop per server, so the mock provider's pacing never competes with the backend's
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on"))
+        self.thread = threading.Thread(target=self.server.run, name=f"bench-server-{self.port}", daemon=True)
+
+    def start(self, timeout: float = 15.0) -> "ServerThread":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Server on port {self.port} failed to start.")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+# Each scenario issues one request and returns (status code, seconds to first token or None)
+async def _generate(client: httpx.AsyncClient, model: str, max_tokens: int) -> Tuple[int, Optional[float]]:
+    response = await client.post("/llm/generate", json={"model": model, "prompt": "Benchmark prompt", "max_tokens": max_tokens, "cache": "bypass"})
+    return response.status_code, None
+
+async def _generate_stream(client: httpx.AsyncClient, model: str, max_tokens: int) -> Tuple[int, Optional[float]]:
+    started = time.perf_counter()
+    ttft = None
+    body = {"model": model, "prompt": "Benchmark prompt", "max_tokens": max_tokens, "stream": True, "cache": "bypass"}
+    async with client.stream("POST", "/llm/generate", json=body) as response:
+        async for line in response.aiter_lines():
+            if ttft is None and response.status_code == 200 and line.strip():
+                ttft = time.perf_counter() - started
+        return response.status_code, ttft
+
+def _get(path: str) -> Callable[..., Awaitable[Tuple[int, Optional[float]]]]:
+    async def request(client: httpx.AsyncClient, model: str, max_tokens: int) -> Tuple[int, Optional[float]]:
+        response = await client.get(path)
+        return response.status_code, None
+    return request
+
+_REQUESTS = {
+    "generate": _generate,
+    "generate_stream": _generate_stream,
+    "system_stats": _get("/system/stats"),
+    "recipes": _get("/recipes"),
+}
+
+async def run_scenario(client: httpx.AsyncClient, name: str, concurrency: int, requests: int, model: str = "mock", max_tokens: int = 32) -> Dict[str, Any]:
+    """Drives `requests` calls through `concurrency` closed-loop workers and summarises latency and throughput."""
+    request = _REQUESTS[name]
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                code, ttft = await request(client, model, max_tokens)
+                key = str(code)
+            except httpx.HTTPError as e:
+                ttft, key = None, type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if ttft is not None:
+                ttfts.append(ttft)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": sum(count for key, count in statuses.items() if not key.startswith("2")),
+        "statuses": statuses,
+        "duration_s": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "p50": ms(percentile(latencies, 50)),
+        "p95": ms(percentile(latencies, 95)),
+        "p99": ms(percentile(latencies, 99)),
+        "ttft_p50": ms(percentile(ttfts, 50)),
+        "ttft_p95": ms(percentile(ttfts, 95)),
+        "ttft_p99": ms(percentile(ttfts, 99)),
+    }
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_regression: float) -> List[str]:
+    """
+    Checks each (scenario, concurrency) against a previous run. A latency rising, or throughput
+    falling, by more than `max_regression` (a fraction, e.g. 0.2) is reported. Error increases always are.
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        key = (result["scenario"], result["concurrency"])
+        before = previous.get(key)
+        if before is None:
+            continue
+        label = f"{key[0]}@{key[1]}"
+        if result["errors"] > before.get("errors", 0):
+            regressions.append(f"{label}: errors {before.get('errors', 0)} -> {result['errors']}")
+        for metric in LATENCY_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old and new is not None and new > old * (1 + max_regression):
+                regressions.append(f"{label}: {metric} {old}ms -> {new}ms")
+        for metric in THROUGHPUT_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old and new is not None and new < old * (1 - max_regression):
+                regressions.append(f"{label}: {metric} {old} -> {new}")
+    return regressions
+
+def start_local_stack(token_rate: float, latency: float, tokens: int, max_concurrent: int) -> List[ServerThread]:
+    """Starts the mock provider and an in-process backend pointed at it. Returns [provider, backend]."""
+    from local_llm_backend.benchmarks.mock_provider import create_mock_provider
+    from local_llm_backend.config import BackendConfig, OllamaProviderConfig, SchedulerConfig
+    from local_llm_backend.main import create_app
+
+    provider = ServerThread(create_mock_provider(token_rate, latency, tokens)).start()
+    config = BackendConfig(
+        llm=OllamaProviderConfig(provider="ollama", api_base=f"{provider.url}/v1", default_model="mock", process_name=None),
+        scheduler=SchedulerConfig(max_concurrent_per_model=max_concurrent, max_queue=100000),
+    )
+    try:
+        backend = ServerThread(create_app(load_config_fn=lambda: config, save_config_fn=lambda new_config: None, config_path=None)).start()
+    except Exception:
+        provider.stop()
+        raise
+    return [provider, backend]
+
+async def run_benchmark(
+    base_url: str,
+    scenarios: List[str],
+    concurrency_levels: List[int],
+    requests: int,
+    model: str = "mock",
+    max_tokens: int = 32,
+) -> List[Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=max(concurrency_levels) * 2, max_keepalive_connections=max(concurrency_levels) * 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=httpx.Timeout(300.0)) as client:
+        # Warm-up: the first /system/stats waits on the sampler, and connections are opened lazily
+        for name in scenarios:
+            await run_scenario(client, name, 1, 1, model, max_tokens)
+        results = []
+        for name in scenarios:
+            for concurrency in concurrency_levels:
+                results.append(await run_scenario(client, name, concurrency, requests, model, max_tokens))
+        return results
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the backend's generate, stats and recipe endpoints against a mock LLM.")
+    parser.add_argument("--backend-url", help="Benchmark a running backend instead of starting one with the mock provider")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4, 16], help="Comma-separated concurrency levels, e.g. 1,4,16")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario and concurrency level")
+    parser.add_argument("--model", default="mock")
+    parser.add_argument("--max-tokens", type=int, default=32)
+    parser.add_argument("--token-rate", type=float, default=200.0, help="Mock provider tokens per second per request")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock provider seconds before the first token")
+    parser.add_argument("--tokens", type=int, default=32, help="Mock provider tokens per completion")
+    parser.add_argument("--max-concurrent", type=int, default=16, help="Scheduler slots per model for the in-process backend")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against; regressions exit with status 1")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Tolerated fractional slowdown before a metric counts as regressed")
+    args = parser.parse_args(argv)
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+
+    servers: List[ServerThread] = []
+    try:
+        if args.backend_url:
+            base_url = args.backend_url.rstrip("/")
+        else:
+            servers = start_local_stack(args.token_rate, args.latency, args.tokens, args.max_concurrent)
+            base_url = servers[-1].url
+        results = asyncio.run(run_benchmark(base_url, scenarios, args.concurrency, args.requests, args.model, args.max_tokens))
+    finally:
+        for server in reversed(servers):
+            server.stop()
+
+    report: Dict[str, Any] = {
+        "settings": {
+            "backend_url": args.backend_url,
+            "mock_provider": None if args.backend_url else {"token_rate": args.token_rate, "latency": args.latency, "tokens": args.tokens},
+            "requests": args.requests,
+            "max_tokens": args.max_tokens,
+        },
+        "results": results,
+    }
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(results, baseline.get("results", []), args.max_regression)
+        exit_code = 1 if report["regressions"] else 0
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+def create_mock_provider(token_rate: float = 50.0, latency: float = 0.05, tokens: int = 32) -> FastAPI:
+    """
+    OpenAI/Ollama-compatible stand-in for benchmarking: waits `latency` seconds before the first token,
+    then emits `tokens` tokens (capped by the request's max_tokens) at `token_rate` tokens per second.
+    """
+    app = FastAPI(title="Mock LLM Provider")
+    interval = 1.0 / token_rate if token_rate > 0 else 0.0
+
+    def chunk(completion_id: str, model: str, delta: dict, finish_reason=None, usage=None) -> dict:
+        body = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        if usage:
+            body["usage"] = usage
+        return body
+
+    @app.get("/")
+    async def root():
+        return PlainTextResponse("Ollama is running")
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "mock", "model": "mock", "size": 0}]}
+
+    @app.post("/api/embed")
+    async def embed(request: Request):
+        body = await request.json()
+        inputs = body.get("input") or []
+        return {"model": body.get("model"), "embeddings": [[float(len(text) % 7), 1.0, 0.5] for text in inputs]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "mock")
+        count = min(tokens, body.get("max_tokens") or tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = {"prompt_tokens": 8, "completion_tokens": count, "total_tokens": 8 + count}
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency + count * interval)
+            return JSONResponse({
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "tok " * count}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def events():
+            await asyncio.sleep(latency)
+            started = time.perf_counter()
+            for i in range(count):
+                # Pace against the start time so scheduling jitter doesn't accumulate into a slower rate
+                delay = started + i * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                delta = {"role": "assistant", "content": "tok "} if i == 0 else {"content": "tok "}
+                yield f"data: {json.dumps(chunk(completion_id, model, delta))}\n\n"
+            yield f"data: {json.dumps(chunk(completion_id, model, {}, 'stop', usage))}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI/Ollama-compatible LLM for benchmarking.")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Tokens per second per request")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before the first token")
+    parser.add_argument("--tokens", type=int, default=32, help="Tokens per completion (capped by max_tokens)")
+    args = parser.parse_args()
+    uvicorn.run(create_mock_provider(args.token_rate, args.latency, args.tokens), host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+RESULT_PREFIX = "STARTUP_RESULT "
+MARK_PREFIX = "STARTUP_MARK " # The parent timestamps these as they arrive, which includes interpreter startup
+
+def _mark(name: str):
+    print(MARK_PREFIX + name, flush=True)
+
+def _child_backend() -> Dict[str, Any]:
+    """Imports the backend and serves it the way app.py does, until it reports ready."""
+    started = time.perf_counter()
+    import uvicorn
+    from local_llm_backend.main import app
+    imported = time.perf_counter()
+    from local_llm_backend.benchmarks.harness import free_port
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=free_port(), log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    # Ready means accepting connections: `started` is set only after startup has run and the socket is bound
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            return {"error": "Backend did not start listening within 30s."}
+        time.sleep(0.001)
+    ready = time.perf_counter()
+    _mark("ready")
+    server.should_exit = True
+    thread.join(timeout=10)
+    return {"import_s": imported - started, "ready_s": ready - started, "startup_event_s": app.state.startup_seconds}
+
+def _child_gui() -> Dict[str, Any]:
+    """Launches the desktop app as `python app.py` does and times the first drawn window."""
+    started = time.perf_counter()
+    sys.path.insert(0, str(REPO_ROOT))
+    try:
+        import app as gui
+    except Exception as e: # No customtkinter/requests, or no display to draw on
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    threading.Thread(target=gui.run_backend, daemon=True).start()
+    try:
+        window = gui.LocalLLMApp(backend_ready=gui.backend_is_ready, backend_failed=gui.backend_failed)
+    except Exception as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    window.update()
+    first_window = time.perf_counter()
+    _mark("first_window")
+    deadline = first_window + 30
+    while not gui.backend_is_ready() and not gui.backend_failed() and time.perf_counter() < deadline:
+        window.update()
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    _mark("ready")
+    return {"first_window_s": first_window - started, "backend_ready_s": ready - started}
+
+def measure(mode: str, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Runs one cold start in a fresh interpreter. Child timings start once the benchmark module is
+    running; each `<mark>_process_s` is wall time from launch, interpreter startup included.
+    """
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "local_llm_backend.benchmarks.startup", "--child", mode],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    result: Dict[str, Any] = {"error": "Child exited without a result."}
+    marks: Dict[str, float] = {}
+    try:
+        for line in process.stdout:
+            if line.startswith(MARK_PREFIX):
+                marks[f"{line[len(MARK_PREFIX):].strip()}_process_s"] = time.perf_counter() - launched
+            elif line.startswith(RESULT_PREFIX):
+                result = json.loads(line[len(RESULT_PREFIX):])
+                result.update(marks)
+                break
+    finally:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return result
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    keys = sorted({key for run in runs for key, value in run.items() if isinstance(value, (int, float))})
+    summary = {}
+    for key in keys:
+        values = [run[key] for run in runs if isinstance(run.get(key), (int, float))]
+        summary[key] = {"median_ms": round(statistics.median(values) * 1000, 1), "max_ms": round(max(values) * 1000, 1)}
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the backend and the desktop app.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--gui", action="store_true", help="Also time the desktop app's first window (needs customtkinter and a display)")
+    parser.add_argument("--target", type=float, default=1.0, help="Seconds the headline median must stay under; exceeding it exits with status 1")
+    parser.add_argument("--child", choices=["backend", "gui"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = _child_backend() if args.child == "backend" else _child_gui()
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+        os._exit(0) # Don't wait on the GUI's or backend's daemon threads
+
+    report: Dict[str, Any] = {"target_s": args.target}
+    backend_runs = [measure("backend") for _ in range(args.runs)]
+    report["backend"] = {"runs": backend_runs, "summary": summarize(backend_runs)}
+    headline = ("backend", "ready_process_s")
+    if args.gui:
+        gui_runs = [measure("gui") for _ in range(args.runs)]
+        report["gui"] = {"runs": gui_runs, "summary": summarize(gui_runs)}
+        if "first_window_s" in report["gui"]["summary"]:
+            headline = ("gui", "first_window_process_s")
+
+    summary = report[headline[0]]["summary"].get(headline[1])
+    report["headline"] = {"metric": f"{headline[0]}.{headline[1]}", "median_ms": summary["median_ms"] if summary else None}
+    exit_code = 0 if summary and summary["median_ms"] <= args.target * 1000 else 1
+    report["within_target"] = exit_code == 0
+    print(json.dumps(report, indent=4))
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 import json
+import os
+import stat
 import sys
+import tempfile
 from pathlib import Path
-from typing import List, Optional, Literal, Union
+from typing import Dict, List, Optional, Literal, Union
 from pydantic import BaseModel, Field
 
 # Correctly determine the base path for data files (like config.json)
@@ -23,11 +26,13 @@ class MinerConfig(BaseModel):
     coin: str
     worker: str
     device: Optional[int] = None
+    auto_restart: bool = False # Respawn after a crash, backing off exponentially
 
 class OllamaProviderConfig(BaseModel):
     provider: Literal["ollama"]
     api_base: str = "http://localhost:11434/v1"
     default_model: str = "llama2"
+    process_name: Optional[str] = "ollama" # Local server executable to report in per-process stats
 
 class VertexAIProviderConfig(BaseModel):
     provider: Literal["vertexai"]
@@ -35,10 +40,66 @@ class VertexAIProviderConfig(BaseModel):
     location: str
     default_model: str = "gemini-1.0-pro-001"
 
+class HttpPoolConfig(BaseModel):
+    # Connection pool and timeouts for the shared provider HTTP client
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: Optional[float] = 300.0 # Long generations can stream for minutes
+
+class SchedulerConfig(BaseModel):
+    # Admission control for /llm/generate
+    max_concurrent_per_model: int = 1
+    max_queue: int = 32
+    model_limits: Dict[str, int] = {} # Per-model overrides of max_concurrent_per_model
+
+class ResponseCacheConfig(BaseModel):
+    # Opt-in exact-match cache for /llm/generate
+    enabled: bool = False
+    max_bytes: int = 64 * 1024 * 1024 # Memory tier budget
+    disk_dir: Optional[str] = None # Set to persist entries across restarts
+    deterministic_only: bool = True # Only cache requests sent with temperature 0
+    disk_max_bytes: int = 512 * 1024 * 1024 # Disk tier budget; least recently used entries are deleted beyond it
+
+class RecipeSearchConfig(BaseModel):
+    # Set to an embedding model (e.g. "nomic-embed-text") to blend vector similarity into /recipes/search
+    embedding_model: Optional[str] = None
+
+class GpuArbitrationConfig(BaseModel):
+    # Yield the GPU to the LLM: pause or duty-cycle miners on `llm_devices` while generations run or queue
+    enabled: bool = False
+    mode: Literal["pause", "throttle"] = "pause"
+    llm_devices: List[int] = [0] # GPUs the LLM runs on; miners without a `device` count as using every GPU
+    idle_grace_seconds: float = 30.0 # How long the LLM must be idle before miners resume
+    throttle_duty: float = 0.25 # Fraction of each period miners may run in "throttle" mode
+    throttle_period: float = 2.0
+
 class BackendConfig(BaseModel):
     miners: List[MinerConfig] = []
+    http_pool: HttpPoolConfig = HttpPoolConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    response_cache: ResponseCacheConfig = ResponseCacheConfig()
+    recipe_search: RecipeSearchConfig = RecipeSearchConfig()
+    gpu_arbitration: GpuArbitrationConfig = GpuArbitrationConfig()
+    stats_sample_interval: float = 2.0 # Seconds between background system stats samples
+    stats_history_seconds: float = 6 * 3600 # How much sample history /system/stats/history retains
+    batch_concurrency: int = 4 # Max parallel generations per /llm/generate/batch request
+    jobs_dir: str = "jobs" # /jobs input and output paths must lie under this directory; relative to config.json's directory
+    model_catalog_ttl: float = 60.0 # Seconds a cached /llm/models listing is served before a background refresh
+    miner_log_max_lines: int = 2000 # Per-process output ring buffer served by /miner/logs
+    miner_log_max_bytes: int = 1024 * 1024
+    config_reload_interval: float = 2.0 # Seconds between checks of config.json for edits made outside the backend; 0 disables
     llm: Union[OllamaProviderConfig, VertexAIProviderConfig] = Field(..., discriminator='provider')
 
+def resolve_jobs_dir(config: BackendConfig) -> Path:
+    return (base_path / config.jobs_dir).resolve() # An absolute jobs_dir replaces base_path
+
+def read_config(path: Path) -> BackendConfig:
+    """Parses a config file, raising on a missing, malformed or invalid file (unlike load_config)."""
+    with open(path, "r") as f:
+        return BackendConfig(**json.load(f))
+
 def load_config() -> BackendConfig:
     if not CONFIG_FILE_PATH.exists():
         # Create a default config file if it doesn't exist
@@ -51,14 +112,11 @@ def load_config() -> BackendConfig:
                 "default_model": "llama2"
             }
         }
-        with open(CONFIG_FILE_PATH, "w") as f:
-            json.dump(default_config_data, f, indent=4)
+        write_atomic(CONFIG_FILE_PATH, json.dumps(default_config_data, indent=4))
         return BackendConfig(**default_config_data)
         
     try:
-        with open(CONFIG_FILE_PATH, "r") as f:
-            data = json.load(f)
-            return BackendConfig(**data)
+        return read_config(CONFIG_FILE_PATH)
     except (json.JSONDecodeError, TypeError) as e:
         print(f"Warning: Could not decode JSON from {CONFIG_FILE_PATH} or it has incorrect structure. Error: {e}. Using default config.")
         return BackendConfig(llm={"provider": "ollama"}) # Basic default
@@ -66,7 +124,33 @@ def load_config() -> BackendConfig:
         print(f"Error loading config from {CONFIG_FILE_PATH}: {e}. Using default config.")
         return BackendConfig(llm={"provider": "ollama"}) # Basic default
 
+def write_atomic(path: Path, text: str):
+    """
+    Replaces `path` so that readers (and a crash) only ever see the old file or the complete new one:
+    write a temp file in the same directory, fsync it, rename it over the target, then fsync the directory.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode)) # mkstemp creates 0600; keep the user's mode
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"): # Make the rename itself durable (not possible on Windows)
+        dir_fd = os.open(path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
 def save_config(config: BackendConfig):
-    with open(CONFIG_FILE_PATH, "w") as f:
-        # Pydantic's model_dump is preferred for serialization
-        json.dump(config.model_dump(by_alias=True), f, indent=4)
+    # Pydantic's model_dump is preferred for serialization
+    write_atomic(CONFIG_FILE_PATH, json.dumps(config.model_dump(by_alias=True), indent=4))
@@ -1,18 +1,57 @@
-from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, List, Literal, Optional, Union
 import uvicorn
 import asyncio
+import io
 import json
+import threading
+import time
+import zlib
 import httpx
 from pathlib import Path
 
 from local_llm_backend.utils.process_manager import ProcessManager
-from local_llm_backend.config import load_config as default_load_config, save_config as default_save_config, BackendConfig, MinerConfig, CONFIG_FILE_PATH
-from local_llm_backend.services.system_monitor import get_system_stats as default_get_system_stats
+from local_llm_backend.config import load_config as default_load_config, save_config as default_save_config, BackendConfig, MinerConfig, CONFIG_FILE_PATH, read_config, resolve_jobs_dir
+from local_llm_backend.services.system_monitor import get_system_stats as default_get_system_stats, SystemStatsSampler, StatsHistory
 from local_llm_backend.services.llm_clients.base import LLMClient
 from local_llm_backend.services.llm_clients import get_llm_client
-from local_llm_backend.services.recipe_manager import get_recipes as default_get_recipes, read_recipe as default_read_recipe
+from local_llm_backend.services.model_catalog import ModelCatalog
+from local_llm_backend.services.live_events import live_events
+from local_llm_backend.services.completion_aggregator import CompletionAggregator
+from local_llm_backend.services.generation_registry import ActiveGeneration, GenerationRegistry, iterate_until_cancelled
+from local_llm_backend.services.scheduler import RequestScheduler, QueueFullError
+from local_llm_backend.services.response_cache import ResponseCache
+from local_llm_backend.services.job_runner import BatchJob, JobConflictError, JobManager
+from local_llm_backend.services.miner_telemetry import MinerTelemetry
+from local_llm_backend.services.process_stats import ProcessStatsCollector
+from local_llm_backend.services.gpu_arbiter import GpuArbiter
+from local_llm_backend.services.metrics import BackendMetrics, MetricsMiddleware, Gauge, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from local_llm_backend.services.config_writer import ConfigWriter
+from local_llm_backend.services.config_reload import ConfigFileWatcher, diff_config, CLIENT_SECTIONS
+from local_llm_backend.services.client_rotation import ClientRotation
+from local_llm_backend.utils.json_patch import apply_patch, JsonPatchError, JsonPatchConflict
+from local_llm_backend.services.recipe_search import RecipeSearchIndex
+from local_llm_backend.services.recipe_manager import (
+    get_recipes as default_get_recipes, read_recipe as default_read_recipe, render_recipe as default_render_recipe, RecipeParameterError,
+    recipe_index as default_recipe_index, RecipeIndex,
+)
+
+class CleanupStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse that calls `cleanup()` once it is finished with, however that happens. A body generator's
+    finally only runs if the body was started, which a client that disconnects early may never let happen.
+    """
+    def __init__(self, content, cleanup, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cleanup()
 
 # --- App Factory for Testability ---
 def create_app(
@@ -23,42 +62,246 @@ def create_app(
     get_system_stats_fn=default_get_system_stats,
     get_recipes_fn=default_get_recipes,
     read_recipe_fn=default_read_recipe,
+    render_recipe_fn=default_render_recipe,
+    search_recipes_fn=None, # search(q, limit, llm_clients, embedding_model); defaults to a search index over `recipe_index`
+    recipe_index: RecipeIndex = default_recipe_index, # Backs the default recipe functions; built at startup
+    config_path: Optional[Path] = CONFIG_FILE_PATH, # Watched for external edits; None disables reloading
 ):
     app = FastAPI(title="Local LLM Control Backend", version="1.0.0")
 
     app.state.process_manager = process_manager_instance if process_manager_instance is not None else ProcessManager()
+    app.state.generations = GenerationRegistry()
+    app.state.scheduler = RequestScheduler()
+    app.state.response_cache = ResponseCache()
+    app.state.jobs = JobManager()
+    app.state.config_writer = ConfigWriter(save_config_fn)
+    app.state.config_lock = asyncio.Lock() # Serialises read-modify-write config updates
+    app.state.config_watcher = None
+    app.state.recipe_index = recipe_index
+    if search_recipes_fn is None: # Follows the same index the /recipes listing serves
+        search_recipes_fn = RecipeSearchIndex(recipe_index).search
+    app.state.recipe_etag_prefix = f"{time.time_ns():x}" # Index versions restart with the process; ETags must not
+    app.state.llm_clients = ClientRotation()
+    app.state.ready_event = threading.Event() # Set once startup completes, cleared at shutdown; backs GET /ready
+    app.state.startup_seconds = None
+    app.state.miner_telemetry = {} # miner name -> MinerTelemetry, kept across restarts
+    app.state.process_stats = ProcessStatsCollector()
+    app.state.metrics = BackendMetrics()
+    app.state.metrics.add(Gauge("llm_active_generations", "Generations currently running.", (), lambda: {(): len(app.state.generations.active)}))
+    app.state.metrics.add(Gauge("llm_queue_depth", "Requests waiting for a scheduler slot.", (), lambda: {(): app.state.scheduler.queued}))
+    app.add_middleware(MetricsMiddleware, metrics=app.state.metrics)
+    app.state.gpu_arbiter = GpuArbiter(
+        app.state.process_manager,
+        is_busy=lambda: bool(app.state.generations.active) or app.state.scheduler.queued > 0,
+        get_miners=lambda: app.state.config.miners,
+        metrics=app.state.metrics,
+        on_resume=lambda miner_name: app.state.miner_telemetry[miner_name].mark_resumed() if miner_name in app.state.miner_telemetry else None,
+    )
+    app.state.metrics.add(Gauge(
+        "gpu_arbiter_ms_per_token", "Generation speed with miners hashing on the LLM's GPU (contended) and without.", ("contention",),
+        lambda: {(key,): value for key, value in app.state.gpu_arbiter.ms_per_token.items() if value is not None}))
+
+    def collect_system_stats():
+        """One sample: machine-wide stats plus the tree of every managed process and the LLM server."""
+        snapshot = dict(get_system_stats_fn())
+        tracked = {name: process.pid for name, process in list(app.state.process_manager.processes.items())}
+        llm_process_name = getattr(app.state.config.llm, "process_name", None)
+        snapshot["processes"] = app.state.process_stats.collect(tracked, {"llm_server": llm_process_name} if llm_process_name else None)
+        return snapshot
+
+    def stats_history_capacity(config: BackendConfig) -> int:
+        return int(config.stats_history_seconds / config.stats_sample_interval) + 1
+
+    async def update_config_watcher(interval: float):
+        """Starts, retunes or stops watching config.json for `config_reload_interval` (0 disables)."""
+        watcher = app.state.config_watcher
+        if config_path is None:
+            return
+        if interval > 0 and watcher is not None:
+            watcher.poll_interval = interval
+        elif interval > 0:
+            app.state.config_watcher = ConfigFileWatcher(config_path, reload_config_file, interval)
+            app.state.config_watcher.start()
+        elif watcher is not None:
+            app.state.config_watcher = None
+            await watcher.stop()
+
+    async def warm_up_llm_client(client: LLMClient):
+        try:
+            await asyncio.to_thread(client.warm_up)
+        except Exception as e:
+            print(f"LLM client warm-up failed: {e}")
 
     @app.on_event("startup")
     async def startup_event():
+        started = time.perf_counter()
         app.state.config = load_config_fn()
         if llm_client_instance:
-            app.state.llm_client = llm_client_instance
+            app.state.llm_clients.current = llm_client_instance
         else:
-            app.state.llm_client = get_llm_client(app.state.config.llm)
+            app.state.llm_clients.current = get_llm_client(app.state.config.llm, pool_config=app.state.config.http_pool)
+        app.state.model_catalog = ModelCatalog(app.state.llm_clients, ttl=app.state.config.model_catalog_ttl)
+        app.state.scheduler.configure(**app.state.config.scheduler.model_dump())
+        app.state.response_cache.configure(**app.state.config.response_cache.model_dump())
+        app.state.process_manager.configure_logs(app.state.config.miner_log_max_lines, app.state.config.miner_log_max_bytes)
+        app.state.stats_history = StatsHistory(stats_history_capacity(app.state.config))
+        app.state.stats_sampler = SystemStatsSampler(collect_system_stats, interval=app.state.config.stats_sample_interval, history=app.state.stats_history)
+        app.state.stats_sampler.start()
+        app.state.gpu_arbiter.configure(**app.state.config.gpu_arbitration.model_dump())
+        app.state.gpu_arbiter.start()
+        # Scan the recipes tree off the event loop, so no request ever pays for the first build
+        await asyncio.to_thread(app.state.recipe_index.ensure_built)
+        await asyncio.to_thread(app.state.recipe_index.start_watching) # Restarts it if an earlier shutdown stopped it
+        await update_config_watcher(app.state.config.config_reload_interval)
+        app.state.startup_seconds = time.perf_counter() - started
+        app.state.ready_event.set()
+        # Provider setup that doesn't need to block readiness (SDK imports, HTTP transport) happens in the background
+        app.state.warm_up_task = asyncio.create_task(warm_up_llm_client(app.state.llm_clients.current))
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        app.state.ready_event.clear()
+        await app.state.jobs.shutdown()
+        await app.state.gpu_arbiter.stop()
+        await app.state.stats_sampler.stop()
+        app.state.recipe_index.stop_watching()
+        if app.state.config_watcher:
+            await app.state.config_watcher.stop()
+        await app.state.config_writer.flush()
+        await app.state.llm_clients.close()
 
     @app.get("/config", response_model=BackendConfig)
     async def get_backend_config():
         return app.state.config
 
+    async def apply_config(new_config: BackendConfig, persist: bool = True) -> set:
+        """
+        Makes `new_config` live, reconfiguring only the parts that changed, and queues it to be
+        written to disk. Returns the names of the changed top-level sections.
+        """
+        changed = diff_config(app.state.config, new_config)
+        app.state.config = new_config
+        if not changed:
+            return changed
+        if persist:
+            app.state.config_writer.schedule(new_config)
+        if "model_catalog_ttl" in changed:
+            app.state.model_catalog.ttl = new_config.model_catalog_ttl
+        if "scheduler" in changed:
+            app.state.scheduler.configure(**new_config.scheduler.model_dump())
+        if "response_cache" in changed:
+            app.state.response_cache.configure(**new_config.response_cache.model_dump())
+        if "stats_sample_interval" in changed:
+            app.state.stats_sampler.interval = new_config.stats_sample_interval
+        if changed & {"stats_history_seconds", "stats_sample_interval"}:
+            capacity = stats_history_capacity(new_config)
+            if capacity != app.state.stats_history.capacity: # Keeps the newest samples that still fit
+                app.state.stats_history = app.state.stats_sampler.history = app.state.stats_history.resized(capacity)
+        if changed & {"miner_log_max_lines", "miner_log_max_bytes"}:
+            app.state.process_manager.configure_logs(new_config.miner_log_max_lines, new_config.miner_log_max_bytes)
+        if "gpu_arbitration" in changed:
+            app.state.gpu_arbiter.configure(**new_config.gpu_arbitration.model_dump())
+        if "config_reload_interval" in changed:
+            await update_config_watcher(new_config.config_reload_interval)
+        if changed & CLIENT_SECTIONS:
+            # Requests already running keep the client they started with; it is closed once they finish
+            app.state.model_catalog.invalidate()
+            await app.state.llm_clients.replace(get_llm_client(new_config.llm, pool_config=new_config.http_pool))
+        return changed
+
+    async def reload_config_file():
+        """Applies edits made to config.json outside the backend."""
+        try:
+            new_config = await asyncio.to_thread(read_config, config_path)
+        except Exception as e:
+            print(f"Ignoring invalid config file {config_path}: {e}")
+            return
+        async with app.state.config_lock:
+            if app.state.config_writer.busy:
+                return # A write of the live config is queued and will overwrite the file anyway
+            changed = await apply_config(new_config, persist=False)
+        if changed:
+            print(f"Reloaded {config_path}: {', '.join(sorted(changed))} changed.")
+
+    def patch_or_raise(document: Any, operations: List[Dict[str, Any]], model):
+        """Applies a JSON Patch and validates the result: 409 on a failed `test`, 400 on a bad patch, 422 on an invalid result."""
+        try:
+            return model(**apply_patch(document, operations))
+        except JsonPatchConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except JsonPatchError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=json.loads(e.json()))
+        except TypeError as e: # The patch replaced an object with a non-object
+            raise HTTPException(status_code=422, detail=str(e))
+
     @app.post("/config", response_model=BackendConfig)
     async def update_backend_config(new_config: BackendConfig):
-        save_config_fn(new_config)
-        app.state.config = new_config
-        app.state.llm_client = get_llm_client(app.state.config.llm)
-        return app.state.config
+        async with app.state.config_lock:
+            await apply_config(new_config)
+            return app.state.config
+
+    @app.patch("/config", response_model=BackendConfig)
+    async def patch_backend_config(operations: List[Dict[str, Any]]):
+        """RFC 6902 JSON Patch against the whole config, e.g. [{"op": "add", "path": "/miners/-", "value": {...}}]."""
+        async with app.state.config_lock:
+            new_config = patch_or_raise(app.state.config.model_dump(), operations, BackendConfig)
+            await apply_config(new_config)
+            return app.state.config
+
+    @app.patch("/config/miners/{miner_name}", response_model=MinerConfig)
+    async def patch_miner_config(miner_name: str, operations: List[Dict[str, Any]]):
+        """JSON Patch against one miner's entry; paths are relative to the miner, e.g. "/wallet"."""
+        async with app.state.config_lock:
+            miners = list(app.state.config.miners)
+            index = next((i for i, m in enumerate(miners) if m.name == miner_name), None)
+            if index is None:
+                raise HTTPException(status_code=404, detail=f"Miner '{miner_name}' not found in config.")
+            miner = patch_or_raise(miners[index].model_dump(), operations, MinerConfig)
+            if miner.name != miner_name and any(m.name == miner.name for m in miners):
+                raise HTTPException(status_code=409, detail=f"A miner named '{miner.name}' already exists.")
+            miners[index] = miner
+            await apply_config(app.state.config.model_copy(update={"miners": miners}))
+            return miner
 
     @app.get("/")
     async def read_root():
         return {"message": "Local LLM Control Backend is running!"}
 
+    @app.get("/ready")
+    async def get_readiness():
+        """200 once startup has completed (config loaded, LLM client and background samplers up), 503 otherwise."""
+        if not app.state.ready_event.is_set():
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Backend is starting up or shutting down.")
+        return {"status": "ready", "startup_ms": round(app.state.startup_seconds * 1000, 1), "provider": app.state.config.llm.provider}
+
     @app.get("/system/stats")
     async def get_system_statistics():
-        return get_system_stats_fn()
+        try:
+            return await app.state.stats_sampler.latest()
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="System stats are not available yet.")
+
+    @app.get("/system/stats/history")
+    async def get_system_statistics_history(since: Optional[float] = None, resolution: Optional[float] = None):
+        if resolution is not None and resolution <= 0:
+            raise HTTPException(status_code=400, detail="Resolution must be a positive number of seconds.")
+        return app.state.stats_history.query(since=since, resolution=resolution)
+
+    @app.get("/events")
+    async def stream_live_events(request: Request):
+        return StreamingResponse(
+            live_events(app.state.stats_sampler, collect_miner_statuses, request.is_disconnected),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+        )
 
     @app.post("/llm/start")
     async def start_llm_service():
         try:
-            await app.state.llm_client.get_models()
+            async with app.state.llm_clients.use() as llm_client:
+                await llm_client.health_check()
             return {"status": "LLM service is reachable", "message": f"Provider '{app.state.config.llm.provider}' is active."}
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"LLM service not reachable: {e}")
@@ -70,7 +313,8 @@ def create_app(
     @app.get("/llm/status")
     async def get_llm_status():
         try:
-            await app.state.llm_client.get_models()
+            async with app.state.llm_clients.use() as llm_client:
+                await llm_client.health_check()
             return {"status": "RUNNING", "message": f"LLM service '{app.state.config.llm.provider}' is reachable."}
         except Exception:
             return {"status": "STOPPED", "message": f"LLM service '{app.state.config.llm.provider}' is not reachable."}
@@ -80,34 +324,352 @@ def create_app(
         prompt: str
         stream: bool = False
         max_tokens: int = 100
+        temperature: Optional[float] = None
+        priority: Literal["interactive", "batch"] = "interactive"
+        cache: Literal["default", "bypass", "refresh"] = "default"
+
+    def build_options(max_tokens: int, temperature: Optional[float], stop: Optional[List[str]] = None) -> dict:
+        options = {"num_predict": max_tokens}
+        if temperature is not None:
+            options["temperature"] = temperature
+        if stop:
+            options["stop"] = stop
+        return options
+
+    async def check_response_cache(model: str, prompt: str, options: dict, cache_mode: str):
+        """Returns (cache_key, cached_ndjson, X-Cache header value) for a generation."""
+        response_cache = app.state.response_cache
+        if not response_cache.is_cacheable(options):
+            return None, None, None
+        if cache_mode == "bypass":
+            response_cache.bypasses += 1
+            return None, None, "BYPASS"
+        llm_config = app.state.config.llm
+        cache_key = response_cache.make_key(llm_config.provider, getattr(llm_config, "api_base", None), model, prompt, options)
+        if cache_mode == "refresh":
+            return cache_key, None, "REFRESH"
+        cached = await response_cache.get(cache_key)
+        return cache_key, cached, "HIT" if cached is not None else "MISS"
+
+    def aggregate_ndjson(model: str, ndjson: bytes) -> dict:
+        aggregator = CompletionAggregator(model)
+        for line in ndjson.decode("utf-8").splitlines():
+            aggregator.add(json.loads(line))
+        return aggregator.result()
+
+    def queue_full_exception(e: QueueFullError) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"message": str(e), "queue_position": e.queue_position, "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    async def acquire_lease(model: str, priority: str, wait_when_full: bool = False):
+        await app.state.gpu_arbiter.engage() # Free the GPU while we queue, not after
+        while True:
+            try:
+                lease = await app.state.scheduler.acquire(model, priority)
+                app.state.metrics.llm_queue_wait.observe(lease.wait_time, metric_model_label(model), priority)
+                return lease
+            except QueueFullError as e:
+                if not wait_when_full:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    def metric_model_label(model: str) -> str:
+        """`model` as a metric label. Names come from requests, so any the provider doesn't list share one label."""
+        catalog = app.state.model_catalog
+        if model == app.state.config.llm.default_model or catalog.knows(model):
+            return model
+        if not catalog.loaded and app.state.llm_clients.current:
+            catalog.refresh_in_background() # Leases the client itself for as long as the refresh runs
+        return "other"
+
+    def record_generation(endpoint: str, model: str, lease, completion: Optional[dict] = None, error: Optional[BaseException] = None, cancelled: bool = False):
+        """Feeds one finished generation into /metrics and the GPU arbiter's latency estimate."""
+        metrics = app.state.metrics
+        provider = app.state.config.llm.provider
+        model = metric_model_label(model)
+        if error is not None:
+            metrics.llm_generations.inc(provider, model, endpoint, "error")
+            metrics.llm_provider_errors.inc(provider, model, type(error).__name__)
+            return
+        metrics.llm_generations.inc(provider, model, endpoint, "cancelled" if cancelled else "ok")
+        if cancelled:
+            return
+        timing = completion["timing"]
+        tokens = completion["usage"].get("completion_tokens") or 0
+        if timing["time_to_first_token_ms"] is not None:
+            metrics.llm_ttft.observe(lease.wait_time + timing["time_to_first_token_ms"] / 1000, provider, model, endpoint)
+        metrics.llm_generation_seconds.observe(timing["total_ms"] / 1000, provider, model, endpoint)
+        if timing["tokens_per_second"]:
+            metrics.llm_tokens_per_second.observe(timing["tokens_per_second"], provider, model, endpoint)
+        metrics.llm_tokens.inc(provider, model, amount=tokens)
+        app.state.gpu_arbiter.record_generation(timing["total_ms"], tokens)
+
+    async def complete_generation(model: str, prompt: str, options: dict, priority: str = "interactive", cache_mode: str = "default", is_disconnected=None, wait_when_full: bool = False, endpoint: str = "/llm/generate"):
+        """Runs one non-streaming generation through the cache, scheduler and registry. Returns (completion, headers)."""
+        cache_key, cached, cache_status = await check_response_cache(model, prompt, options, cache_mode)
+        headers = {"X-Cache": cache_status} if cache_status else {}
+        if cached is not None:
+            return aggregate_ndjson(model, cached), headers
+        lease = await acquire_lease(model, priority, wait_when_full)
+        generation = app.state.generations.register(model)
+        headers.update({"X-Request-ID": generation.id, "X-Queue-Wait": f"{lease.wait_time:.3f}"})
+        recorded = io.StringIO() if cache_key is not None else None
+        client_lease = app.state.llm_clients.acquire()
+        try:
+            aggregator = CompletionAggregator(model)
+            upstream = client_lease.client.generate(model, prompt, stream=False, options=options)
+            async for chunk in iterate_until_cancelled(upstream, generation, is_disconnected):
+                aggregator.add(chunk)
+                if recorded is not None:
+                    recorded.write(json.dumps(chunk) + "\n")
+            if generation.cancelled:
+                aggregator.mark_cancelled()
+            elif recorded is not None:
+                await app.state.response_cache.put(cache_key, recorded.getvalue().encode("utf-8"))
+            completion = aggregator.result()
+            record_generation(endpoint, model, lease, completion, cancelled=generation.cancelled)
+            return completion, headers
+        except Exception as e:
+            record_generation(endpoint, model, lease, error=e)
+            raise
+        finally:
+            app.state.generations.unregister(generation.id)
+            lease.release()
+            client_lease.release()
 
     @app.post("/llm/generate")
-    async def generate_text_with_llm(request: LLMGenerationRequest):
-        if not app.state.llm_client:
+    async def generate_text_with_llm(request: LLMGenerationRequest, http_request: Request):
+        if not app.state.llm_clients.current:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="LLM client not initialized.")
+        options = build_options(request.max_tokens, request.temperature)
         try:
-            if request.stream:
-                async def stream_generator():
-                    async for chunk in app.state.llm_client.generate(request.model, request.prompt, stream=True, options={"num_predict": request.max_tokens}):
-                        yield json.dumps(chunk) + "\n"
-                return StreamingResponse(stream_generator(), media_type="application/json")
-            else:
-                # Aggregate the response from the async generator
-                response_chunks = [chunk async for chunk in app.state.llm_client.generate(request.model, request.prompt, stream=False, options={"num_predict": request.max_tokens})]
-                # Assuming the non-streamed response is the first (and only) chunk
-                return response_chunks[0] if response_chunks else {}
+            if not request.stream:
+                completion, headers = await complete_generation(request.model, request.prompt, options, request.priority, request.cache, http_request.is_disconnected)
+                return JSONResponse(completion, headers=headers)
+
+            cache_key, cached, cache_status = await check_response_cache(request.model, request.prompt, options, request.cache)
+            headers = {"X-Cache": cache_status} if cache_status else {}
+            if cached is not None:
+                async def replay_generator():
+                    for line in cached.decode("utf-8").splitlines(keepends=True):
+                        yield line
+                return StreamingResponse(replay_generator(), media_type="application/json", headers=headers)
+
+            lease = await acquire_lease(request.model, request.priority)
+            generation = client_lease = None
+            def release_stream():
+                # Idempotent: runs from the body's finally, or from the response if the body never started
+                if generation is not None:
+                    app.state.generations.unregister(generation.id)
+                if client_lease is not None:
+                    client_lease.release()
+                lease.release()
+            try:
+                generation = app.state.generations.register(request.model)
+                headers.update({"X-Request-ID": generation.id, "X-Queue-Wait": f"{lease.wait_time:.3f}"})
+                client_lease = app.state.llm_clients.acquire() # Held until the stream ends, even across a config change
+                upstream = client_lease.client.generate(request.model, request.prompt, stream=True, options=options)
+            except BaseException:
+                release_stream()
+                raise
+            # Chunks are recorded as the NDJSON they are served as, so a cache hit replays byte-for-byte
+            recorded = io.StringIO() if cache_key is not None else None
+            async def stream_generator():
+                aggregator = CompletionAggregator(request.model) # Timing and token counts only
+                try:
+                    async for chunk in iterate_until_cancelled(upstream, generation, http_request.is_disconnected):
+                        aggregator.add(chunk)
+                        line = json.dumps(chunk) + "\n"
+                        if recorded is not None:
+                            recorded.write(line)
+                        yield line
+                    if recorded is not None and not generation.cancelled:
+                        await app.state.response_cache.put(cache_key, recorded.getvalue().encode("utf-8"))
+                    if generation.cancel_reason == "cancelled":
+                        yield json.dumps({"id": generation.id, "choices": [{"index": 0, "delta": {}, "finish_reason": "cancelled"}]}) + "\n"
+                    record_generation("/llm/generate", request.model, lease, aggregator.result(), cancelled=generation.cancelled)
+                except Exception as e:
+                    record_generation("/llm/generate", request.model, lease, error=e)
+                    raise
+                finally:
+                    release_stream()
+            return CleanupStreamingResponse(stream_generator(), release_stream, media_type="application/json", headers=headers)
+        except QueueFullError as e:
+            raise queue_full_exception(e)
         except httpx.RequestError as e:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not connect to LLM service: {e}")
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error during LLM generation: {e}")
 
+    class LLMBatchRequest(BaseModel):
+        model: Optional[str] = None # Defaults to the recipe's model, then the configured default
+        prompts: Optional[List[str]] = None
+        recipe: Optional[str] = None # "category/name"; each input renders the recipe template
+        inputs: Optional[List[Union[str, Dict[str, Any]]]] = None # A string fills the implicit `input` parameter
+        max_tokens: Optional[int] = None
+        temperature: Optional[float] = None
+        concurrency: Optional[int] = None
+
+    def render_or_raise(category: str, name: str, params: Optional[Dict[str, Any]]) -> dict:
+        try:
+            rendered = render_recipe_fn(category, name, params)
+        except RecipeParameterError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not rendered:
+            raise HTTPException(status_code=404, detail=f"Recipe '{name}' not found in category '{category}'.")
+        return rendered
+
+    def resolve_batch_items(request: LLMBatchRequest):
+        """
+        Returns (item count, render) for a batch request, where render(index) gives that item's prompt and
+        recipe defaults. Recipe inputs are rendered by the worker that runs them, so a bad input fails only its own result.
+        """
+        if request.prompts is not None:
+            return len(request.prompts), lambda index: (request.prompts[index], {})
+        if not request.recipe or request.inputs is None or "/" not in request.recipe:
+            raise HTTPException(status_code=400, detail="Provide either 'prompts' or a 'recipe' ('category/name') with 'inputs'.")
+        category, name = request.recipe.split("/", 1)
+        if not read_recipe_fn(category, name):
+            raise HTTPException(status_code=404, detail=f"Recipe '{name}' not found in category '{category}'.")
+
+        def render(index: int):
+            item = request.inputs[index]
+            rendered = render_recipe_fn(category, name, item if isinstance(item, dict) else {"input": item})
+            if not rendered:
+                raise LookupError(f"Recipe '{name}' not found in category '{category}'.") # Deleted mid-batch
+            return rendered["prompt"], rendered
+        return len(request.inputs), render
+
+    @app.post("/llm/generate/batch")
+    async def generate_batch_with_llm(request: LLMBatchRequest, http_request: Request):
+        if not app.state.llm_clients.current:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="LLM client not initialized.")
+        count, render = resolve_batch_items(request)
+        concurrency = max(1, min(request.concurrency or app.state.config.batch_concurrency, app.state.config.batch_concurrency))
+
+        async def batch_generator():
+            items = iter(range(count))
+            results = asyncio.Queue()
+
+            async def worker():
+                for index in items: # Shared iterator: each worker pulls the next unclaimed input
+                    try:
+                        prompt, defaults = render(index)
+                        model = request.model or defaults.get("model") or app.state.config.llm.default_model
+                        options = build_options(request.max_tokens or defaults.get("max_tokens") or 100, request.temperature, defaults.get("stop"))
+                        completion, _ = await complete_generation(model, prompt, options, priority="batch", wait_when_full=True, endpoint="/llm/generate/batch")
+                        await results.put({"index": index, "status": "ok", "result": completion})
+                    except Exception as e: # Includes RecipeParameterError from rendering this input
+                        await results.put({"index": index, "status": "error", "error": f"{type(e).__name__}: {e}"})
+
+            workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, count))]
+            try:
+                for _ in range(count):
+                    yield json.dumps(await results.get()) + "\n"
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        return StreamingResponse(batch_generator(), media_type="application/x-ndjson")
+
+
+    @app.get("/llm/requests")
+    async def list_llm_requests():
+        return app.state.generations.list()
+
+    @app.get("/llm/scheduler")
+    async def get_scheduler_metrics():
+        return app.state.scheduler.metrics()
+
+    @app.get("/metrics")
+    async def get_metrics():
+        return Response(app.state.metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+    @app.get("/system/gpu_arbitration")
+    async def get_gpu_arbitration_metrics():
+        return app.state.gpu_arbiter.metrics()
+
+    @app.get("/llm/cache")
+    async def get_response_cache_stats():
+        return app.state.response_cache.stats()
+
+    @app.delete("/llm/cache")
+    async def clear_response_cache():
+        await app.state.response_cache.clear()
+        return {"status": "Response cache cleared."}
+
+    @app.delete("/llm/requests/{request_id}")
+    async def cancel_llm_request(request_id: str):
+        if not app.state.generations.cancel(request_id):
+            raise HTTPException(status_code=404, detail=f"No in-flight request with id '{request_id}'.")
+        return {"status": "cancelling", "id": request_id}
+
+    class BatchJobRequest(BaseModel):
+        input_path: str
+        output_path: str
+        model: Optional[str] = None
+        concurrency: Optional[int] = None
+        max_tokens: int = 100
+
+    def resolve_job_path(path: str) -> Path:
+        """Resolves a job file under the jobs directory, rejecting anything (absolute, `..`, symlinked) outside it."""
+        jobs_dir = resolve_jobs_dir(app.state.config)
+        resolved = (jobs_dir / path).resolve()
+        if resolved == jobs_dir or not resolved.is_relative_to(jobs_dir):
+            raise HTTPException(status_code=400, detail=f"Job path '{path}' must be a file inside the jobs directory.")
+        return resolved
+
+    @app.post("/jobs")
+    async def submit_batch_job(request: BatchJobRequest):
+        input_path, output_path = resolve_job_path(request.input_path), resolve_job_path(request.output_path)
+        if not await asyncio.to_thread(input_path.is_file):
+            raise HTTPException(status_code=400, detail=f"Input file '{request.input_path}' not found.")
+        async def generate(model, prompt, options):
+            completion, _ = await complete_generation(model, prompt, options, priority="batch", wait_when_full=True, endpoint="/jobs")
+            return completion
+        job = BatchJob(
+            str(input_path),
+            str(output_path),
+            generate,
+            model=request.model or app.state.config.llm.default_model,
+            concurrency=min(request.concurrency or app.state.config.batch_concurrency, app.state.config.batch_concurrency),
+            max_tokens=request.max_tokens,
+        )
+        try:
+            return app.state.jobs.submit(job).summary()
+        except JobConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    @app.get("/jobs")
+    async def list_batch_jobs():
+        return [job.summary() for job in app.state.jobs.jobs.values()]
+
+    @app.get("/jobs/{job_id}")
+    async def get_batch_job(job_id: str):
+        job = app.state.jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+        return job.summary()
+
+    @app.delete("/jobs/{job_id}")
+    async def cancel_batch_job(job_id: str):
+        job = app.state.jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+        if not job.cancel():
+            raise HTTPException(status_code=400, detail=f"Job '{job_id}' is not running.")
+        return {"status": "cancelling", "id": job_id}
+
     @app.get("/llm/models")
     async def list_llm_models():
-        if not app.state.llm_client:
+        if not app.state.llm_clients.current:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="LLM client not initialized.")
         try:
-            models = await app.state.llm_client.get_models()
-            return models
+            return await app.state.model_catalog.get_models()
         except httpx.RequestError as e:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not connect to LLM service: {e}")
 
@@ -115,29 +677,67 @@ def create_app(
         model_name: str
 
     @app.post("/llm/pull")
-    async def pull_llm_model(request: LLMPullRequest):
-        if not app.state.llm_client:
+    async def pull_llm_model(request: LLMPullRequest, http_request: Request):
+        if not app.state.llm_clients.current:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="LLM client not initialized.")
         try:
+            # Registered and leased only once the body runs, so a response that is never streamed holds nothing
+            generation = ActiveGeneration(request.model_name, "pull")
             async def pull_generator():
-                async for chunk in app.state.llm_client.pull_model(request.model_name):
-                    yield json.dumps(chunk) + "\n"
-            return StreamingResponse(pull_generator(), media_type="application/json")
+                app.state.generations.add(generation)
+                client_lease = app.state.llm_clients.acquire()
+                try:
+                    upstream = client_lease.client.pull_model(request.model_name)
+                    async for chunk in iterate_until_cancelled(upstream, generation, http_request.is_disconnected):
+                        yield json.dumps(chunk) + "\n"
+                finally:
+                    app.state.generations.unregister(generation.id)
+                    client_lease.release()
+                    app.state.model_catalog.invalidate()
+            return StreamingResponse(pull_generator(), media_type="application/json", headers={"X-Request-ID": generation.id})
         except httpx.RequestError as e:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not connect to LLM service: {e}")
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error pulling LLM model: {e}")
 
+    def recipe_etag(http_request: Request) -> str:
+        """ETag for a recipe response: the index version (read before the payload) plus the query, no serialising or hashing."""
+        query = http_request.url.query
+        suffix = f"-{zlib.crc32(query.encode('utf-8')):08x}" if query else ""
+        return f'"{app.state.recipe_etag_prefix}-{app.state.recipe_index.version}{suffix}"'
+
+    def conditional_json(etag: str, payload_fn, http_request: Request) -> Response:
+        """Answers 304 when the client already has `etag`; only otherwise builds and serialises the payload."""
+        if etag in http_request.headers.get("if-none-match", ""):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        body = json.dumps(payload_fn(), separators=(",", ":")).encode("utf-8")
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
     @app.get("/recipes")
-    async def get_all_recipes():
-        return get_recipes_fn()
+    async def get_all_recipes(http_request: Request):
+        return conditional_json(recipe_etag(http_request), get_recipes_fn, http_request)
+
+    @app.get("/recipes/search")
+    async def search_all_recipes(q: str, limit: int = 10):
+        if not q.strip() or limit <= 0:
+            raise HTTPException(status_code=400, detail="'q' must be non-empty and 'limit' positive.")
+        # Passed the rotation rather than a client: embedding leases a client for as long as it runs
+        return await search_recipes_fn(q, min(limit, 100), app.state.llm_clients, app.state.config.recipe_search.embedding_model)
 
     @app.get("/recipes/{category}/{name}")
-    async def get_single_recipe(category: str, name: str):
+    async def get_single_recipe(category: str, name: str, http_request: Request):
+        etag = recipe_etag(http_request)
         recipe = read_recipe_fn(category, name)
         if not recipe:
             raise HTTPException(status_code=404, detail=f"Recipe '{name}' not found in category '{category}'.")
-        return recipe
+        return conditional_json(etag, lambda: recipe, http_request)
+
+    class RecipeRenderRequest(BaseModel):
+        params: Dict[str, Any] = {}
+
+    @app.post("/recipes/{category}/{name}/render")
+    async def render_single_recipe(category: str, name: str, request: RecipeRenderRequest):
+        return render_or_raise(category, name, request.params)
 
     @app.post("/miner/start/{miner_name}")
     async def start_miner(miner_name: str):
@@ -161,40 +761,81 @@ def create_app(
         if miner_config.device is not None:
             command_args.extend(["-d", str(miner_config.device)])
         final_command = command_args
-        if app.state.process_manager.start_process(f"miner_{miner_name}", final_command, cwd=str(Path(miner_config.miner_path).parent)):
+        telemetry = app.state.miner_telemetry.setdefault(miner_name, MinerTelemetry())
+        # Live readings reset on each spawn (restarts too), never on a rejected duplicate start
+        if app.state.process_manager.start_process(
+            f"miner_{miner_name}", final_command, cwd=str(Path(miner_config.miner_path).parent),
+            on_output=telemetry.feed, auto_restart=miner_config.auto_restart, on_start=telemetry.mark_started,
+        ):
             return {"status": f"Miner '{miner_name}' starting", "message": f"Miner process started with PID {app.state.process_manager.processes[f'miner_{miner_name}'].pid}"}
         raise HTTPException(status_code=400, detail=f"Failed to start miner '{miner_name}' or already running.")
 
     @app.post("/miner/stop/{miner_name}")
     async def stop_miner(miner_name: str):
-        if app.state.process_manager.stop_process(f"miner_{miner_name}"):
+        # Stopping waits out the SIGTERM grace period, so keep it off the event loop
+        if await asyncio.to_thread(app.state.process_manager.stop_process, f"miner_{miner_name}"):
             return {"status": f"Miner '{miner_name}' stopped"}
         raise HTTPException(status_code=400, detail=f"Failed to stop miner '{miner_name}' or not running.")
 
     @app.post("/miner/stop_all")
     async def stop_all_miners():
-        stopped_miners = []
-        for miner_name_key in list(app.state.process_manager.processes.keys()):
-            if miner_name_key.startswith("miner_"):
-                if app.state.process_manager.stop_process(miner_name_key):
-                    stopped_miners.append(miner_name_key.replace("miner_", ""))
+        names = [name for name in list(app.state.process_manager.processes.keys()) if name.startswith("miner_")]
+        results = await asyncio.to_thread(app.state.process_manager.stop_processes, names) if names else {}
+        stopped_miners = [name.replace("miner_", "", 1) for name, stopped in results.items() if stopped]
         if stopped_miners:
             return {"status": "All configured miners stopped", "stopped_miners": stopped_miners}
         return {"status": "No miners were running or configured to stop."}
 
+    def miner_log_or_404(miner_name: str):
+        log = app.state.process_manager.get_process_log(f"miner_{miner_name}")
+        if log is None:
+            raise HTTPException(status_code=404, detail=f"No output captured for miner '{miner_name}'.")
+        return log
+
+    @app.get("/miner/logs/{miner_name}")
+    async def get_miner_logs(miner_name: str, tail: int = 200, stream: Optional[Literal["stdout", "stderr"]] = None):
+        log = miner_log_or_404(miner_name)
+        return {"name": miner_name, "lines": log.tail(max(tail, 0), stream=stream)}
+
+    @app.get("/miner/logs/{miner_name}/follow")
+    async def follow_miner_logs(miner_name: str, request: Request, tail: int = 50):
+        log = miner_log_or_404(miner_name)
+
+        async def log_generator():
+            async for entry in log.follow(max(tail, 0), request.is_disconnected):
+                yield json.dumps(entry) + "\n"
+
+        return StreamingResponse(log_generator(), media_type="application/x-ndjson")
+
+    def miner_status_entry(miner_name: str, history: bool = False) -> dict:
+        entry = app.state.process_manager.get_process_info(f"miner_{miner_name}")
+        status = entry["status"]
+        telemetry = app.state.miner_telemetry.get(miner_name)
+        snapshot = app.state.stats_sampler.peek() or {}
+        entry["resources"] = snapshot.get("processes", {}).get(f"miner_{miner_name}")
+        if telemetry is not None:
+            entry["telemetry"] = telemetry.snapshot()
+            # A running miner that stopped reporting hashrate is otherwise indistinguishable from a healthy one
+            entry["stalled"] = status == "RUNNING" and telemetry.is_stalled()
+            if history:
+                entry["history"] = telemetry.series()
+        return entry
+
     @app.get("/miner/status/{miner_name}")
-    async def get_miner_status(miner_name: str):
-        status = app.state.process_manager.get_process_status(f"miner_{miner_name}")
-        return {"status": status}
+    async def get_miner_status(miner_name: str, history: bool = False):
+        return miner_status_entry(miner_name, history)
 
-    @app.get("/miner/all_status")
-    async def get_all_miner_status():
+    def collect_miner_statuses():
         config = app.state.config
         all_statuses = {}
         for miner in config.miners:
             all_statuses[miner.name] = app.state.process_manager.get_process_status(f"miner_{miner.name}")
         return all_statuses
 
+    @app.get("/miner/all_status")
+    async def get_all_miner_status(history: bool = False):
+        return {miner.name: miner_status_entry(miner.name, history) for miner in app.state.config.miners}
+
     return app
 
 app = create_app()
@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+class ClientLease:
+    """One in-flight use of an LLM client. Release it when the request (or stream) is done."""
+    __slots__ = ("client", "_rotation", "_released")
+
+    def __init__(self, client: Any, rotation: "ClientRotation"):
+        self.client = client
+        self._rotation = rotation
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._rotation._release(self.client)
+
+class ClientRotation:
+    """
+    Holds the active LLM client and retires replaced ones gracefully.
+
+    Requests take a lease on the client they start with, so swapping in a new client only affects
+    requests that start afterwards. A replaced client is closed as soon as its last lease is
+    released, or after `drain_timeout` seconds if a stream never finishes.
+    """
+    def __init__(self, drain_timeout: float = 300.0):
+        self.current: Optional[Any] = None
+        self.drain_timeout = drain_timeout
+        self._in_flight: Dict[int, int] = {} # id(client) -> active leases
+        self._idle: Dict[int, asyncio.Event] = {} # Set when a retiring client's last lease is released
+        self._retiring: Dict[int, Any] = {}
+        self._draining: Set[asyncio.Task] = set()
+
+    def acquire(self) -> ClientLease:
+        client = self.current
+        self._in_flight[id(client)] = self._in_flight.get(id(client), 0) + 1
+        return ClientLease(client, self)
+
+    @contextlib.asynccontextmanager
+    async def use(self) -> AsyncIterator[Any]:
+        lease = self.acquire()
+        try:
+            yield lease.client
+        finally:
+            lease.release()
+
+    def in_flight(self, client: Any) -> int:
+        return self._in_flight.get(id(client), 0)
+
+    def _release(self, client: Any):
+        key = id(client)
+        remaining = self._in_flight.get(key, 0) - 1
+        if remaining > 0:
+            self._in_flight[key] = remaining
+            return
+        self._in_flight.pop(key, None)
+        if key in self._idle:
+            self._idle[key].set()
+
+    async def replace(self, client: Any):
+        """Makes `client` current and retires the previous one."""
+        old, self.current = self.current, client
+        if old is not None and old is not client:
+            await self.retire(old)
+
+    async def retire(self, client: Any):
+        if self.in_flight(client) == 0:
+            await self._close(client)
+            return
+        self._idle[id(client)] = asyncio.Event()
+        self._retiring[id(client)] = client
+        task = asyncio.create_task(self._drain(client))
+        self._draining.add(task)
+        task.add_done_callback(self._draining.discard)
+
+    async def _drain(self, client: Any):
+        try:
+            await asyncio.wait_for(self._idle[id(client)].wait(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"Closing replaced LLM client with {self.in_flight(client)} request(s) still in flight after {self.drain_timeout}s.")
+        finally:
+            self._idle.pop(id(client), None)
+            if self._retiring.pop(id(client), None) is not None:
+                await self._close(client)
+
+    @staticmethod
+    async def _close(client: Any):
+        try:
+            await client.aclose()
+        except Exception as e:
+            print(f"Error closing LLM client: {e}")
+
+    async def close(self):
+        """Shutdown: stop waiting on retiring clients and close everything."""
+        for task in list(self._draining):
+            task.cancel()
+        await asyncio.gather(*self._draining, return_exceptions=True)
+        for key in list(self._retiring): # Drains cancelled before they got to run
+            await self._close(self._retiring.pop(key))
+        if self.current is not None:
+            await self._close(self.current)
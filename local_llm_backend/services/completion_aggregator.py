@@ -0,0 +1,79 @@
+import io
+import time
+from typing import Any, Dict, Optional
+
+class CompletionAggregator:
+    """
+    Folds OpenAI-style `chat.completion.chunk` dicts into a single `chat.completion` object.
+
+    Content is appended to one growing text buffer per choice rather than keeping the chunks,
+    so memory is proportional to the generated text only.
+    """
+    def __init__(self, model: str):
+        self.model = model
+        self.id: Optional[str] = None
+        self.created: Optional[int] = None
+        self.usage: Optional[Dict[str, Any]] = None
+        self._buffers: Dict[int, io.StringIO] = {}
+        self._roles: Dict[int, str] = {}
+        self._finish_reasons: Dict[int, Optional[str]] = {}
+        self._content_chunks = 0
+        self._started = time.perf_counter()
+        self._first_token_at: Optional[float] = None
+
+    def add(self, chunk: Dict[str, Any]):
+        self.id = self.id or chunk.get("id")
+        self.created = self.created or chunk.get("created")
+        self.model = chunk.get("model") or self.model
+        if chunk.get("usage"):
+            self.usage = chunk["usage"]
+        for choice in chunk.get("choices", []):
+            index = choice.get("index", 0)
+            delta = choice.get("delta") or choice.get("message") or {}
+            buffer = self._buffers.get(index)
+            if buffer is None:
+                buffer = self._buffers[index] = io.StringIO()
+            if delta.get("role"):
+                self._roles[index] = delta["role"]
+            content = delta.get("content")
+            if content:
+                if self._first_token_at is None:
+                    self._first_token_at = time.perf_counter()
+                buffer.write(content)
+                self._content_chunks += 1
+            if choice.get("finish_reason"):
+                self._finish_reasons[index] = choice["finish_reason"]
+
+    def mark_cancelled(self):
+        for index in self._buffers:
+            self._finish_reasons[index] = "cancelled"
+
+    def result(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        usage = self.usage or {
+            # Providers that don't report usage stream roughly one token per chunk
+            "prompt_tokens": None,
+            "completion_tokens": self._content_chunks,
+            "total_tokens": None,
+        }
+        completion_tokens = usage.get("completion_tokens") or 0
+        return {
+            "id": self.id,
+            "object": "chat.completion",
+            "created": self.created or int(time.time()),
+            "model": self.model,
+            "choices": [
+                {
+                    "index": index,
+                    "message": {"role": self._roles.get(index, "assistant"), "content": buffer.getvalue()},
+                    "finish_reason": self._finish_reasons.get(index),
+                }
+                for index, buffer in sorted(self._buffers.items())
+            ],
+            "usage": usage,
+            "timing": {
+                "total_ms": round(elapsed * 1000, 2),
+                "time_to_first_token_ms": round((self._first_token_at - self._started) * 1000, 2) if self._first_token_at else None,
+                "tokens_per_second": round(completion_tokens / elapsed, 2) if elapsed > 0 else None,
+            },
+        }
@@ -0,0 +1,72 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+# Sections that require a new provider client when they change; everything else is reconfigured in place
+CLIENT_SECTIONS = frozenset({"llm", "http_pool"})
+
+def diff_config(old: Optional[BaseModel], new: BaseModel) -> Set[str]:
+    """Names of the top-level config fields whose values differ between `old` and `new`."""
+    new_values = new.model_dump()
+    if old is None:
+        return set(new_values)
+    # Compare plain values rather than models, which only compare equal when their classes are identical
+    old_values = old.model_dump()
+    return {name for name, value in new_values.items() if old_values.get(name) != value}
+
+class ConfigFileWatcher:
+    """
+    Polls a config file and calls `on_change()` when it is edited outside the backend.
+
+    Changes are detected by (mtime, size) so a poll is a single stat(). The backend's own writes
+    trigger it too. That is harmless because the reloaded config diffs as unchanged.
+    """
+    def __init__(self, path: Path, on_change: Callable[[], Awaitable[Any]], poll_interval: float = 2.0):
+        self.path = Path(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._signature: Optional[Tuple[int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            result = os.stat(self.path)
+        except OSError:
+            return None # Missing or being replaced; keep the current config
+        return result.st_mtime_ns, result.st_size
+
+    def check(self) -> bool:
+        """True if the file changed since the last check."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        changed = self._signature is not None
+        self._signature = signature
+        return changed
+
+    def start(self):
+        self._signature = self._stat()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is None or task is asyncio.current_task():
+            return # Stopped from inside on_change(): the loop exits once that returns
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        while self._task is asyncio.current_task():
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if self.check():
+                    await self.on_change()
+            except Exception as e:
+                print(f"Error reloading {self.path}: {e}")
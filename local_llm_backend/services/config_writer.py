@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Any, Callable, Optional
+
+class ConfigWriter:
+    """
+    Persists the config in the background so request handlers never wait on disk.
+
+    The in-memory config is the source of truth; `schedule()` only records the latest version to
+    write. Saves requested in quick succession are coalesced: the write happens once no new save has
+    been requested for `debounce` seconds, or `max_delay` after the first one, whichever is sooner.
+    The save function runs in a worker thread.
+    """
+    def __init__(self, save_fn: Callable[[Any], None], debounce: float = 0.5, max_delay: float = 2.0):
+        self.save_fn = save_fn
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.pending: Optional[Any] = None
+        self._first_request: Optional[float] = None
+        self._last_request = 0.0
+        self._flushing = False
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.requests = 0
+        self.writes = 0
+        self.last_error: Optional[str] = None
+
+    def schedule(self, config: Any):
+        self.pending = config
+        self.requests += 1
+        self._last_request = time.monotonic()
+        if self._first_request is None:
+            self._first_request = self._last_request
+        self._wake.set() # Re-evaluate the deadline
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    @property
+    def busy(self) -> bool:
+        """True while a write is pending or in progress, i.e. the file may lag behind memory."""
+        return self.pending is not None or (self._task is not None and not self._task.done())
+
+    def _deadline(self) -> float:
+        if self._flushing:
+            return 0.0
+        return min(self._last_request + self.debounce, self._first_request + self.max_delay)
+
+    async def _run(self):
+        while self.pending is not None:
+            while (remaining := self._deadline() - time.monotonic()) > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            config, self.pending, self._first_request = self.pending, None, None
+            try:
+                await asyncio.to_thread(self.save_fn, config)
+                self.writes += 1
+                self.last_error = None
+            except Exception as e:
+                # Nothing is lost: the config stays live in memory and the next save retries the write
+                self.last_error = str(e)
+                print(f"Error saving config: {e}")
+
+    async def flush(self):
+        """Writes any pending config now and waits for it, e.g. before shutdown."""
+        if self._task is None or self._task.done():
+            return
+        self._flushing = True
+        self._wake.set()
+        try:
+            await self._task
+        finally:
+            self._flushing = False
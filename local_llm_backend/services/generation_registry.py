@@ -0,0 +1,101 @@
+import asyncio
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+class ActiveGeneration:
+    def __init__(self, model: str, kind: str):
+        self.id = uuid.uuid4().hex
+        self.model = model
+        self.kind = kind
+        self.started_at = time.time()
+        self.cancel_event = asyncio.Event()
+        self.cancel_reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        self.cancel_reason = self.cancel_reason or reason
+        self.cancel_event.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "model": self.model,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "elapsed": round(time.time() - self.started_at, 3),
+            "cancelled": self.cancelled,
+        }
+
+class GenerationRegistry:
+    """Tracks in-flight provider requests so they can be listed and aborted by id."""
+    def __init__(self):
+        self.active: Dict[str, ActiveGeneration] = {}
+
+    def register(self, model: str, kind: str = "generate") -> ActiveGeneration:
+        return self.add(ActiveGeneration(model, kind))
+
+    def add(self, generation: ActiveGeneration) -> ActiveGeneration:
+        """Registers a generation created earlier, e.g. so its id can go in response headers before it starts."""
+        self.active[generation.id] = generation
+        return generation
+
+    def unregister(self, generation_id: str):
+        self.active.pop(generation_id, None)
+
+    def cancel(self, generation_id: str) -> bool:
+        generation = self.active.get(generation_id)
+        if generation is None:
+            return False
+        generation.cancel("cancelled")
+        return True
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [generation.to_dict() for generation in self.active.values()]
+
+async def iterate_until_cancelled(
+    source: AsyncIterator[Dict[str, Any]],
+    generation: ActiveGeneration,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    poll_interval: float = 0.5,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Re-yields chunks from `source` until it ends, the generation is cancelled, or the client
+    disconnects. The disconnect check only runs while waiting on a slow chunk, so steady
+    streams pay nothing extra. On exit the upstream generator is closed, which closes its
+    provider connection.
+    """
+    cancel_waiter = asyncio.ensure_future(generation.cancel_event.wait())
+    pending = None
+    try:
+        while not generation.cancelled:
+            pending = asyncio.ensure_future(source.__anext__())
+            while True:
+                done, _ = await asyncio.wait({pending, cancel_waiter}, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                if pending in done or generation.cancelled:
+                    break
+                if is_disconnected is not None and await is_disconnected():
+                    generation.cancel("client_disconnected")
+                    break
+            if not pending.done():
+                break
+            try:
+                chunk = pending.result()
+            except StopAsyncIteration:
+                return
+            pending = None
+            yield chunk
+    finally:
+        cancel_waiter.cancel()
+        if pending is not None and not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, Exception):
+                pass
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
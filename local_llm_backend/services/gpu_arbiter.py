@@ -0,0 +1,212 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+class GpuArbiter:
+    """
+    Pauses or throttles miners that share a GPU with the LLM while generations are running or queued.
+
+    `is_busy()` reports LLM activity (active generations or a non-empty scheduler queue) and
+    `get_miners()` returns the configured miners. In "pause" mode the affected miners are suspended
+    until the LLM has been idle for `idle_grace_seconds`; in "throttle" mode they are duty-cycled,
+    running for `throttle_duty` of every `throttle_period` seconds. Suspending uses the process
+    manager, so a miner keeps its pool connection and DAG and picks up where it left off. Signalling
+    a process tree can block, so it runs in a worker thread; `_lock` keeps transitions in order.
+    `on_resume(name)` is called for each miner resumed, e.g. to restart its stall clock.
+
+    Generation speed is tracked separately for contended runs (a miner was hashing on the LLM's GPU)
+    and uncontended ones, which gives an estimate of the inference time each arbitration saved.
+    """
+    def __init__(
+        self,
+        process_manager,
+        is_busy: Callable[[], bool],
+        get_miners: Callable[[], List[Any]],
+        enabled: bool = False,
+        mode: str = "pause",
+        llm_devices: Optional[List[int]] = None,
+        idle_grace_seconds: float = 30.0,
+        throttle_duty: float = 0.25,
+        throttle_period: float = 2.0,
+        tick: float = 0.25,
+        metrics=None,
+        on_resume: Optional[Callable[[str], None]] = None,
+    ):
+        self.process_manager = process_manager
+        self.is_busy = is_busy
+        self.get_miners = get_miners
+        self.tick = tick
+        self.backend_metrics = metrics # BackendMetrics, when the counters should also go to /metrics
+        self.on_resume = on_resume
+        self.configure(enabled, mode, llm_devices, idle_grace_seconds, throttle_duty, throttle_period)
+        self.paused: Dict[str, float] = {} # process name -> monotonic time it was suspended
+        self.engaged = False
+        self._last_busy = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        # Metrics
+        self.pause_events = 0
+        self.resume_events = 0
+        self.paused_seconds = 0.0
+        self.ms_per_token = {"contended": None, "uncontended": None} # EWMAs
+        self.estimated_saved_ms = 0.0
+        self.events: deque = deque(maxlen=50)
+
+    def configure(self, enabled: bool, mode: str, llm_devices: Optional[List[int]], idle_grace_seconds: float, throttle_duty: float, throttle_period: float):
+        self.enabled = enabled
+        self.mode = mode
+        self.llm_devices = list(llm_devices) if llm_devices is not None else [0]
+        self.idle_grace_seconds = idle_grace_seconds
+        self.throttle_duty = min(max(throttle_duty, 0.0), 1.0)
+        self.throttle_period = throttle_period
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.release("shutdown") # Never leave a miner frozen behind us
+
+    def targets(self) -> List[str]:
+        """Process names of running miners on a GPU the LLM uses (a miner without a device uses all of them)."""
+        names = []
+        for miner in self.get_miners():
+            if miner.device is not None and miner.device not in self.llm_devices:
+                continue
+            name = f"miner_{miner.name}"
+            process = self.process_manager.processes.get(name)
+            if process is not None and process.poll() is None:
+                names.append(name)
+        return names
+
+    def _record_event(self, action: str, names: List[str], reason: str):
+        self.events.append({"time": time.time(), "action": action, "miners": [n.replace("miner_", "", 1) for n in names], "reason": reason})
+        if self.backend_metrics is not None:
+            self.backend_metrics.gpu_arbiter_events.inc(action)
+
+    async def _suspend(self, names: List[str]) -> List[str]:
+        names = [name for name in names if name not in self.paused]
+        if not names:
+            return []
+        suspended = await asyncio.to_thread(lambda: [name for name in names if self.process_manager.suspend_process(name)])
+        now = time.monotonic()
+        for name in suspended:
+            self.paused[name] = now
+        return suspended
+
+    async def _resume(self, names: List[str]) -> List[str]:
+        now = time.monotonic()
+        resuming = []
+        for name in names:
+            started = self.paused.pop(name, None)
+            if started is None:
+                continue
+            self.paused_seconds += now - started
+            resuming.append(name)
+        if not resuming:
+            return []
+        await asyncio.to_thread(lambda: [self.process_manager.resume_process(name) for name in resuming])
+        if self.on_resume is not None:
+            for name in resuming:
+                self.on_resume(name.replace("miner_", "", 1))
+        return resuming
+
+    async def engage(self, reason: str = "llm_request"):
+        """Called when an LLM request arrives, so miners yield before the first token rather than on the next tick."""
+        self._last_busy = time.monotonic()
+        if not self.enabled:
+            return
+        async with self._lock:
+            await self._engage(reason)
+
+    async def _engage(self, reason: str):
+        if not self.engaged:
+            self.engaged = True
+            self.pause_events += 1
+            suspended = await self._suspend(self.targets())
+            self._record_event("pause" if self.mode == "pause" else "throttle", suspended, reason)
+        elif self.mode == "pause":
+            await self._suspend(self.targets()) # Miners started since we engaged
+
+    async def release(self, reason: str = "idle"):
+        async with self._lock:
+            await self._release(reason)
+
+    async def _release(self, reason: str):
+        if not self.engaged and not self.paused:
+            return
+        resumed = await self._resume(list(self.paused))
+        if self.engaged:
+            self.engaged = False
+            self.resume_events += 1
+            self._record_event("resume", resumed, reason)
+
+    async def step(self, now: Optional[float] = None):
+        now = now if now is not None else time.monotonic()
+        async with self._lock:
+            if not self.enabled:
+                await self._release("disabled")
+                return
+            if self.is_busy():
+                self._last_busy = now
+                if not self.engaged:
+                    await self._engage("llm_busy")
+            elif self.engaged and now - self._last_busy >= self.idle_grace_seconds:
+                await self._release("idle")
+                return
+            if self.engaged and self.mode == "throttle":
+                # Run the miners for the first `throttle_duty` of each period, keep them frozen for the rest
+                if (now % self.throttle_period) < self.throttle_duty * self.throttle_period:
+                    await self._resume(list(self.paused))
+                else:
+                    await self._suspend(self.targets())
+            elif self.engaged:
+                await self._suspend(self.targets())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.step()
+            except Exception as e:
+                print(f"GPU arbitration step failed: {e}")
+            await asyncio.sleep(self.tick)
+
+    def record_generation(self, duration_ms: float, tokens: int):
+        """Feeds one finished generation into the contended/uncontended speed estimates."""
+        if tokens <= 0 or duration_ms <= 0:
+            return
+        per_token = duration_ms / tokens
+        contended = not self.paused and bool(self.targets())
+        key = "contended" if contended else "uncontended"
+        previous = self.ms_per_token[key]
+        self.ms_per_token[key] = per_token if previous is None else 0.8 * previous + 0.2 * per_token
+        baseline = self.ms_per_token["contended"]
+        if self.paused and baseline is not None:
+            saved_ms = max(baseline - per_token, 0.0) * tokens
+            self.estimated_saved_ms += saved_ms
+            if self.backend_metrics is not None:
+                self.backend_metrics.gpu_arbiter_saved_seconds.inc(amount=saved_ms / 1000)
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "llm_devices": self.llm_devices,
+            "engaged": self.engaged,
+            "paused_miners": [name.replace("miner_", "", 1) for name in self.paused],
+            "pause_events": self.pause_events,
+            "resume_events": self.resume_events,
+            "paused_seconds": round(self.paused_seconds + sum(now - started for started in self.paused.values()), 3),
+            "ms_per_token": {key: round(value, 3) if value is not None else None for key, value in self.ms_per_token.items()},
+            "estimated_saved_ms": round(self.estimated_saved_ms, 1),
+            "recent_events": list(self.events),
+        }
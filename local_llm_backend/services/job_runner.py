@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+# generate_fn(model, prompt, options) -> OpenAI-style chat.completion dict
+GenerateFn = Callable[[str, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+READ_AHEAD = 64 # Input lines read per trip to a worker thread
+
+class BatchJob:
+    """
+    Streams a JSONL file of generation requests through `generate_fn` and appends one JSONL
+    result per input line to `output_path`.
+
+    Input lines look like `{"prompt": "...", "id": "...", "model": "...", "max_tokens": 100}`;
+    only `prompt` is required. Memory stays constant: lines are read as workers free up, and
+    progress is checkpointed as a low-water mark (every line below it is done). On resume,
+    results already in the output file above the mark are skipped, so nothing is generated twice.
+    """
+    def __init__(self, input_path: str, output_path: str, generate_fn: GenerateFn, model: Optional[str] = None,
+                 concurrency: int = 4, max_tokens: int = 100, checkpoint_every: int = 20):
+        self.id = uuid.uuid4().hex
+        self.input_path = Path(input_path)
+        self.output_path = Path(output_path)
+        self.checkpoint_path = Path(f"{output_path}.checkpoint")
+        self.generate_fn = generate_fn
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.max_tokens = max_tokens
+        self.checkpoint_every = checkpoint_every
+        self.status = "PENDING"
+        self.error: Optional[str] = None
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.completion_tokens = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._watermark = 0
+        self._done_above: Set[int] = set() # Completed lines at or above the watermark (bounded by concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    def _load_checkpoint(self) -> Set[int]:
+        try:
+            self._watermark = json.loads(self.checkpoint_path.read_text())["watermark"]
+        except (OSError, ValueError, KeyError):
+            self._watermark = 0
+        already_done = set()
+        if self.output_path.exists():
+            with open(self.output_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # A torn final line from a crash; that input is simply re-run
+                    if record.get("line", -1) >= self._watermark:
+                        already_done.add(record["line"])
+            self._truncate_torn_tail()
+        return already_done
+
+    def _truncate_torn_tail(self):
+        """Cuts a partial last line off the output, so the next appended record starts on a line of its own."""
+        with open(self.output_path, "r+b") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                chunk = f.read(position - start)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                f.truncate(position)
+
+    def _save_checkpoint(self):
+        tmp_path = Path(f"{self.checkpoint_path}.tmp")
+        tmp_path.write_text(json.dumps({"watermark": self._watermark}))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _mark_done(self, line_number: int):
+        self._done_above.add(line_number)
+        while self._watermark in self._done_above:
+            self._done_above.remove(self._watermark)
+            self._watermark += 1
+
+    async def _process(self, line_number: int, raw: str) -> Dict[str, Any]:
+        record: Dict[str, Any] = {"line": line_number}
+        try:
+            request = json.loads(raw)
+            record["id"] = request.get("id")
+            model = request.get("model") or self.model
+            if not model or not request.get("prompt"):
+                raise ValueError("Each request needs a 'prompt', and a 'model' unless the job sets one.")
+            options = {"num_predict": request.get("max_tokens", self.max_tokens)}
+            if request.get("temperature") is not None:
+                options["temperature"] = request["temperature"]
+            completion = await self.generate_fn(model, request["prompt"], options)
+            self.completion_tokens += (completion.get("usage") or {}).get("completion_tokens") or 0
+            self.succeeded += 1
+            record.update({"status": "ok", "result": completion})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        return record
+
+    def _read_lines(self, source, count: int) -> List[Tuple[int, str]]:
+        return list(itertools.islice(source, count))
+
+    @staticmethod
+    def _append(sink, record: Dict[str, Any]):
+        sink.write(json.dumps(record) + "\n")
+        sink.flush()
+
+    async def run(self) -> Dict[str, Any]:
+        self.status = "RUNNING"
+        self.started_at = time.time()
+        self._done_above = set()
+        completed_since_checkpoint = 0
+        source = sink = None
+        try:
+            # File I/O runs in worker threads; only generation and bookkeeping happen on the event loop
+            already_done = await asyncio.to_thread(self._load_checkpoint)
+            source = await asyncio.to_thread(open, self.input_path, "r", encoding="utf-8")
+            sink = await asyncio.to_thread(open, self.output_path, "a", encoding="utf-8")
+            numbered = enumerate(source)
+            buffered: Deque[Tuple[int, str]] = deque()
+            read_lock, write_lock = asyncio.Lock(), asyncio.Lock()
+
+            async def next_line() -> Optional[Tuple[int, str]]:
+                async with read_lock:
+                    while True:
+                        if not buffered:
+                            buffered.extend(await asyncio.to_thread(self._read_lines, numbered, READ_AHEAD))
+                            if not buffered:
+                                return None
+                        line_number, raw = buffered.popleft()
+                        if line_number < self._watermark:
+                            continue
+                        if line_number in already_done or not raw.strip():
+                            self.skipped += 1
+                            self._mark_done(line_number)
+                            continue
+                        return line_number, raw
+
+            async def worker():
+                nonlocal completed_since_checkpoint
+                while (item := await next_line()) is not None: # Workers share the reader and pull the next unread line
+                    line_number, raw = item
+                    record = await self._process(line_number, raw)
+                    async with write_lock: # The watermark may only cover lines already in the output file
+                        await asyncio.to_thread(self._append, sink, record)
+                        self._mark_done(line_number)
+                        completed_since_checkpoint += 1
+                        if completed_since_checkpoint >= self.checkpoint_every:
+                            completed_since_checkpoint = 0
+                            await asyncio.to_thread(self._save_checkpoint)
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            await asyncio.to_thread(self._save_checkpoint)
+            self.status = "COMPLETED"
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self._save_checkpoint)
+            self.status = "CANCELLED"
+            raise
+        except Exception as e:
+            self.status = "FAILED"
+            self.error = str(e)
+        finally:
+            for f in (source, sink):
+                if f is not None:
+                    f.close()
+            self.finished_at = time.time()
+        return self.summary()
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    @property
+    def is_active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def cancel(self) -> bool:
+        if self._task is None or self._task.done():
+            return False
+        self._task.cancel()
+        return True
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        processed = self.succeeded + self.failed
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "input_path": str(self.input_path),
+            "output_path": str(self.output_path),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed": round(elapsed, 3),
+            "requests_per_second": round(processed / elapsed, 3) if elapsed > 0 else 0.0,
+            "tokens_per_second": round(self.completion_tokens / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+class JobConflictError(Exception):
+    pass
+
+class JobManager:
+    """Runs batch jobs and keeps their summaries; only the `max_finished` most recent finished jobs are kept."""
+    def __init__(self, max_finished: int = 100):
+        self.jobs: Dict[str, BatchJob] = {}
+        self.max_finished = max_finished
+
+    def submit(self, job: BatchJob) -> BatchJob:
+        """Starts `job`. Raises JobConflictError if a running job already writes to the same output file."""
+        for other in self.jobs.values():
+            if other.is_active and other.output_path == job.output_path:
+                raise JobConflictError(f"Job '{other.id}' is already writing to '{job.output_path}'.")
+        self._prune()
+        self.jobs[job.id] = job
+        job.start()
+        return job
+
+    def _prune(self):
+        finished = [job for job in self.jobs.values() if not job.is_active] # Insertion order: oldest first
+        for job in finished[:max(0, len(finished) - self.max_finished + 1)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self.jobs.get(job_id)
+
+    async def shutdown(self):
+        tasks = [job._task for job in self.jobs.values() if job.cancel()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _run_cli(args):
+    from local_llm_backend.config import load_config
+    from local_llm_backend.services.llm_clients import get_llm_client
+    from local_llm_backend.services.completion_aggregator import CompletionAggregator
+
+    config = load_config()
+    llm_client = get_llm_client(config.llm, pool_config=config.http_pool)
+
+    async def generate(model, prompt, options):
+        aggregator = CompletionAggregator(model)
+        async for chunk in llm_client.generate(model, prompt, stream=False, options=options):
+            aggregator.add(chunk)
+        return aggregator.result()
+
+    job = BatchJob(args.input, args.output, generate, model=args.model or config.llm.default_model,
+                   concurrency=args.concurrency, max_tokens=args.max_tokens)
+    try:
+        return await job.run()
+    finally:
+        await llm_client.aclose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a JSONL file of generation requests through the configured LLM provider.")
+    parser.add_argument("input", help="JSONL file of requests ({'prompt': ..., 'id': ..., 'model': ..., 'max_tokens': ...})")
+    parser.add_argument("output", help="JSONL file results are appended to; '<output>.checkpoint' tracks progress for resume")
+    parser.add_argument("--model", help="Model for requests that don't name one (default: the configured default_model)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-tokens", type=int, default=100)
+    print(json.dumps(asyncio.run(_run_cli(parser.parse_args())), indent=4))
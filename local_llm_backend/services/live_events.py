@@ -0,0 +1,50 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from local_llm_backend.services.system_monitor import SystemStatsSampler
+
+STATS_SECTIONS = ("cpu", "ram", "gpus")
+
+def diff_sections(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the top-level keys whose values changed; keys that disappeared are reported as None."""
+    changed = {key: value for key, value in current.items() if previous.get(key) != value}
+    changed.update({key: None for key in previous if key not in current})
+    return changed
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def live_events(
+    sampler: SystemStatsSampler,
+    get_miner_statuses: Callable[[], Dict[str, str]],
+    is_disconnected: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[str]:
+    """
+    Server-sent event stream of system stat and miner status deltas.
+
+    The first events carry the full state; after that only sections that changed since the
+    previous sample are pushed. A keepalive comment is sent if sampling stalls.
+    """
+    sent_stats: Dict[str, Any] = {}
+    sent_miners: Dict[str, str] = {}
+    snapshot = await sampler.latest()
+    while True:
+        if snapshot is not None:
+            stats = {key: snapshot[key] for key in STATS_SECTIONS if key in snapshot}
+            changed = diff_sections(sent_stats, stats)
+            if changed:
+                yield format_sse("system_stats", changed)
+                sent_stats = stats
+        miners = get_miner_statuses()
+        changed = diff_sections(sent_miners, miners)
+        if changed:
+            yield format_sse("miner_status", changed)
+            sent_miners = miners
+        if await is_disconnected():
+            break
+        try:
+            snapshot = await sampler.next_sample(timeout=max(15.0, sampler.interval * 3))
+        except asyncio.TimeoutError:
+            snapshot = None
+            yield ": keepalive\n\n"
@@ -0,0 +1 @@
+from local_llm_backend.services.llm_clients.factory import get_llm_client
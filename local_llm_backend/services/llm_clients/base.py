@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+class LLMClient(ABC):
+    """
+    Common interface for LLM providers.
+
+    `generate` yields OpenAI-style `chat.completion.chunk` dicts
+    (`{"choices": [{"delta": {"content": ...}}]}`) for both streaming and
+    non-streaming calls, so the API layer can treat every provider the same way.
+    """
+    supports_embeddings: bool = False # Providers that implement `embed` set this; check it before calling
+
+
+    @abstractmethod
+    def generate(self, model: str, prompt: str, stream: bool = False, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def get_models(self) -> Dict[str, Any]:
+        ...
+
+    async def health_check(self) -> None:
+        """Raises if the provider is unreachable. Providers should override with something cheaper than a listing."""
+        await self.get_models()
+
+    @abstractmethod
+    def pull_model(self, model_name: str) -> AsyncIterator[Dict[str, Any]]:
+        ...
+
+    async def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        """Returns one embedding vector per text. Only called when `supports_embeddings` is set."""
+        raise NotImplementedError(f"{type(self).__name__} does not support embeddings.")
+
+    def warm_up(self) -> None:
+        """Blocking one-off setup (SDK imports, connection pools). Run in a worker thread after startup so it doesn't delay it."""
+        return None
+
+    async def aclose(self) -> None:
+        """Releases any network resources held by the client."""
+        return None
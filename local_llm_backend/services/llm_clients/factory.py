@@ -0,0 +1,14 @@
+from typing import Optional, Union
+
+from local_llm_backend.config import OllamaProviderConfig, VertexAIProviderConfig, HttpPoolConfig
+from local_llm_backend.services.llm_clients.base import LLMClient
+
+def get_llm_client(llm_config: Union[OllamaProviderConfig, VertexAIProviderConfig], pool_config: Optional[HttpPoolConfig] = None) -> LLMClient:
+    # Provider modules (and their SDKs) are imported only when that provider is configured
+    if llm_config.provider == "ollama":
+        from local_llm_backend.services.llm_clients.ollama import OllamaClient
+        return OllamaClient(llm_config, pool_config=pool_config)
+    if llm_config.provider == "vertexai":
+        from local_llm_backend.services.llm_clients.vertexai import VertexAIClient
+        return VertexAIClient(llm_config)
+    raise ValueError(f"Unsupported LLM provider: {llm_config.provider}")
@@ -0,0 +1,110 @@
+import json
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from local_llm_backend.config import OllamaProviderConfig, HttpPoolConfig
+from local_llm_backend.services.llm_clients.base import LLMClient
+
+# Ollama-native generation options mapped onto the OpenAI-compatible request body
+_OPTION_MAP = {
+    "num_predict": "max_tokens",
+    "temperature": "temperature",
+    "top_p": "top_p",
+    "stop": "stop",
+    "seed": "seed",
+}
+
+def create_http_client(pool_config: HttpPoolConfig) -> httpx.AsyncClient:
+    """Builds a pooled, keep-alive HTTP client sized from the backend config."""
+    limits = httpx.Limits(
+        max_connections=pool_config.max_connections,
+        max_keepalive_connections=pool_config.max_keepalive_connections,
+        keepalive_expiry=pool_config.keepalive_expiry,
+    )
+    timeout = httpx.Timeout(pool_config.read_timeout, connect=pool_config.connect_timeout)
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+class OllamaClient(LLMClient):
+    supports_embeddings = True
+
+    def __init__(self, config: OllamaProviderConfig, pool_config: Optional[HttpPoolConfig] = None):
+        self.config = config
+        self.api_base = config.api_base.rstrip("/")
+        # The native Ollama API (tags, pull) lives at the server root, not under /v1
+        self.native_base = self.api_base[:-3] if self.api_base.endswith("/v1") else self.api_base
+        self.pool_config = pool_config or HttpPoolConfig()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_lock = threading.Lock() # warm_up() builds the client on a worker thread
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Built on first use: creating the transport imports httpcore and loads TLS certificates, which would otherwise add ~200ms to startup
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = create_http_client(self.pool_config)
+        return self._http
+
+    def warm_up(self) -> None:
+        self.http
+
+    def _build_payload(self, model: str, prompt: str, stream: bool, options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        payload = {
+            "model": model or self.config.default_model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": stream,
+        }
+        for key, value in (options or {}).items():
+            if key in _OPTION_MAP and value is not None:
+                payload[_OPTION_MAP[key]] = value
+        return payload
+
+    async def generate(self, model: str, prompt: str, stream: bool = False, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        payload = self._build_payload(model, prompt, stream, options)
+        url = f"{self.api_base}/chat/completions"
+        if stream:
+            async with self.http.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    yield json.loads(data)
+        else:
+            response = await self.http.post(url, json=payload)
+            response.raise_for_status()
+            completion = response.json()
+            # Normalise the full completion into a single chunk so callers see one shape
+            for choice in completion.get("choices", []):
+                choice["delta"] = choice.pop("message", {})
+            yield completion
+
+    async def get_models(self) -> Dict[str, Any]:
+        response = await self.http.get(f"{self.native_base}/api/tags")
+        response.raise_for_status()
+        return response.json()
+
+    async def health_check(self) -> None:
+        # The server root answers "Ollama is running" without touching the model store
+        response = await self.http.get(f"{self.native_base}/")
+        response.raise_for_status()
+
+    async def pull_model(self, model_name: str) -> AsyncIterator[Dict[str, Any]]:
+        async with self.http.stream("POST", f"{self.native_base}/api/pull", json={"name": model_name, "stream": True}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+
+    async def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        response = await self.http.post(f"{self.native_base}/api/embed", json={"model": model, "input": texts})
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
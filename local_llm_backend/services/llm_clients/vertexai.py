@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from local_llm_backend.config import VertexAIProviderConfig
+from local_llm_backend.services.llm_clients.base import LLMClient
+
+# google-cloud-aiplatform is heavy and only needed when this provider is used, so it is imported on first use
+vertexai = None
+GenerativeModel = None
+
+def _load_sdk() -> bool:
+    global vertexai, GenerativeModel
+    if vertexai is None:
+        try:
+            import vertexai as sdk
+            from vertexai.generative_models import GenerativeModel as model_class
+        except ImportError:
+            return False
+        vertexai, GenerativeModel = sdk, model_class
+    return True
+
+class VertexAIClient(LLMClient):
+    def __init__(self, config: VertexAIProviderConfig):
+        self.config = config
+        self._initialized = False
+
+    def warm_up(self) -> None:
+        _load_sdk()
+
+    async def _ensure_initialized(self):
+        # The first import of the SDK takes seconds, and init() resolves credentials; neither may block the event loop
+        if not await asyncio.to_thread(_load_sdk):
+            raise RuntimeError("The 'google-cloud-aiplatform' package is required for the vertexai provider.")
+        if not self._initialized:
+            await asyncio.to_thread(vertexai.init, project=self.config.project, location=self.config.location)
+            self._initialized = True
+
+    def _to_chunk(self, model: str, text: str, finish_reason: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": finish_reason}],
+        }
+
+    async def generate(self, model: str, prompt: str, stream: bool = False, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        await self._ensure_initialized()
+        options = options or {}
+        model = model or self.config.default_model
+        generation_config = {}
+        if options.get("num_predict") is not None:
+            generation_config["max_output_tokens"] = options["num_predict"]
+        if options.get("temperature") is not None:
+            generation_config["temperature"] = options["temperature"]
+        if options.get("stop"):
+            generation_config["stop_sequences"] = options["stop"]
+        generative_model = GenerativeModel(model)
+        if stream:
+            responses = await generative_model.generate_content_async(prompt, generation_config=generation_config, stream=True)
+            async for response in responses:
+                yield self._to_chunk(model, response.text)
+        else:
+            response = await generative_model.generate_content_async(prompt, generation_config=generation_config)
+            yield self._to_chunk(model, response.text, finish_reason="stop")
+
+    async def get_models(self) -> Dict[str, Any]:
+        await self._ensure_initialized()
+        return {"models": [{"name": self.config.default_model}]}
+
+    async def health_check(self) -> None:
+        await self._ensure_initialized()
+
+    async def pull_model(self, model_name: str) -> AsyncIterator[Dict[str, Any]]:
+        yield {"status": f"Model pulling is not supported for provider 'vertexai'; '{model_name}' is served remotely."}
@@ -0,0 +1,145 @@
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, tuned for local inference (sub-ms handlers up to multi-minute generations)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 40, 60, 80, 100, 150, 200, 400)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size # Preallocated: one slot per bucket plus +Inf
+        self.sum = 0.0
+
+class Histogram:
+    """Prometheus histogram. Each label set owns a preallocated bucket array; observe() only bisects and increments."""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+
+    def observe(self, value: float, *labels: str):
+        child = self._children.get(labels)
+        if child is None:
+            child = self._children[labels] = _HistogramChild(len(self.buckets) + 1)
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            cumulative += child.counts[-1]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {child.sum}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in sorted(self._values.items()))
+        return lines
+
+class Gauge:
+    """Gauge read at scrape time from `collect()`, which returns {label values: value}."""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        lines.extend(f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in sorted(self.collect().items()))
+        return lines
+
+class BackendMetrics:
+    """The backend's metric families, rendered in the Prometheus text exposition format by `/metrics`."""
+    def __init__(self):
+        self.families: List[Any] = []
+        self.http_latency = self.add(Histogram(
+            "http_request_duration_seconds", "Time until the response headers are sent.", ("method", "endpoint", "status")))
+        self.llm_ttft = self.add(Histogram(
+            "llm_time_to_first_token_seconds", "Request arrival to the first content token, including queue wait.", ("provider", "model", "endpoint")))
+        self.llm_generation_seconds = self.add(Histogram(
+            "llm_generation_duration_seconds", "Provider time for a whole generation, excluding queue wait.", ("provider", "model", "endpoint")))
+        self.llm_tokens_per_second = self.add(Histogram(
+            "llm_tokens_per_second", "Completion tokens per second of generation time.", ("provider", "model", "endpoint"), TOKEN_RATE_BUCKETS))
+        self.llm_queue_wait = self.add(Histogram(
+            "llm_queue_wait_seconds", "Time spent waiting for a scheduler slot.", ("model", "priority")))
+        self.llm_tokens = self.add(Counter(
+            "llm_completion_tokens_total", "Completion tokens generated.", ("provider", "model")))
+        self.llm_generations = self.add(Counter(
+            "llm_generations_total", "Finished generations by outcome (ok, cancelled, error).", ("provider", "model", "endpoint", "outcome")))
+        self.llm_provider_errors = self.add(Counter(
+            "llm_provider_errors_total", "Errors raised by the LLM provider, by exception type.", ("provider", "model", "error")))
+        self.gpu_arbiter_events = self.add(Counter(
+            "gpu_arbiter_events_total", "Times miners were made to yield the GPU (pause, throttle) or given it back (resume).", ("action",)))
+        self.gpu_arbiter_saved_seconds = self.add(Counter(
+            "gpu_arbiter_estimated_saved_seconds_total", "Inference time saved by pausing miners, against the contended speed.", ()))
+
+    def add(self, family):
+        self.families.append(family)
+        return family
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self.families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request up to its response headers, labelled by route
+    template (`/miner/status/{miner_name}`, not the concrete path) so label cardinality stays bounded.
+    """
+    def __init__(self, app, metrics: BackendMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route") # Set by the router on this same scope dict
+                self.metrics.http_latency.observe(
+                    time.perf_counter() - started, scope["method"], getattr(route, "path", "unmatched"), str(message["status"]))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,140 @@
+import math
+import re
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+# T-Rex output, e.g.
+#   20240101 12:00:00 GPU #0: Gigabyte RTX 3070 - 61.28 MH/s, [T:55C, P:117W, F:60%, E:524kH/W], 4/4 R:0%
+#   20240101 12:00:00 [ OK ] 5/5 - 61.28 MH/s, 48ms ... GPU #0
+#   20240101 12:00:00 [FAIL] 5/6 - Share above target
+#   20240101 12:00:00 Hashrate: 122.56 MH/s
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+DEVICE_RE = re.compile(r"GPU #(\d+):.*? - ([\d.]+) ?([kMGT]?H/s)(?:.*?\[T:\s*(\d+)C)?(?:.*?(\d+)/(\d+) R:)?")
+SHARE_RE = re.compile(r"\[\s*(OK|FAIL)\s*\]\s*(\d+)/(\d+)(?:\s*-\s*([\d.]+) ?([kMGT]?H/s))?")
+TOTAL_RE = re.compile(r"Hashrate:\s*([\d.]+) ?([kMGT]?H/s)")
+UNITS = {"H/s": 1.0, "kH/s": 1e3, "MH/s": 1e6, "GH/s": 1e9, "TH/s": 1e12}
+
+def _rate(value: str, unit: str) -> float:
+    return float(value) * UNITS[unit]
+
+class MinerTelemetry:
+    """
+    Incremental parser for one miner's T-Rex output plus a compact time series of what it reported.
+
+    `feed` is called from the log reader thread for every line; lines that cannot carry a reading are
+    rejected with substring checks before any regex runs. The series is a fixed-size ring of typed
+    arrays sampled at most every `sample_interval` seconds.
+    """
+    def __init__(self, capacity: int = 720, sample_interval: float = 10.0, stall_seconds: float = 120.0):
+        self.capacity = capacity
+        self.sample_interval = sample_interval
+        self.stall_seconds = stall_seconds
+        self._lock = threading.Lock()
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.hashrates = array("d", bytes(8 * capacity))
+        self.accepted_series = array("l", bytes(array("l").itemsize * capacity))
+        self.rejected_series = array("l", bytes(array("l").itemsize * capacity))
+        self.temperatures = array("f", bytes(4 * capacity)) # Hottest device; NaN when not reported
+        self._next = 0
+        self.size = 0
+        self.mark_started()
+
+    def mark_started(self):
+        """Resets the live readings for a fresh process; the series is kept across restarts."""
+        with self._lock:
+            self.started_at = time.time()
+            self.hashrate: Optional[float] = None
+            self.accepted = 0
+            self.rejected = 0
+            self.devices: Dict[int, Dict[str, Any]] = {}
+            self.last_update: Optional[float] = None
+            self.last_nonzero: Optional[float] = None
+            self._reports_total = False # Multi-GPU rigs print a "Hashrate:" total; otherwise devices are summed
+            self._last_sample = 0.0
+
+    def mark_resumed(self):
+        """Restarts the stall clock after the process was suspended, which reports no hashrate by design."""
+        with self._lock:
+            self.last_nonzero = time.time()
+
+    def feed(self, stream: str, line: str):
+        if "H/s" not in line and "OK" not in line and "FAIL" not in line:
+            return
+        line = ANSI_RE.sub("", line)
+        now = time.time()
+        with self._lock:
+            if self._parse(line):
+                self.last_update = now
+                if self.hashrate:
+                    self.last_nonzero = now
+                if now - self._last_sample >= self.sample_interval:
+                    self._sample(now)
+
+    def _parse(self, line: str) -> bool:
+        match = SHARE_RE.search(line)
+        if match:
+            accepted, total = int(match.group(2)), int(match.group(3))
+            self.accepted, self.rejected = accepted, max(total - accepted, 0)
+            if match.group(4):
+                self.hashrate = _rate(match.group(4), match.group(5))
+            return True
+        match = TOTAL_RE.search(line)
+        if match:
+            self.hashrate = _rate(match.group(1), match.group(2))
+            self._reports_total = True
+            return True
+        match = DEVICE_RE.search(line)
+        if match:
+            device = self.devices.setdefault(int(match.group(1)), {})
+            device["hashrate"] = _rate(match.group(2), match.group(3))
+            if match.group(4):
+                device["temperature"] = int(match.group(4))
+            if match.group(5):
+                device["accepted"] = int(match.group(5))
+                device["rejected"] = max(int(match.group(6)) - int(match.group(5)), 0)
+            if not self._reports_total:
+                self.hashrate = sum(d["hashrate"] for d in self.devices.values())
+            return True
+        return False
+
+    def _sample(self, now: float):
+        i = self._next
+        temperatures = [d["temperature"] for d in self.devices.values() if "temperature" in d]
+        self.timestamps[i] = now
+        self.hashrates[i] = self.hashrate or 0.0
+        self.accepted_series[i] = self.accepted
+        self.rejected_series[i] = self.rejected
+        self.temperatures[i] = max(temperatures) if temperatures else math.nan
+        self._next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self._last_sample = now
+
+    def is_stalled(self, now: Optional[float] = None) -> bool:
+        """True once no non-zero hashrate has been reported for `stall_seconds` (counting from start)."""
+        now = now if now is not None else time.time()
+        return now - (self.last_nonzero or self.started_at) > self.stall_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hashrate": self.hashrate,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "devices": {str(index): dict(device) for index, device in sorted(self.devices.items())},
+                "last_update": self.last_update,
+            }
+
+    def series(self, since: Optional[float] = None) -> Dict[str, List[Any]]:
+        with self._lock:
+            slots = [(self._next - self.size + n) % self.capacity for n in range(self.size)]
+            if since is not None:
+                slots = [i for i in slots if self.timestamps[i] > since]
+            return {
+                "timestamps": [self.timestamps[i] for i in slots],
+                "hashrate": [self.hashrates[i] for i in slots],
+                "accepted": [self.accepted_series[i] for i in slots],
+                "rejected": [self.rejected_series[i] for i in slots],
+                "max_temperature": [None if math.isnan(self.temperatures[i]) else self.temperatures[i] for i in slots],
+            }
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from typing import Any, Dict, FrozenSet, Optional
+
+from local_llm_backend.services.client_rotation import ClientRotation
+
+class ModelCatalog:
+    """
+    TTL cache for the provider's model listing.
+
+    Stale entries are served immediately while a refresh runs in the background,
+    and concurrent refreshes share a single in-flight request to the provider. Each refresh leases
+    the current client from `clients` for as long as it runs, since it can outlive the request that started it.
+    """
+    def __init__(self, clients: ClientRotation, ttl: float = 60.0):
+        self.clients = clients
+        self.ttl = ttl
+        self._models: Optional[Dict[str, Any]] = None
+        self._names: FrozenSet[str] = frozenset()
+        self._fetched_at = 0.0
+        self._generation = 0 # Bumped on invalidation so late refreshes from an old client are discarded
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def invalidate(self):
+        self._models = None
+        self._names = frozenset()
+        self._generation += 1
+        self._refresh_task = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._models is not None
+
+    def knows(self, model: str) -> bool:
+        """True if the cached listing has `model`; never fetches. Ollama's implicit `:latest` tag is optional."""
+        return model in self._names or f"{model}:latest" in self._names
+
+    def refresh_in_background(self):
+        self._start_refresh()
+
+    def age(self) -> Optional[float]:
+        if self._models is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    async def get_models(self) -> Dict[str, Any]:
+        if self._models is not None:
+            if time.monotonic() - self._fetched_at >= self.ttl:
+                self._start_refresh()
+            return self._models
+        # Shield so one cancelled caller doesn't abort the refresh the others are waiting on
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh(self._generation))
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        return self._refresh_task
+
+    async def _refresh(self, generation: int) -> Dict[str, Any]:
+        async with self.clients.use() as llm_client:
+            models = await llm_client.get_models()
+        if generation == self._generation:
+            self._models = models
+            # Ollama lists {"models": [{"name"}]}, OpenAI-compatible servers {"data": [{"id"}]}
+            entries = models.get("models") or models.get("data") or []
+            self._names = frozenset(entry.get("name") or entry.get("id") for entry in entries if isinstance(entry, dict))
+            self._fetched_at = time.monotonic()
+        return models
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Model catalog refresh failed: {task.exception()}")
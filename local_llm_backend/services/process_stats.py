@@ -0,0 +1,112 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+class ProcessStatsCollector:
+    """
+    Per-process CPU, memory, thread and I/O readings for a process and its child tree.
+
+    `psutil.Process` handles are cached per PID: besides avoiding a re-resolve every sample, a handle
+    is what makes `cpu_percent(None)` meaningful, since it reports usage since the previous call on
+    the same handle. Handles whose process exited are dropped on the next collection.
+    """
+    def __init__(self, lookup_interval: float = 30.0):
+        self.lookup_interval = lookup_interval
+        self._handles: Dict[int, psutil.Process] = {}
+        self._named: Dict[str, int] = {} # process name -> PID found by the last lookup
+        self._named_checked: Dict[str, float] = {}
+
+    def _handle(self, pid: int) -> psutil.Process:
+        process = self._handles.get(pid)
+        if process is not None and process.is_running(): # is_running() also catches PID reuse
+            return process
+        process = psutil.Process(pid)
+        process.cpu_percent(None) # Prime; the first reading is always 0.0
+        self._handles[pid] = process
+        return process
+
+    @staticmethod
+    def _read(process: psutil.Process) -> Dict[str, Any]:
+        with process.oneshot():
+            entry = {
+                "pid": process.pid,
+                "cpu_percent": process.cpu_percent(None), # Can exceed 100 on multi-core machines
+                "rss": process.memory_info().rss,
+                "threads": process.num_threads(),
+                "read_bytes": None,
+                "write_bytes": None,
+            }
+            try:
+                io = process.io_counters()
+                entry["read_bytes"], entry["write_bytes"] = io.read_bytes, io.write_bytes
+            except (AttributeError, psutil.AccessDenied): # No io_counters on macOS, or not ours to read
+                pass
+        return entry
+
+    def collect_tree(self, pid: int, seen: Optional[set] = None) -> Optional[Dict[str, Any]]:
+        """Totals for `pid` and all of its descendants, plus a per-child breakdown. None if it is gone."""
+        try:
+            root = self._handle(pid)
+            members = [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, ProcessLookupError):
+            return None
+        readings: List[Dict[str, Any]] = []
+        for member in members:
+            try:
+                readings.append(self._read(self._handle(member.pid)))
+                if seen is not None:
+                    seen.add(member.pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, ProcessLookupError):
+                continue # Exited between listing and reading
+        if not readings:
+            return None
+        total = {
+            "pid": pid,
+            "cpu_percent": round(sum(r["cpu_percent"] for r in readings), 1),
+            "rss": sum(r["rss"] for r in readings),
+            "threads": sum(r["threads"] for r in readings),
+            "read_bytes": sum(r["read_bytes"] or 0 for r in readings) if readings[0]["read_bytes"] is not None else None,
+            "write_bytes": sum(r["write_bytes"] or 0 for r in readings) if readings[0]["write_bytes"] is not None else None,
+            "process_count": len(readings),
+            "children": [r for r in readings if r["pid"] != pid],
+        }
+        return total
+
+    def find_named(self, name: str) -> Optional[int]:
+        """PID of a process by executable name (e.g. "ollama"), re-scanned at most every `lookup_interval`."""
+        pid = self._named.get(name)
+        if pid is not None and pid in self._handles and self._handles[pid].is_running():
+            return pid
+        now = time.monotonic()
+        if now - self._named_checked.get(name, -self.lookup_interval) < self.lookup_interval:
+            return None
+        self._named_checked[name] = now
+        self._named.pop(name, None)
+        wanted = name.lower()
+        for process in psutil.process_iter(["name", "ppid"]):
+            process_name = (process.info.get("name") or "").lower()
+            if process_name.removesuffix(".exe") != wanted:
+                continue
+            try:
+                parent_name = psutil.Process(process.info["ppid"]).name().lower().removesuffix(".exe")
+            except (psutil.NoSuchProcess, psutil.AccessDenied, ProcessLookupError, ValueError):
+                parent_name = ""
+            if parent_name != wanted: # The top of a tree of same-named processes is the server
+                self._named[name] = process.pid
+                return process.pid
+        return None
+
+    def collect(self, tracked: Dict[str, int], named: Optional[Dict[str, str]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        `tracked` maps labels to PIDs (e.g. ProcessManager processes); `named` maps labels to
+        executable names to look up (e.g. {"llm_server": "ollama"}).
+        """
+        seen: set = set()
+        result = {label: self.collect_tree(pid, seen) for label, pid in tracked.items()}
+        for label, process_name in (named or {}).items():
+            pid = self.find_named(process_name)
+            result[label] = self.collect_tree(pid, seen) if pid is not None else None
+        for pid in [pid for pid in self._handles if pid not in seen]:
+            del self._handles[pid]
+        return result
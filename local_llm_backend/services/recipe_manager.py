@@ -1,7 +1,17 @@
+import json
 import os
+import re
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError: # watchdog is optional; without it the index polls mtimes
+    Observer = None
+    FileSystemEventHandler = object
 
 # Correctly determine the base path for data files (like the recipes dir)
 # for both development and PyInstaller bundled mode.
@@ -14,33 +24,334 @@ else:
     base_path = Path(__file__).parent.parent.parent
 
 RECIPES_DIR = base_path / "recipes"
+RECIPE_SUFFIX = ".txt" # Assuming recipe files are .txt
 
-def get_recipes() -> Dict[str, List[str]]:
-    recipes = {}
-    if not RECIPES_DIR.is_dir():
-        return {}
-
-    for category_path in RECIPES_DIR.iterdir():
-        if category_path.is_dir():
-            category_name = category_path.name
-            recipes[category_name] = []
-            for recipe_file in category_path.iterdir():
-                if recipe_file.is_file() and recipe_file.suffix == '.txt': # Assuming recipe files are .txt
-                    recipes[category_name].append(recipe_file.stem) # Use stem to get filename without extension
-    return recipes
-
-def read_recipe(category: str, name: str) -> Optional[Dict[str, str]]:
-    recipe_file_path = RECIPES_DIR / category / f"{name}.txt"
-    if not recipe_file_path.is_file():
-        return None
+# {{name}}, {{name:type}} or {{name:type=default}}
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*(?::\s*(str|int|float|bool))?\s*(?:=([^}]*))?\}\}")
+HEADER_RE = re.compile(r"^([A-Za-z][A-Za-z\- ]*):\s*(.*)$")
+_COERCE = {"str": str, "int": int, "float": float}
+
+class RecipeParameterError(ValueError):
+    pass
+
+def _coerce(name: str, type_name: str, value: Any) -> Any:
+    if type_name == "bool":
+        if isinstance(value, bool):
+            return value
+        if str(value).lower() in ("true", "1", "yes"):
+            return True
+        if str(value).lower() in ("false", "0", "no"):
+            return False
+        raise RecipeParameterError(f"Parameter '{name}' must be a bool.")
     try:
-        with open(recipe_file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            # Simple parsing, assuming first line is description, rest is prompt
-            lines = content.splitlines()
-            description = lines[0].strip() if lines else ""
-            prompt = "\n".join(lines[1:]).strip()
-            return {"description": description, "prompt": prompt}
-    except Exception as e:
-        print(f"Error reading recipe {category}/{name}: {e}")
-        return None
+        return _COERCE[type_name](value)
+    except (TypeError, ValueError):
+        raise RecipeParameterError(f"Parameter '{name}' must be of type {type_name}.")
+
+class RecipeTemplate:
+    """
+    A recipe prompt compiled once into literal segments and typed placeholders.
+
+    Templates without placeholders take an implicit optional `input` that is appended after
+    a blank line, matching how the plain-text recipes are used ("...the following code:").
+    """
+    def __init__(self, text: str):
+        self.segments: List[Any] = [] # str literals and placeholder names, in order
+        self.parameters: Dict[str, Dict[str, Any]] = {}
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.segments.append(text[position:match.start()])
+            name, type_name, default = match.group(1), match.group(2) or "str", match.group(3)
+            if name not in self.parameters:
+                self.parameters[name] = {
+                    "type": type_name,
+                    "required": default is None,
+                    "default": _coerce(name, type_name, default.strip()) if default is not None else None,
+                }
+            self.segments.append((name,))
+            position = match.end()
+        self.segments.append(text[position:])
+        self.implicit_input = not self.parameters
+        if self.implicit_input:
+            self.parameters["input"] = {"type": "str", "required": False, "default": ""}
+
+    def render(self, params: Optional[Dict[str, Any]] = None) -> str:
+        params = params or {}
+        unknown = set(params) - set(self.parameters)
+        if unknown:
+            raise RecipeParameterError(f"Unknown parameter(s): {', '.join(sorted(unknown))}.")
+        values = {}
+        for name, spec in self.parameters.items():
+            if name in params:
+                values[name] = str(_coerce(name, spec["type"], params[name]))
+            elif spec["required"]:
+                raise RecipeParameterError(f"Missing required parameter '{name}'.")
+            else:
+                values[name] = str(spec["default"])
+        if self.implicit_input:
+            return f"{self.segments[0]}\n\n{values['input']}" if values["input"] else self.segments[0]
+        return "".join(values[segment[0]] if isinstance(segment, tuple) else segment for segment in self.segments)
+
+def parse_recipe(content: str) -> Dict[str, Any]:
+    """
+    Parses a recipe file. Structured recipes carry `Key: value` headers followed by a
+    `Prompt:` line and the prompt template:
+
+        Recipe: Python to JavaScript Translation
+        Description: Translates a Python script to JavaScript.
+        Model: codellama
+        Max-Tokens: 1024
+        Stop: ["```"]
+        Prompt:
+        Translate the following Python code to {{language:str=JavaScript}}:
+        {{code}}
+
+    Files without a `Prompt:` line fall back to: first line is the description, rest is the prompt.
+    """
+    lines = content.splitlines()
+    headers: Dict[str, str] = {}
+    prompt_start = None
+    for i, line in enumerate(lines):
+        if line.strip().lower() == "prompt:":
+            prompt_start = i + 1
+            break
+        match = HEADER_RE.match(line.strip())
+        if match:
+            headers[match.group(1).strip().lower()] = match.group(2).strip()
+    if prompt_start is None:
+        headers = {"description": lines[0].strip() if lines else ""}
+        prompt_start = 1
+    prompt = "\n".join(lines[prompt_start:]).strip()
+    stop = headers.get("stop")
+    if stop:
+        try:
+            stop = json.loads(stop)
+        except ValueError:
+            stop = [stop]
+    max_tokens = headers.get("max-tokens")
+    template = RecipeTemplate(prompt)
+    return {
+        "name": headers.get("recipe"),
+        "description": headers.get("description", ""),
+        "prompt": prompt,
+        "model": headers.get("model") or None,
+        "max_tokens": int(max_tokens) if max_tokens and max_tokens.isdigit() else None,
+        "stop": stop or [],
+        "parameters": template.parameters,
+        "template": template,
+    }
+
+class _WatchdogHandler(FileSystemEventHandler):
+    def __init__(self, index: "RecipeIndex"):
+        self.index = index
+
+    def on_any_event(self, event):
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path:
+                self.index.refresh_path(Path(path))
+
+class RecipeIndex:
+    """
+    In-memory index of the recipes tree. Built once, then kept current by a filesystem
+    watcher (watchdog/inotify when installed, otherwise a background mtime poll) so that
+    listings and recipe bodies are served without touching the disk.
+    """
+    def __init__(self, root: Path = RECIPES_DIR, poll_interval: float = 5.0):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._recipes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._stats: Dict[Path, Tuple[float, int]] = {} # file -> (mtime, size) when last indexed
+        self._dir_mtimes: Dict[Path, float] = {}
+        self._listing: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._built = False
+        self._watcher = None
+        self._missed_events = False # Set while a built index is not being watched
+        self.version = 0 # Bumped whenever the index changes
+
+    def ensure_built(self):
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            self._scan()
+            self._built = True
+        self.start_watching()
+
+    # --- Reads (served from memory) ---
+
+    def get_recipes(self) -> Dict[str, List[str]]:
+        self.ensure_built()
+        return self._listing
+
+    def read_recipe(self, category: str, name: str) -> Optional[Dict[str, Any]]:
+        self.ensure_built()
+        recipe = self._recipes.get((category, name))
+        if recipe is None:
+            return None
+        return {key: value for key, value in recipe.items() if key != "template"}
+
+    def snapshot(self) -> Tuple[int, Dict[Tuple[str, str], Dict[str, Any]]]:
+        """Returns (version, recipes). Re-indexed recipes are new dicts, so consumers can diff by identity."""
+        self.ensure_built()
+        with self._lock:
+            return self.version, dict(self._recipes)
+
+    def render_recipe(self, category: str, name: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Fills a recipe's precompiled template. Raises RecipeParameterError for bad parameters."""
+        self.ensure_built()
+        recipe = self._recipes.get((category, name))
+        if recipe is None:
+            return None
+        return {
+            "prompt": recipe["template"].render(params),
+            "model": recipe["model"],
+            "max_tokens": recipe["max_tokens"],
+            "stop": recipe["stop"],
+        }
+
+    # --- Index maintenance ---
+
+    def _key_for(self, path: Path) -> Optional[Tuple[str, str]]:
+        try:
+            relative = path.relative_to(self.root)
+        except ValueError:
+            return None
+        if len(relative.parts) != 2 or path.suffix != RECIPE_SUFFIX:
+            return None
+        return relative.parts[0], path.stem
+
+    def _index_file(self, path: Path) -> bool:
+        """(Re)indexes one recipe file if it changed. Returns True if the index changed."""
+        key = self._key_for(path)
+        if key is None:
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return self._remove_file(path)
+        signature = (stat.st_mtime, stat.st_size)
+        if self._stats.get(path) == signature and key in self._recipes:
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                recipe = parse_recipe(f.read())
+        except Exception as e:
+            print(f"Error reading recipe {key[0]}/{key[1]}: {e}")
+            return self._remove_file(path)
+        self._recipes[key] = recipe
+        self._stats[path] = signature
+        return True
+
+    def _remove_file(self, path: Path) -> bool:
+        key = self._key_for(path)
+        self._stats.pop(path, None)
+        return key is not None and self._recipes.pop(key, None) is not None
+
+    def _scan_category(self, category_path: Path) -> bool:
+        changed = False
+        try:
+            self._dir_mtimes[category_path] = category_path.stat().st_mtime
+            present = {entry for entry in category_path.iterdir() if entry.suffix == RECIPE_SUFFIX and entry.is_file()}
+        except OSError:
+            present = set()
+        for path in [p for p in self._stats if p.parent == category_path and p not in present]:
+            changed |= self._remove_file(path)
+        for path in present:
+            changed |= self._index_file(path)
+        return changed
+
+    def _scan(self) -> bool:
+        """Incremental rescan: directories whose mtime changed are re-listed, known files are re-stat'ed."""
+        changed = False
+        if not self.root.is_dir():
+            changed = bool(self._recipes)
+            self._recipes.clear(); self._stats.clear(); self._dir_mtimes.clear()
+        else:
+            root_mtime = self.root.stat().st_mtime
+            if self._dir_mtimes.get(self.root) != root_mtime:
+                self._dir_mtimes[self.root] = root_mtime
+                categories = {entry for entry in self.root.iterdir() if entry.is_dir()}
+                for gone in [d for d in self._dir_mtimes if d != self.root and d not in categories]:
+                    del self._dir_mtimes[gone]
+                    for path in [p for p in self._stats if p.parent == gone]:
+                        changed |= self._remove_file(path)
+            else:
+                categories = [d for d in self._dir_mtimes if d != self.root]
+            for category_path in categories:
+                try:
+                    dir_mtime = category_path.stat().st_mtime
+                except OSError:
+                    dir_mtime = None
+                if self._dir_mtimes.get(category_path) != dir_mtime:
+                    changed |= self._scan_category(category_path)
+                else:
+                    # Same set of files; in-place edits only show up on the files themselves
+                    for path in [p for p in self._stats if p.parent == category_path]:
+                        changed |= self._index_file(path)
+        if changed or not self._built:
+            self._rebuild_listing()
+        return changed
+
+    def _rebuild_listing(self):
+        listing: Dict[str, List[str]] = {category.name: [] for category in self._dir_mtimes if category != self.root}
+        for category, name in sorted(self._recipes):
+            listing.setdefault(category, []).append(name)
+        self._listing = listing # Swapped whole so readers never see a half-built listing
+        self.version += 1
+
+    def refresh_path(self, path: Path):
+        """Applies a single watcher event: recipe files are re-indexed alone, anything else triggers a rescan."""
+        with self._lock:
+            if self._key_for(path) is None:
+                self._scan()
+            elif self._index_file(path):
+                self._rebuild_listing()
+
+    def refresh(self) -> bool:
+        with self._lock:
+            return self._scan()
+
+    def start_watching(self):
+        if self._watcher is not None or not self.root.is_dir():
+            return
+        if self._missed_events:
+            self._missed_events = False
+            self.refresh() # Catch up on edits made while stopped
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(_WatchdogHandler(self), str(self.root), recursive=True)
+            observer.daemon = True
+            observer.start()
+            self._watcher = observer
+        else:
+            stop_event = threading.Event()
+            def poll():
+                while not stop_event.wait(self.poll_interval):
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        print(f"Error refreshing recipe index: {e}")
+            thread = threading.Thread(target=poll, name="recipe-index-poller", daemon=True)
+            thread.start()
+            self._watcher = stop_event
+
+    def stop_watching(self):
+        if Observer is not None and isinstance(self._watcher, Observer):
+            self._watcher.stop()
+        elif isinstance(self._watcher, threading.Event):
+            self._watcher.set()
+        self._watcher = None
+        self._missed_events = self._built
+
+recipe_index = RecipeIndex() # Global instance backing the default recipe functions
+
+def get_recipes() -> Dict[str, List[str]]:
+    return recipe_index.get_recipes()
+
+def read_recipe(category: str, name: str) -> Optional[Dict[str, Any]]:
+    return recipe_index.read_recipe(category, name)
+
+def render_recipe(category: str, name: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    return recipe_index.render_recipe(category, name, params)
@@ -0,0 +1,204 @@
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from local_llm_backend.services.recipe_manager import RecipeIndex
+
+np = None # numpy, imported on first use: embedding search is optional and BM25 works without it
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+RRF_K = 60 # Reciprocal-rank-fusion damping used to blend the BM25 and embedding rankings
+
+def _load_numpy() -> bool:
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+def _supports_embeddings(llm_client) -> bool:
+    return llm_client is not None and getattr(llm_client, "supports_embeddings", False) is True
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+def _document_text(key: Tuple[str, str], recipe: Dict[str, Any]) -> str:
+    category, name = key
+    return " ".join(filter(None, [category, name, recipe.get("name"), recipe.get("description"), recipe.get("prompt")]))
+
+class RecipeSearchIndex:
+    """
+    BM25 inverted index over recipe names, descriptions and prompts, with optional embedding vectors.
+
+    The index follows a RecipeIndex by version: on each query only recipes that were added, edited
+    or removed since the last sync are re-tokenized (and re-embedded). Embeddings are computed in a
+    background task, so queries never wait on more than embedding the query itself. LLM clients are
+    taken from a ClientRotation and leased for as long as each use lasts, background embedding included.
+    """
+    def __init__(self, source: RecipeIndex, k1: float = 1.5, b: float = 0.75, embed_batch_size: int = 32):
+        self.source = source
+        self.k1 = k1
+        self.b = b
+        self.embed_batch_size = embed_batch_size
+        self._version = None
+        self._docs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._doc_terms: Dict[Tuple[str, str], Counter] = {}
+        self._doc_lengths: Dict[Tuple[str, str], int] = {}
+        self._postings: Dict[str, Dict[Tuple[str, str], int]] = {} # term -> {doc key: term frequency}
+        self._total_length = 0
+        # Embedding state
+        self._embedding_model: Optional[str] = None
+        self._vectors: Dict[Tuple[str, str], Any] = {} # doc key -> unit-length float32 vector
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {} # doc key -> recipe awaiting a vector
+        self._matrix = None
+        self._matrix_keys: List[Tuple[str, str]] = []
+        self._embed_task: Optional[asyncio.Task] = None
+
+    def sync(self) -> bool:
+        """Applies recipe changes since the last sync. Returns True if anything changed."""
+        self.source.ensure_built()
+        if self.source.version == self._version:
+            return False # Skip copying the recipe table when nothing moved
+        version, recipes = self.source.snapshot()
+        changed = False
+        for key in [key for key in self._docs if key not in recipes]:
+            self._remove(key)
+            changed = True
+        for key, recipe in recipes.items():
+            if self._docs.get(key) is not recipe:
+                self._remove(key)
+                self._add(key, recipe)
+                changed = True
+        self._version = version
+        return changed
+
+    def _add(self, key, recipe):
+        terms = Counter(tokenize(_document_text(key, recipe)))
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[key] = frequency
+        self._docs[key] = recipe
+        self._doc_terms[key] = terms
+        self._doc_lengths[key] = sum(terms.values())
+        self._total_length += self._doc_lengths[key]
+        if self._embedding_model:
+            self._pending[key] = recipe
+
+    def _remove(self, key):
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(key)
+        del self._docs[key]
+        self._pending.pop(key, None)
+        if self._vectors.pop(key, None) is not None:
+            self._matrix = None
+
+    def bm25(self, query: str, limit: int) -> List[Tuple[Tuple[str, str], float]]:
+        doc_count = len(self._docs)
+        if not doc_count:
+            return []
+        average_length = self._total_length / doc_count
+        scores: Dict[Tuple[str, str], float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[key] / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+    def set_embedding_model(self, model: Optional[str]):
+        if model == self._embedding_model:
+            return
+        self._embedding_model = model
+        self._vectors.clear()
+        self._matrix = None
+        self._pending = dict(self._docs) if model else {}
+
+    async def _embed_pending(self, llm_clients):
+        async with llm_clients.use() as llm_client: # Its own lease: the request that started it may finish first
+            if _supports_embeddings(llm_client):
+                await self._embed_batches(llm_client)
+
+    async def _embed_batches(self, llm_client):
+        while self._pending and self._embedding_model:
+            model = self._embedding_model
+            batch = list(self._pending.items())[:self.embed_batch_size]
+            try:
+                vectors = await llm_client.embed(model, [_document_text(key, recipe) for key, recipe in batch])
+            except Exception as e:
+                print(f"Error embedding recipes with '{model}': {e}")
+                return
+            if model != self._embedding_model:
+                continue
+            for (key, recipe), vector in zip(batch, vectors):
+                if self._pending.get(key) is not recipe:
+                    continue # Edited or removed while we were waiting
+                del self._pending[key]
+                vector = np.asarray(vector, dtype=np.float32)
+                norm = float(np.linalg.norm(vector))
+                self._vectors[key] = vector / norm if norm else vector
+            self._matrix = None
+
+    def ensure_embeddings(self, llm_clients):
+        if not self._pending or not _load_numpy():
+            return
+        if self._embed_task is None or self._embed_task.done():
+            self._embed_task = asyncio.create_task(self._embed_pending(llm_clients))
+
+    def cosine(self, query_vector, limit: int) -> List[Tuple[Tuple[str, str], float]]:
+        if not self._vectors:
+            return []
+        if self._matrix is None:
+            self._matrix_keys = list(self._vectors)
+            self._matrix = np.vstack([self._vectors[key] for key in self._matrix_keys])
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        if query_vector.shape[0] != self._matrix.shape[1]:
+            return []
+        norm = float(np.linalg.norm(query_vector))
+        scores = self._matrix @ (query_vector / norm if norm else query_vector)
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(self._matrix_keys[i], float(scores[i])) for i in top]
+
+    async def search(self, query: str, limit: int = 10, llm_clients=None, embedding_model: Optional[str] = None) -> List[Dict[str, Any]]:
+        self.sync()
+        self.set_embedding_model(embedding_model if embedding_model and _load_numpy() else None)
+        candidates = max(limit * 3, 30)
+        rankings = [self.bm25(query, candidates)]
+        if self._embedding_model and llm_clients is not None and _supports_embeddings(llm_clients.current):
+            self.ensure_embeddings(llm_clients)
+            try:
+                async with llm_clients.use() as llm_client:
+                    if _supports_embeddings(llm_client): # The provider may have been switched meanwhile
+                        query_vector = (await llm_client.embed(self._embedding_model, [query]))[0]
+                        rankings.append(self.cosine(query_vector, candidates))
+            except Exception as e:
+                print(f"Error embedding recipe search query: {e}")
+        if len(rankings) == 1:
+            ranked = rankings[0][:limit]
+        else:
+            fused: Dict[Tuple[str, str], float] = {}
+            for ranking in rankings:
+                for rank, (key, _) in enumerate(ranking):
+                    fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+            ranked = heapq.nlargest(limit, fused.items(), key=itemgetter(1))
+        return [
+            {"category": key[0], "name": key[1], "description": self._docs[key].get("description", ""), "score": round(score, 6)}
+            for key, score in ranked
+        ]
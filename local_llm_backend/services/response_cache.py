@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+class ResponseCache:
+    """
+    Exact-match cache for deterministic generations.
+
+    Entries are the NDJSON chunk stream a generation produced, so a hit can be replayed to
+    streaming clients unchanged or aggregated for non-streaming ones. The memory tier is an
+    LRU bounded by total bytes; the optional disk tier keeps entries across restarts and is an
+    LRU of its own, bounded by `disk_max_bytes`.
+    """
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        deterministic_only: bool = True,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.size_bytes = 0
+        self._disk_entries: Optional["OrderedDict[str, int]"] = None # key -> size, oldest first; listed on first use
+        self._disk_lock = threading.Lock() # Disk reads and writes run in worker threads
+        self.disk_size_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.disk_dir: Optional[Path] = None
+        self.configure(enabled, max_bytes, disk_dir, deterministic_only, disk_max_bytes)
+
+    def configure(self, enabled: bool, max_bytes: int, disk_dir: Optional[str] = None, deterministic_only: bool = True, disk_max_bytes: int = 512 * 1024 * 1024):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.deterministic_only = deterministic_only
+        with self._disk_lock:
+            new_dir = Path(disk_dir) if disk_dir else None
+            if new_dir != self.disk_dir:
+                self._disk_entries, self.disk_size_bytes = None, 0
+            self.disk_dir = new_dir
+            self.disk_max_bytes = disk_max_bytes
+            if self._disk_entries is not None:
+                self._evict_disk()
+        self._evict()
+
+    def is_cacheable(self, options: Dict[str, Any]) -> bool:
+        if not self.enabled:
+            return False
+        return not self.deterministic_only or options.get("temperature") == 0
+
+    @staticmethod
+    def make_key(provider: str, api_base: Optional[str], model: str, prompt: str, options: Dict[str, Any]) -> str:
+        # api_base keeps two servers of the same provider (e.g. a local and a remote Ollama) apart
+        material = json.dumps([provider, api_base, model, prompt, options], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        if self.disk_dir is not None:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._put_memory(key, entry)
+                return entry
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, ndjson: bytes):
+        self.stores += 1
+        self._put_memory(key, ndjson)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, ndjson)
+
+    async def clear(self):
+        """Drops every entry, on disk too."""
+        self._entries.clear()
+        self.size_bytes = 0
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._clear_disk)
+
+    def _put_memory(self, key: str, ndjson: bytes):
+        if len(ndjson) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= len(previous)
+        self._entries[key] = ndjson
+        self.size_bytes += len(ndjson)
+        self._evict()
+
+    def _evict(self):
+        while self.size_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.ndjson"
+
+    def _load_disk_entries(self):
+        """Lists the disk tier once, least recently used first, so it can be bounded without rescanning."""
+        if self._disk_entries is not None:
+            return
+        found = []
+        try:
+            for path in self.disk_dir.glob("*.ndjson"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, path.name[:-len(".ndjson")], stat.st_size))
+        except OSError:
+            pass
+        self._disk_entries = OrderedDict((key, size) for _, key, size in sorted(found))
+        self.disk_size_bytes = sum(self._disk_entries.values())
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while self.disk_size_bytes > self.disk_max_bytes and self._disk_entries:
+            key, size = self._disk_entries.popitem(last=False)
+            self.disk_size_bytes -= size
+            self.disk_evictions += 1
+            try:
+                self._disk_path(key).unlink()
+            except OSError:
+                pass
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        with self._disk_lock:
+            self._load_disk_entries()
+            if key not in self._disk_entries:
+                return None
+            path = self._disk_path(key)
+            try:
+                entry = path.read_bytes()
+                os.utime(path) # Recency survives restarts
+            except OSError:
+                self.disk_size_bytes -= self._disk_entries.pop(key)
+                return None
+            self._disk_entries.move_to_end(key)
+            return entry
+
+    def _write_disk(self, key: str, ndjson: bytes):
+        if len(ndjson) > self.disk_max_bytes:
+            return
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            # A unique temp file per write, so concurrent stores of the same key never share one
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, prefix=f".{key}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(ndjson)
+                os.replace(tmp_path, self._disk_path(key))
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            print(f"Error writing response cache entry {key}: {e}")
+            return
+        with self._disk_lock:
+            self._load_disk_entries()
+            self.disk_size_bytes += len(ndjson) - self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = len(ndjson)
+            self._evict_disk()
+
+    def _clear_disk(self):
+        with self._disk_lock:
+            for path in list(self.disk_dir.glob("*.ndjson")) + list(self.disk_dir.glob(".*.tmp")):
+                try:
+                    path.unlink()
+                except OSError as e:
+                    print(f"Error removing response cache entry {path.name}: {e}")
+            self._disk_entries, self.disk_size_bytes = OrderedDict(), 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            "disk_entries": len(self._disk_entries) if self._disk_entries is not None else None, # None until the disk tier is first used
+            "disk_size_bytes": self.disk_size_bytes,
+            "disk_max_bytes": self.disk_max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk_evictions,
+        }
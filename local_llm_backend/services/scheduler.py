@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+class QueueFullError(Exception):
+    def __init__(self, queue_position: int, retry_after: int):
+        super().__init__(f"LLM request queue is full (position {queue_position}).")
+        self.queue_position = queue_position
+        self.retry_after = retry_after
+
+class Lease:
+    """A granted execution slot. Release it exactly once when the generation finishes."""
+    def __init__(self, scheduler: "RequestScheduler", model: str, wait_time: float):
+        self.scheduler = scheduler
+        self.model = model
+        self.wait_time = wait_time
+        self.granted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.scheduler._release(self)
+
+class _ModelQueue:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.running = 0
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = [] # (priority, sequence, future) heap
+        self.avg_service_time = 0.0 # EWMA used for Retry-After estimates
+
+class RequestScheduler:
+    """
+    Admission control in front of the LLM client: a concurrency limit per model, a bounded
+    priority queue (interactive ahead of batch, FIFO within a class), and fast rejection once
+    the queue is full.
+    """
+    def __init__(self, max_concurrent_per_model: int = 1, max_queue: int = 32, model_limits: Optional[Dict[str, int]] = None):
+        self.max_concurrent_per_model = max_concurrent_per_model
+        self.max_queue = max_queue
+        self.model_limits = dict(model_limits or {})
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._sequence = itertools.count()
+        self.queued = 0
+        # Metrics
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def configure(self, max_concurrent_per_model: int, max_queue: int, model_limits: Optional[Dict[str, int]] = None):
+        self.max_concurrent_per_model = max_concurrent_per_model
+        self.max_queue = max_queue
+        self.model_limits = dict(model_limits or {})
+        for model, queue in self._queues.items():
+            queue.limit = self._limit_for(model)
+            self._dispatch(queue)
+
+    def _limit_for(self, model: str) -> int:
+        return max(1, self.model_limits.get(model, self.max_concurrent_per_model))
+
+    def _queue_for(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            queue = self._queues[model] = _ModelQueue(self._limit_for(model))
+        return queue
+
+    async def acquire(self, model: str, priority: str = "interactive") -> Lease:
+        queue = self._queue_for(model)
+        enqueued_at = time.monotonic()
+        if queue.running < queue.limit and not queue.waiters:
+            queue.running += 1
+            return self._grant(model, enqueued_at)
+        if self.queued >= self.max_queue:
+            self.rejected_total += 1
+            position = len(queue.waiters) + 1
+            raise QueueFullError(position, self._estimate_retry_after(queue, position))
+        future = asyncio.get_running_loop().create_future()
+        entry = (PRIORITIES.get(priority, PRIORITIES["batch"]), next(self._sequence), future)
+        heapq.heappush(queue.waiters, entry)
+        self.queued += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if entry in queue.waiters:
+                queue.waiters.remove(entry)
+                heapq.heapify(queue.waiters)
+                self.queued -= 1
+            elif future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                queue.running -= 1
+                self._dispatch(queue)
+            raise
+        return self._grant(model, enqueued_at)
+
+    def _grant(self, model: str, enqueued_at: float) -> Lease:
+        wait_time = time.monotonic() - enqueued_at
+        self.admitted_total += 1
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+        return Lease(self, model, wait_time)
+
+    def _release(self, lease: Lease):
+        queue = self._queues[lease.model]
+        service_time = time.monotonic() - lease.granted_at
+        queue.avg_service_time = service_time if queue.avg_service_time == 0 else 0.8 * queue.avg_service_time + 0.2 * service_time
+        queue.running -= 1
+        self._dispatch(queue)
+
+    def _dispatch(self, queue: _ModelQueue):
+        while queue.waiters and queue.running < queue.limit:
+            _, _, future = heapq.heappop(queue.waiters)
+            self.queued -= 1
+            queue.running += 1
+            future.set_result(None)
+
+    def _estimate_retry_after(self, queue: _ModelQueue, position: int) -> int:
+        service_time = queue.avg_service_time or 1.0
+        return max(1, math.ceil(service_time * position / queue.limit))
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queued,
+            "max_queue": self.max_queue,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "wait_time_avg": round(self.wait_time_total / self.admitted_total, 4) if self.admitted_total else 0.0,
+            "wait_time_max": round(self.wait_time_max, 4),
+            "models": {
+                model: {
+                    "running": queue.running,
+                    "queued": len(queue.waiters),
+                    "limit": queue.limit,
+                    "avg_service_time": round(queue.avg_service_time, 4),
+                }
+                for model, queue in self._queues.items()
+            },
+        }
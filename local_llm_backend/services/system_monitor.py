@@ -2,11 +2,30 @@ import psutil
 import platform
 import subprocess
 import json
-from typing import Dict, Any, List
+import asyncio
+import time
+from array import array
+from typing import Dict, Any, List, Callable, Optional
+
+# GPU tools that are not installed are remembered so periodic sampling doesn't keep forking them
+_MISSING_TOOLS = set()
+
+def _check_output(command: List[str], **kwargs) -> str:
+    if command[0] in _MISSING_TOOLS:
+        raise FileNotFoundError(command[0])
+    try:
+        return subprocess.check_output(command, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0), **kwargs)
+    except FileNotFoundError:
+        _MISSING_TOOLS.add(command[0])
+        raise
+
+# Prime psutil's CPU counter so the first non-blocking reading is meaningful
+psutil.cpu_percent(interval=None)
 
 def get_cpu_stats() -> Dict[str, Any]:
     return {
-        "percent": psutil.cpu_percent(interval=1),
+        # Non-blocking: utilisation since the previous call, i.e. over the last sampling interval
+        "percent": psutil.cpu_percent(interval=None),
         "cores": psutil.cpu_count(logical=False),
         "threads": psutil.cpu_count(logical=True),
     }
@@ -27,9 +46,9 @@ def get_gpu_stats() -> List[Dict[str, Any]]:
         try:
             # Try to get GPU info via WMIC for NVIDIA/AMD
             # This is a best-effort approach; direct driver interaction is complex
-            output = subprocess.check_output(
+            output = _check_output(
                 ["wmic", "path", "Win32_VideoController", "get", "Name,AdapterRAM"],
-                text=True, creationflags=subprocess.CREATE_NO_WINDOW
+                text=True
             ).strip().split("\n")
             
             for line in output[1:]:
@@ -47,9 +66,9 @@ def get_gpu_stats() -> List[Dict[str, Any]]:
     
     # Attempt to use nvidia-smi if available
     try:
-        output = subprocess.check_output(
+        output = _check_output(
             ["nvidia-smi", "--query-gpu=gpu_name,memory.total,memory.used,utilization.gpu,temperature.gpu", "--format=csv,nounits,noheader"],
-            text=True, creationflags=subprocess.CREATE_NO_WINDOW
+            text=True
         ).strip().split("\n")
         for line in output:
             if line.strip():
@@ -75,7 +94,7 @@ def get_gpu_stats() -> List[Dict[str, Any]]:
     # Attempt to use roc-smi if available (for AMD GPUs on Linux)
     if platform.system() == "Linux":
         try:
-            output = subprocess.check_output(["roc-smi", "--json"], text=True).strip()
+            output = _check_output(["roc-smi", "--json"], text=True).strip()
             data = json.loads(output)
             for gpu_info in data:
                 gpus.append({
@@ -95,7 +114,7 @@ def get_gpu_stats() -> List[Dict[str, Any]]:
         try:
             # On Linux, try lspci if no other method worked.
             if platform.system() == "Linux":
-                output = subprocess.check_output(["lspci", "-vmmd", "::0300"], text=True).strip().split("\n\n")
+                output = _check_output(["lspci", "-vmmd", "::0300"], text=True).strip().split("\n\n")
                 for device_block in output:
                     if device_block.strip():
                         name = "Unknown GPU"
@@ -121,3 +140,185 @@ def get_system_stats() -> Dict[str, Any]:
         "gpus": get_gpu_stats(),
         "timestamp": psutil.boot_time(),
     }
+
+class StatsHistory:
+    """
+    Fixed-capacity ring buffer of CPU/RAM/GPU samples backed by typed arrays.
+
+    Each column is a preallocated `array`, so memory is fixed up front (roughly 20 bytes per
+    sample plus 12 per GPU; six hours at a 2s interval is well under 1 MB).
+    """
+    GPU_FIELDS = ("usage", "memory_usage", "temperature")
+
+    def __init__(self, capacity: int, max_gpus: int = 8):
+        self.capacity = max(1, capacity)
+        self.max_gpus = max_gpus
+        self.timestamps = array("d", bytes(8 * self.capacity))
+        self.cpu = array("f", bytes(4 * self.capacity))
+        self.ram = array("f", bytes(4 * self.capacity))
+        self.gpu_count = 0 # Fixed by the first sample that reports GPUs
+        self.gpu_columns: Dict[str, List[array]] = {}
+        self._next = 0
+        self.size = 0
+
+    def append(self, snapshot: Dict[str, Any], timestamp: Optional[float] = None):
+        i = self._next
+        self.timestamps[i] = timestamp if timestamp is not None else time.time()
+        self.cpu[i] = snapshot.get("cpu", {}).get("percent") or 0.0
+        self.ram[i] = snapshot.get("ram", {}).get("percent") or 0.0
+        gpus = snapshot.get("gpus") or []
+        if not self.gpu_count and gpus:
+            self.gpu_count = min(len(gpus), self.max_gpus)
+            self.gpu_columns = {field: [array("f", bytes(4 * self.capacity)) for _ in range(self.gpu_count)] for field in self.GPU_FIELDS}
+        for g in range(self.gpu_count):
+            gpu = gpus[g] if g < len(gpus) else {}
+            for field in self.GPU_FIELDS:
+                self.gpu_columns[field][g][i] = gpu.get(field) or 0.0
+        self._next = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def resized(self, capacity: int) -> "StatsHistory":
+        """A copy with room for `capacity` samples, keeping the newest ones that fit."""
+        history = StatsHistory(capacity, self.max_gpus)
+        history.gpu_count = self.gpu_count
+        history.gpu_columns = {field: [array("f", bytes(4 * history.capacity)) for _ in range(self.gpu_count)] for field in self.GPU_FIELDS} if self.gpu_count else {}
+        keep = min(self.size, history.capacity)
+        for j, n in enumerate(range(self.size - keep, self.size)):
+            i = self._slot(n)
+            history.timestamps[j] = self.timestamps[i]
+            history.cpu[j] = self.cpu[i]
+            history.ram[j] = self.ram[i]
+            for field, columns in self.gpu_columns.items():
+                for g, column in enumerate(columns):
+                    history.gpu_columns[field][g][j] = column[i]
+        history.size = keep
+        history._next = keep % history.capacity
+        return history
+
+    def _slot(self, n: int) -> int:
+        """Maps the n-th oldest retained sample to its slot in the ring."""
+        return (self._next - self.size + n) % self.capacity
+
+    def _first_after(self, since: float) -> int:
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._slot(mid)] <= since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self, since: Optional[float] = None, resolution: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Returns samples newer than `since` downsampled into `resolution`-second buckets
+        with min/max/avg per series. Without a resolution every sample is its own bucket.
+        """
+        start = self._first_after(since) if since is not None else 0
+        series = {"cpu": self.cpu, "ram": self.ram}
+        for field, columns in self.gpu_columns.items():
+            for g, column in enumerate(columns):
+                series[f"gpu{g}_{field}"] = column
+        buckets = {name: {"min": [], "max": [], "avg": []} for name in series}
+        bucket_times: List[float] = []
+        acc = {name: [0.0, 0.0, 0.0] for name in series} # min, max, sum
+        count = 0
+        bucket_key = None
+        last_timestamp = None
+
+        def flush():
+            bucket_times.append(bucket_key * resolution if resolution else bucket_key)
+            for name, (lo, hi, total) in acc.items():
+                buckets[name]["min"].append(round(lo, 2))
+                buckets[name]["max"].append(round(hi, 2))
+                buckets[name]["avg"].append(round(total / count, 2))
+
+        for n in range(start, self.size):
+            i = self._slot(n)
+            ts = self.timestamps[i]
+            key = int(ts // resolution) if resolution else ts
+            if key != bucket_key:
+                if count:
+                    flush()
+                bucket_key, count = key, 0
+            for name, column in series.items():
+                value = column[i]
+                a = acc[name]
+                if count == 0:
+                    a[0] = a[1] = a[2] = value
+                else:
+                    if value < a[0]: a[0] = value
+                    if value > a[1]: a[1] = value
+                    a[2] += value
+            count += 1
+            last_timestamp = ts
+        if count:
+            flush()
+
+        gpus = [{field: buckets.pop(f"gpu{g}_{field}") for field in self.GPU_FIELDS} for g in range(self.gpu_count)]
+        return {
+            "resolution": resolution,
+            "last_timestamp": last_timestamp, # Pass back as `since` to fetch only newer samples
+            "timestamps": bucket_times,
+            "cpu": buckets["cpu"],
+            "ram": buckets["ram"],
+            "gpus": gpus,
+        }
+
+class SystemStatsSampler:
+    """
+    Collects system stats on a fixed interval in a worker thread and keeps the latest snapshot,
+    so request handlers never run psutil or GPU tool subprocesses on the event loop.
+    """
+    def __init__(self, collect_fn: Callable[[], Dict[str, Any]] = get_system_stats, interval: float = 2.0, history: Optional[StatsHistory] = None):
+        self.collect_fn = collect_fn
+        self.interval = interval
+        self.history = history
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._sampled_at = 0.0
+        self._first_sample = asyncio.Event()
+        self._sample_event = asyncio.Event() # Replaced after every sample to wake next_sample() waiters
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                self._snapshot = await asyncio.to_thread(self.collect_fn)
+                self._sampled_at = time.monotonic()
+                self._first_sample.set()
+                if self.history is not None:
+                    self.history.append(self._snapshot)
+                self._sample_event.set()
+                self._sample_event = asyncio.Event()
+            except Exception as e:
+                print(f"System stats sampling failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def peek(self) -> Optional[Dict[str, Any]]:
+        """The most recent snapshot, or None before the first sample. Never waits."""
+        return self._snapshot
+
+    async def latest(self) -> Dict[str, Any]:
+        """Returns the most recent snapshot with its age in seconds, waiting only for the very first sample."""
+        if self._snapshot is None:
+            await asyncio.wait_for(self._first_sample.wait(), timeout=max(5.0, self.interval * 2))
+        return {**self._snapshot, "sample_age": round(time.monotonic() - self._sampled_at, 3)}
+
+    async def next_sample(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Waits for the next sample to be collected and returns it. Raises asyncio.TimeoutError on timeout."""
+        await asyncio.wait_for(self._sample_event.wait(), timeout=timeout)
+        return await self.latest()
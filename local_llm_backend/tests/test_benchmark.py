@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+
+from local_llm_backend.benchmarks.harness import compare, percentile, run_benchmark, start_local_stack
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) is None
+
+def test_compare_flags_latency_throughput_and_error_regressions():
+    baseline = [{"scenario": "generate", "concurrency": 4, "errors": 0, "p50": 100.0, "p99": 200.0, "requests_per_second": 40.0}]
+    steady = [{"scenario": "generate", "concurrency": 4, "errors": 0, "p50": 110.0, "p99": 210.0, "requests_per_second": 38.0}]
+    assert compare(steady, baseline, 0.2) == []
+    worse = [{"scenario": "generate", "concurrency": 4, "errors": 2, "p50": 130.0, "p99": 200.0, "requests_per_second": 20.0}]
+    regressions = compare(worse, baseline, 0.2)
+    assert len(regressions) == 3
+    assert any("p50" in r for r in regressions) and any("errors" in r for r in regressions)
+    assert compare(worse, [], 0.2) == [] # Nothing to compare against
+
+def test_benchmark_runs_against_mock_provider():
+    servers = start_local_stack(token_rate=1000.0, latency=0.01, tokens=5, max_concurrent=4)
+    try:
+        results = asyncio.run(run_benchmark(servers[-1].url, ["generate", "generate_stream", "recipes"], [1, 2], requests=4))
+        # The mock provider is reachable through the backend's configured client
+        assert httpx.get(f"{servers[0].url}/api/tags").json()["models"][0]["name"] == "mock"
+    finally:
+        for server in reversed(servers):
+            server.stop()
+    assert [(r["scenario"], r["concurrency"]) for r in results] == [
+        ("generate", 1), ("generate", 2), ("generate_stream", 1), ("generate_stream", 2), ("recipes", 1), ("recipes", 2)]
+    for result in results:
+        assert result["requests"] == 4 and result["errors"] == 0
+        assert result["p50"] <= result["p95"] <= result["p99"]
+        assert result["requests_per_second"] > 0
+    stream = next(r for r in results if r["scenario"] == "generate_stream")
+    assert stream["ttft_p50"] is not None and stream["ttft_p50"] <= stream["p50"]
@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from local_llm_backend.services.client_rotation import ClientRotation
+
+def make_client():
+    client = MagicMock()
+    client.aclose = AsyncMock()
+    return client
+
+def test_replaced_client_drains_before_closing():
+    async def scenario():
+        rotation = ClientRotation()
+        old, new = make_client(), make_client()
+        rotation.current = old
+        lease = rotation.acquire() # e.g. a stream still iterating
+        await rotation.replace(new)
+        assert rotation.current is new
+        assert rotation.acquire().client is new # New requests get the new client
+        await asyncio.sleep(0)
+        old.aclose.assert_not_awaited()
+        lease.release()
+        lease.release() # Idempotent
+        await asyncio.sleep(0.01)
+        old.aclose.assert_awaited_once()
+        new.aclose.assert_not_awaited()
+
+    asyncio.run(scenario())
+
+def test_idle_client_closes_immediately_and_stuck_one_after_timeout():
+    async def scenario():
+        rotation = ClientRotation(drain_timeout=0.05)
+        first, second, third = make_client(), make_client(), make_client()
+        rotation.current = first
+        await rotation.replace(second)
+        first.aclose.assert_awaited_once()
+        rotation.acquire() # Never released
+        await rotation.replace(third)
+        second.aclose.assert_not_awaited()
+        await asyncio.sleep(0.1)
+        second.aclose.assert_awaited_once()
+
+    asyncio.run(scenario())
+
+def test_close_shuts_down_draining_and_current_clients():
+    async def scenario():
+        rotation = ClientRotation()
+        old, new = make_client(), make_client()
+        rotation.current = old
+        async with rotation.use() as client:
+            assert client is old
+            await rotation.replace(new)
+            await rotation.close()
+        old.aclose.assert_awaited_once()
+        new.aclose.assert_awaited_once()
+
+    asyncio.run(scenario())
@@ -0,0 +1,26 @@
+import os
+
+from local_llm_backend.config import BackendConfig, MinerConfig
+from local_llm_backend.services.config_reload import ConfigFileWatcher, diff_config
+
+def test_diff_config_reports_changed_sections():
+    base = BackendConfig(llm={"provider": "ollama"})
+    miner = MinerConfig(name="m", miner_path="/m", wallet="w", pool="p", coin="c", worker="x")
+    assert diff_config(base, base.model_copy()) == set()
+    assert diff_config(base, base.model_copy(update={"miners": [miner]})) == {"miners"}
+    changed = BackendConfig(llm={"provider": "ollama", "api_base": "http://other:11434/v1"}, batch_concurrency=2)
+    assert diff_config(base, changed) == {"llm", "batch_concurrency"}
+    assert "llm" in diff_config(None, base)
+
+def test_watcher_detects_external_edits(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{}")
+    watcher = ConfigFileWatcher(path, on_change=None)
+    watcher._signature = watcher._stat()
+    assert not watcher.check()
+    path.write_text('{"miners": []}')
+    os.utime(path, ns=(0, 1)) # Force a distinct mtime regardless of filesystem timestamp resolution
+    assert watcher.check()
+    assert not watcher.check()
+    path.unlink()
+    assert not watcher.check() # A missing file keeps the current config
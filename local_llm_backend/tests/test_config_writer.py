@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+
+from local_llm_backend.config import write_atomic
+from local_llm_backend.services.config_writer import ConfigWriter
+
+def test_rapid_saves_are_coalesced_into_one_write():
+    saved = []
+
+    async def scenario():
+        writer = ConfigWriter(saved.append, debounce=0.05, max_delay=1.0)
+        for version in range(5):
+            writer.schedule({"version": version})
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+        writer.schedule({"version": 5})
+        await writer.flush()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert saved == [{"version": 4}, {"version": 5}]
+    assert writer.requests == 6 and writer.writes == 2
+
+def test_max_delay_bounds_a_continuous_burst():
+    saved = []
+
+    async def scenario():
+        writer = ConfigWriter(saved.append, debounce=0.05, max_delay=0.1)
+        for version in range(10):
+            writer.schedule(version)
+            await asyncio.sleep(0.03) # Never quiet for a whole debounce window
+        await writer.flush()
+
+    asyncio.run(scenario())
+    assert 2 <= len(saved) < 10
+    assert saved[-1] == 9
+
+def test_failed_save_is_reported_and_retried_by_the_next_one():
+    attempts = []
+
+    def flaky_save(config):
+        attempts.append(config)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+
+    async def scenario():
+        writer = ConfigWriter(flaky_save, debounce=0.01)
+        writer.schedule("first")
+        await writer.flush()
+        assert writer.last_error == "disk full"
+        writer.schedule("second")
+        await writer.flush()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert attempts == ["first", "second"] and writer.last_error is None
+
+def test_write_atomic_replaces_file_and_keeps_mode(tmp_path):
+    target = tmp_path / "config.json"
+    target.write_text("{}")
+    os.chmod(target, 0o644)
+    write_atomic(target, json.dumps({"miners": []}))
+    assert json.loads(target.read_text()) == {"miners": []}
+    assert oct(os.stat(target).st_mode & 0o777) == oct(0o644)
+    assert [p.name for p in tmp_path.iterdir()] == ["config.json"] # No temp file left behind
@@ -0,0 +1,45 @@
+import asyncio
+
+from local_llm_backend.services.generation_registry import GenerationRegistry, iterate_until_cancelled
+
+def test_cancel_stops_iteration_and_closes_upstream():
+    closed = []
+    async def upstream():
+        try:
+            for i in range(100):
+                await asyncio.sleep(0.01)
+                yield {"n": i}
+        finally:
+            closed.append(True)
+
+    async def run():
+        registry = GenerationRegistry()
+        generation = registry.register("llama2")
+        received = []
+        async for chunk in iterate_until_cancelled(upstream(), generation, poll_interval=0.005):
+            received.append(chunk)
+            if len(received) == 3:
+                registry.cancel(generation.id)
+        return received, generation
+
+    received, generation = asyncio.run(run())
+    assert len(received) == 3
+    assert generation.cancel_reason == "cancelled"
+    assert closed == [True]
+
+def test_client_disconnect_cancels_while_waiting_for_a_chunk():
+    async def stalled_upstream():
+        await asyncio.sleep(10)
+        yield {}
+
+    async def is_disconnected():
+        return True
+
+    async def run():
+        generation = GenerationRegistry().register("llama2")
+        received = [chunk async for chunk in iterate_until_cancelled(stalled_upstream(), generation, is_disconnected, poll_interval=0.01)]
+        return received, generation
+
+    received, generation = asyncio.run(asyncio.wait_for(run(), timeout=2))
+    assert received == []
+    assert generation.cancel_reason == "client_disconnected"
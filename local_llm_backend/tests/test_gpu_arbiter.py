@@ -0,0 +1,112 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+from local_llm_backend.config import MinerConfig
+from local_llm_backend.services.gpu_arbiter import GpuArbiter
+from local_llm_backend.services.metrics import BackendMetrics
+
+class FakeProcessManager:
+    def __init__(self, names):
+        self.processes = {name: MagicMock(poll=lambda: None) for name in names}
+        self.suspended = set()
+        self.threads = set()
+
+    def suspend_process(self, name):
+        self.threads.add(threading.current_thread())
+        self.suspended.add(name)
+        return True
+
+    def resume_process(self, name):
+        self.suspended.discard(name)
+        return True
+
+def make_miner(name, device):
+    return MinerConfig(name=name, miner_path="t-rex", wallet="w", pool="p", coin="ETH", worker="x", device=device)
+
+def make_arbiter(busy, metrics=None, on_resume=None, **config):
+    manager = FakeProcessManager(["miner_gpu0", "miner_gpu1", "miner_any"])
+    miners = [make_miner("gpu0", 0), make_miner("gpu1", 1), make_miner("any", None)]
+    arbiter = GpuArbiter(manager, is_busy=lambda: busy[0], get_miners=lambda: miners, metrics=metrics, on_resume=on_resume)
+    arbiter.configure(**{"enabled": True, "mode": "pause", "llm_devices": [0], "idle_grace_seconds": 30.0,
+                         "throttle_duty": 0.25, "throttle_period": 2.0, **config})
+    return arbiter, manager
+
+def test_pauses_miners_on_llm_devices_and_resumes_after_grace():
+    async def scenario():
+        busy = [False]
+        arbiter, manager = make_arbiter(busy)
+        await arbiter.engage()
+        assert manager.suspended == {"miner_gpu0", "miner_any"} # gpu1 does not share the LLM's card
+        busy[0] = True
+        await arbiter.step(now=100.0)
+        busy[0] = False
+        await arbiter.step(now=110.0) # Idle, but still inside the grace period
+        assert arbiter.engaged and manager.suspended
+        await arbiter.step(now=131.0)
+        assert not arbiter.engaged and manager.suspended == set()
+        metrics = arbiter.metrics()
+        assert (metrics["pause_events"], metrics["resume_events"]) == (1, 1)
+        assert [event["action"] for event in metrics["recent_events"]] == ["pause", "resume"]
+
+    asyncio.run(scenario())
+
+def test_throttle_mode_duty_cycles_miners():
+    async def scenario():
+        busy = [True]
+        arbiter, manager = make_arbiter(busy, mode="throttle")
+        await arbiter.step(now=1000.1) # First quarter of the period: miners may run
+        assert manager.suspended == set() and arbiter.engaged
+        await arbiter.step(now=1001.0)
+        assert manager.suspended == {"miner_gpu0", "miner_any"}
+
+    asyncio.run(scenario())
+
+def test_disabled_arbiter_leaves_miners_alone_and_releases_on_disable():
+    async def scenario():
+        busy = [True]
+        arbiter, manager = make_arbiter(busy, enabled=False)
+        await arbiter.engage()
+        await arbiter.step()
+        assert manager.suspended == set()
+        arbiter.enabled = True
+        await arbiter.step()
+        assert manager.suspended
+        arbiter.enabled = False
+        await arbiter.step()
+        assert manager.suspended == set() and not arbiter.engaged
+
+    asyncio.run(scenario())
+
+def test_estimates_latency_saved_against_contended_baseline():
+    async def scenario():
+        busy = [False]
+        arbiter, _ = make_arbiter(busy)
+        arbiter.record_generation(duration_ms=2000, tokens=100) # Miners hashing: 20 ms/token
+        await arbiter.engage()
+        arbiter.record_generation(duration_ms=1000, tokens=100) # Paused: 10 ms/token
+        metrics = arbiter.metrics()
+        assert metrics["ms_per_token"] == {"contended": 20.0, "uncontended": 10.0}
+        assert metrics["estimated_saved_ms"] == 1000.0
+
+    asyncio.run(scenario())
+
+def test_signals_miners_off_the_loop_and_reports_to_backend_metrics():
+    resumed = []
+
+    async def scenario():
+        busy = [False]
+        backend_metrics = BackendMetrics()
+        arbiter, manager = make_arbiter(busy, metrics=backend_metrics, on_resume=resumed.append)
+        arbiter.record_generation(duration_ms=2000, tokens=100)
+        await arbiter.engage()
+        assert threading.current_thread() not in manager.threads # Suspending ran in a worker thread
+        arbiter.record_generation(duration_ms=1000, tokens=100)
+        await arbiter.release()
+        return backend_metrics
+
+    backend_metrics = asyncio.run(scenario())
+    assert sorted(resumed) == ["any", "gpu0"]
+    assert (backend_metrics.gpu_arbiter_events.value("pause"), backend_metrics.gpu_arbiter_events.value("resume")) == (1, 1)
+    assert backend_metrics.gpu_arbiter_saved_seconds.value() == 1.0
+    assert "gpu_arbiter_events_total{action=\"pause\"} 1.0" in backend_metrics.render()
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from local_llm_backend.services.job_runner import BatchJob, JobConflictError, JobManager
+
+def write_requests(path, prompts):
+    path.write_text("".join(json.dumps({"id": f"r{i}", "prompt": p}) + "\n" for i, p in enumerate(prompts)))
+
+def read_results(path):
+    return sorted((json.loads(line) for line in path.read_text().splitlines()), key=lambda r: r["line"])
+
+def test_job_writes_one_result_per_line_and_summarises(tmp_path):
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_requests(input_path, ["a", "b", "c"])
+    async def generate(model, prompt, options):
+        if prompt == "b":
+            raise RuntimeError("nope")
+        return {"choices": [{"message": {"content": prompt}}], "usage": {"completion_tokens": 2}}
+    summary = asyncio.run(BatchJob(str(input_path), str(output_path), generate, model="llama2", concurrency=2).run())
+    results = read_results(output_path)
+    assert [r["status"] for r in results] == ["ok", "error", "ok"]
+    assert results[0]["id"] == "r0"
+    assert summary["status"] == "COMPLETED"
+    assert (summary["succeeded"], summary["failed"]) == (2, 1)
+    assert json.loads((tmp_path / "out.jsonl.checkpoint").read_text()) == {"watermark": 3}
+
+def test_resume_skips_lines_already_written(tmp_path):
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_requests(input_path, ["a", "b", "c", "d"])
+    # Simulate a crash: lines 0 and 2 were written but only line 0 was checkpointed
+    output_path.write_text(json.dumps({"line": 0, "status": "ok"}) + "\n" + json.dumps({"line": 2, "status": "ok"}) + "\n")
+    (tmp_path / "out.jsonl.checkpoint").write_text(json.dumps({"watermark": 1}))
+    seen = []
+    async def generate(model, prompt, options):
+        seen.append(prompt)
+        return {"choices": []}
+    summary = asyncio.run(BatchJob(str(input_path), str(output_path), generate, model="llama2").run())
+    assert sorted(seen) == ["b", "d"]
+    assert summary["skipped"] == 1
+    assert [r["line"] for r in read_results(output_path)] == [0, 1, 2, 3]
+
+def test_resume_after_torn_write_keeps_every_result_parseable(tmp_path):
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_requests(input_path, ["a", "b"])
+    # Crash mid-write: line 0 complete, line 1 cut off without its newline
+    output_path.write_text(json.dumps({"line": 0, "status": "ok"}) + "\n" + '{"line": 1, "sta')
+    async def generate(model, prompt, options):
+        return {"choices": []}
+    summary = asyncio.run(BatchJob(str(input_path), str(output_path), generate, model="llama2").run())
+    assert summary["succeeded"] == 1
+    assert [r["line"] for r in read_results(output_path)] == [0, 1] # read_results fails on any unparseable line
+
+def test_manager_rejects_concurrent_jobs_on_one_output_and_prunes_finished(tmp_path):
+    input_path = tmp_path / "in.jsonl"
+    write_requests(input_path, ["a"])
+    async def run():
+        release = asyncio.Event()
+        async def generate(model, prompt, options):
+            await release.wait()
+            return {"choices": []}
+        manager = JobManager(max_finished=2)
+        first = manager.submit(BatchJob(str(input_path), str(tmp_path / "out.jsonl"), generate, model="m"))
+        with pytest.raises(JobConflictError):
+            manager.submit(BatchJob(str(input_path), str(tmp_path / "out.jsonl"), generate, model="m"))
+        release.set()
+        await first._task
+        for i in range(4):
+            await manager.submit(BatchJob(str(input_path), str(tmp_path / f"out{i}.jsonl"), generate, model="m"))._task
+        return manager
+    manager = asyncio.run(run())
+    assert [job.output_path.name for job in manager.jobs.values()] == ["out2.jsonl", "out3.jsonl"]
@@ -0,0 +1,30 @@
+import pytest
+
+from local_llm_backend.utils.json_patch import apply_patch, parse_pointer, JsonPatchConflict, JsonPatchError
+
+def test_apply_patch_supports_rfc6902_operations():
+    document = {"miners": [{"name": "a", "device": None}], "llm": {"provider": "ollama"}}
+    patched = apply_patch(document, [
+        {"op": "add", "path": "/miners/-", "value": {"name": "b"}},
+        {"op": "replace", "path": "/miners/0/device", "value": 1},
+        {"op": "copy", "from": "/llm/provider", "path": "/llm/previous"},
+        {"op": "move", "from": "/llm/previous", "path": "/provider_backup"},
+        {"op": "remove", "path": "/miners/1"},
+        {"op": "test", "path": "/miners/0/name", "value": "a"},
+    ])
+    assert patched == {"miners": [{"name": "a", "device": 1}], "llm": {"provider": "ollama"}, "provider_backup": "ollama"}
+    assert document["miners"] == [{"name": "a", "device": None}] # The input is left untouched
+
+def test_apply_patch_errors():
+    document = {"miners": [{"name": "a"}]}
+    with pytest.raises(JsonPatchConflict):
+        apply_patch(document, [{"op": "test", "path": "/miners/0/name", "value": "b"}])
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, [{"op": "replace", "path": "/missing", "value": 1}])
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, [{"op": "remove", "path": "/miners/01"}])
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, [{"op": "add", "path": "/miners/0"}]) # No value
+    with pytest.raises(JsonPatchError):
+        apply_patch(document, {"op": "add"})
+    assert parse_pointer("/a~1b/c~0d") == ["a/b", "c~d"]
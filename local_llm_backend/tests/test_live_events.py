@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from local_llm_backend.services.live_events import diff_sections, live_events
+
+class FakeSampler:
+    interval = 0.01
+    def __init__(self, samples):
+        self.samples = list(samples)
+    async def latest(self):
+        return self.samples[0]
+    async def next_sample(self, timeout=None):
+        self.samples.pop(0)
+        return self.samples[0]
+
+def test_diff_sections_reports_changed_and_removed_keys():
+    assert diff_sections({"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 5}) == {"b": 5, "c": None}
+
+def test_live_events_pushes_full_state_then_only_deltas():
+    sampler = FakeSampler([
+        {"cpu": {"percent": 10}, "ram": {"percent": 20}, "gpus": [], "sample_age": 0.1},
+        {"cpu": {"percent": 15}, "ram": {"percent": 20}, "gpus": [], "sample_age": 0.2},
+    ])
+    statuses = iter([{"m1": "STOPPED"}, {"m1": "STOPPED"}])
+    disconnected = iter([False, True])
+    async def is_disconnected():
+        return next(disconnected)
+    async def collect():
+        return [event async for event in live_events(sampler, lambda: next(statuses), is_disconnected)]
+    events = asyncio.run(collect())
+    parsed = [(e.split("\n")[0], json.loads(e.split("\n")[1][len("data: "):])) for e in events]
+    assert parsed == [
+        ("event: system_stats", {"cpu": {"percent": 10}, "ram": {"percent": 20}, "gpus": []}),
+        ("event: miner_status", {"m1": "STOPPED"}),
+        ("event: system_stats", {"cpu": {"percent": 15}}),
+    ]
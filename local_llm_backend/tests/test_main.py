@@ -4,7 +4,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
 import json
 import contextlib
+import os
 import sys
+import time
 
 # Since we are refactoring, we need to ensure the new config models are imported
 from local_llm_backend.config import BackendConfig, MinerConfig, OllamaProviderConfig
@@ -20,9 +22,11 @@ def mock_dependencies():
         mock_process_manager_instance = MockProcessManagerClass.return_value 
         
         mock_process_manager_instance.processes = {}
-        def mock_start_process(name, command, cwd=None):
+        def mock_start_process(name, command, cwd=None, on_output=None, auto_restart=False, on_start=None):
             if name not in mock_process_manager_instance.processes or mock_process_manager_instance.processes[name].poll() is not None:
                 mock_process_manager_instance.processes[name] = MagicMock(pid=12345, name=name, poll=lambda: None)
+                if on_start is not None:
+                    on_start()
                 return True
             return False
         mock_process_manager_instance.start_process.side_effect = mock_start_process
@@ -33,10 +37,13 @@ def mock_dependencies():
                 return True
             return False
         mock_process_manager_instance.stop_process.side_effect = mock_stop_process
+        mock_process_manager_instance.stop_processes.side_effect = lambda names: {name: mock_stop_process(name) for name in names}
 
         mock_process_manager_instance.get_process_status.side_effect = \
             lambda name: "RUNNING" if name in mock_process_manager_instance.processes and \
                                       mock_process_manager_instance.processes[name].poll() is None else "STOPPED"
+        mock_process_manager_instance.get_process_info.side_effect = \
+            lambda name: {"status": mock_process_manager_instance.get_process_status(name), "restarts": 0, "uptime": None}
 
         # --- Mock a generic LLMClient instance ---
         mock_llm_client_instance = MagicMock(spec=LLMClient)
@@ -70,6 +77,12 @@ def mock_dependencies():
 
         mock_get_recipes = MagicMock(return_value={"category1": ["recipe1", "recipe2"]})
         mock_read_recipe = MagicMock(return_value={"description": "Mock recipe", "prompt": "Mock prompt content"})
+        mock_render_recipe = MagicMock(side_effect=lambda category, name, params: {
+            "prompt": f"Mock prompt content\n\n{params['input']}", "model": None, "max_tokens": 256, "stop": ["###"],
+        })
+
+        mock_recipe_index = MagicMock(version=1)
+        mock_search_recipes = AsyncMock(return_value=[{"category": "category1", "name": "recipe1", "description": "Mock recipe", "score": 1.5}])
 
         yield {
             "mock_process_manager_instance": mock_process_manager_instance,
@@ -79,6 +92,9 @@ def mock_dependencies():
             "mock_save_config": mock_save_config,
             "mock_get_recipes": mock_get_recipes,
             "mock_read_recipe": mock_read_recipe,
+            "mock_recipe_index": mock_recipe_index,
+            "mock_render_recipe": mock_render_recipe,
+            "mock_search_recipes": mock_search_recipes,
         }
 
 @pytest.fixture
@@ -110,6 +126,10 @@ def client(mock_dependencies):
         get_system_stats_fn=mock_dependencies["mock_get_system_stats"],
         get_recipes_fn=mock_dependencies["mock_get_recipes"],
         read_recipe_fn=mock_dependencies["mock_read_recipe"],
+        render_recipe_fn=mock_dependencies["mock_render_recipe"],
+        search_recipes_fn=mock_dependencies["mock_search_recipes"],
+        recipe_index=mock_dependencies["mock_recipe_index"],
+        config_path=None,
     )
     
     with TestClient(app) as test_client:
@@ -120,6 +140,15 @@ def test_read_root(client):
     assert response.status_code == 200
     assert response.json() == {"message": "Local LLM Control Backend is running!"}
 
+def test_readiness(client):
+    assert client.app.state.ready_event.is_set()
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["startup_ms"] >= 0
+    client.app.state.ready_event.clear() # As during shutdown
+    assert client.get("/ready").status_code == 503
+
 def test_get_backend_config(client, mock_dependencies):
     response = client.get("/config")
     assert response.status_code == 200
@@ -140,27 +169,164 @@ def test_update_backend_config(client, mock_dependencies):
     response = client.post("/config", json=updated_config_data)
     assert response.status_code == 200
     assert response.json()["llm"]["project"] == "new-project"
-    
+    assert client.get("/config").json()["llm"]["project"] == "new-project" # Live before it reaches disk
+
+    client.portal.call(client.app.state.config_writer.flush) # Writes are debounced
     mock_dependencies["mock_save_config"].assert_called_once()
     saved_config = mock_dependencies["mock_save_config"].call_args[0][0]
     assert saved_config.llm.provider == "vertexai"
 
+def test_update_backend_config_closes_previous_llm_client(client, mock_dependencies):
+    updated_config_data = {
+        "miners": [],
+        "llm": {"provider": "ollama", "api_base": "http://other-ollama:11434/v1"},
+        "http_pool": {"max_connections": 4, "max_keepalive_connections": 2}
+    }
+    response = client.post("/config", json=updated_config_data)
+    assert response.status_code == 200
+    assert response.json()["http_pool"]["max_connections"] == 4
+    mock_dependencies["mock_llm_client_instance"].aclose.assert_awaited_once()
+
+def test_patch_backend_config_adds_miner_and_coalesces_saves(client, mock_dependencies):
+    new_miner = {"name": "second", "miner_path": "/bin/m", "wallet": "w", "pool": "p:1", "coin": "RVN", "worker": "w2"}
+    response = client.patch("/config", json=[{"op": "add", "path": "/miners/-", "value": new_miner}])
+    assert response.status_code == 200
+    assert [m["name"] for m in response.json()["miners"]] == ["test_miner", "second"]
+    response = client.patch("/config", json=[{"op": "replace", "path": "/batch_concurrency", "value": 8}])
+    assert response.json()["batch_concurrency"] == 8
+
+    client.portal.call(client.app.state.config_writer.flush)
+    mock_dependencies["mock_save_config"].assert_called_once() # Both edits landed in one write
+    saved_config = mock_dependencies["mock_save_config"].call_args[0][0]
+    assert saved_config.batch_concurrency == 8 and len(saved_config.miners) == 2
+
+def test_patch_backend_config_rejects_bad_patches(client, mock_dependencies):
+    response = client.patch("/config", json=[{"op": "test", "path": "/miners/0/name", "value": "other"}, {"op": "remove", "path": "/miners/0"}])
+    assert response.status_code == 409
+    assert client.get("/config").json()["miners"][0]["name"] == "test_miner" # Nothing applied
+    assert client.patch("/config", json=[{"op": "remove", "path": "/miners/5"}]).status_code == 400
+    assert client.patch("/config", json=[{"op": "replace", "path": "/batch_concurrency", "value": "lots"}]).status_code == 422
+    mock_dependencies["mock_save_config"].assert_not_called()
+
+def test_patch_miner_config(client, mock_dependencies):
+    response = client.patch("/config/miners/test_miner", json=[{"op": "replace", "path": "/wallet", "value": "new_wallet"}, {"op": "add", "path": "/device", "value": 1}])
+    assert response.status_code == 200
+    assert response.json()["wallet"] == "new_wallet" and response.json()["device"] == 1
+    assert client.get("/config").json()["miners"][0]["wallet"] == "new_wallet"
+    assert client.patch("/config/miners/missing", json=[]).status_code == 404
+
+def test_miner_only_change_keeps_llm_client(client, mock_dependencies):
+    response = client.patch("/config/miners/test_miner", json=[{"op": "replace", "path": "/worker", "value": "rig2"}])
+    assert response.status_code == 200
+    assert client.app.state.llm_clients.current is mock_dependencies["mock_llm_client_instance"]
+    mock_dependencies["mock_llm_client_instance"].aclose.assert_not_awaited()
+
+def test_unchanged_config_is_not_saved(client, mock_dependencies):
+    client.post("/config", json=client.get("/config").json())
+    client.portal.call(client.app.state.config_writer.flush)
+    mock_dependencies["mock_save_config"].assert_not_called()
+
+def test_config_file_edits_are_reloaded(mock_dependencies, tmp_path):
+    from local_llm_backend.main import create_app
+
+    config_path = tmp_path / "config.json"
+    initial = mock_dependencies["mock_load_config"].return_value.model_copy(update={"config_reload_interval": 0.02})
+    config_path.write_text(initial.model_dump_json())
+    mock_dependencies["mock_load_config"].return_value = initial
+    app = create_app(
+        process_manager_instance=mock_dependencies["mock_process_manager_instance"],
+        llm_client_instance=mock_dependencies["mock_llm_client_instance"],
+        load_config_fn=mock_dependencies["mock_load_config"],
+        save_config_fn=mock_dependencies["mock_save_config"],
+        get_system_stats_fn=mock_dependencies["mock_get_system_stats"],
+        recipe_index=mock_dependencies["mock_recipe_index"],
+        config_path=config_path,
+    )
+    with TestClient(app) as test_client:
+        edited = json.loads(config_path.read_text())
+        edited["miners"][0]["wallet"] = "edited_on_disk"
+        config_path.write_text(json.dumps(edited))
+        os.utime(config_path, ns=(0, 1))
+        deadline = time.monotonic() + 5
+        while test_client.get("/config").json()["miners"][0]["wallet"] != "edited_on_disk":
+            assert time.monotonic() < deadline, "config.json edit was not picked up"
+            time.sleep(0.02)
+        config_path.write_text("{not json")
+        os.utime(config_path, ns=(0, 2))
+        time.sleep(0.1)
+        assert test_client.get("/config").json()["miners"][0]["wallet"] == "edited_on_disk" # A broken file is ignored
+    mock_dependencies["mock_llm_client_instance"].aclose.assert_awaited_once() # Only at shutdown
+    mock_dependencies["mock_save_config"].assert_not_called() # A reload doesn't write the file back
+
+def test_config_changes_restart_the_watcher_and_resize_stats_history(mock_dependencies, tmp_path):
+    from local_llm_backend.main import create_app
+
+    config_path = tmp_path / "config.json"
+    initial = mock_dependencies["mock_load_config"].return_value.model_copy(update={"config_reload_interval": 0})
+    config_path.write_text(initial.model_dump_json())
+    mock_dependencies["mock_load_config"].return_value = initial
+    app = create_app(
+        process_manager_instance=mock_dependencies["mock_process_manager_instance"],
+        llm_client_instance=mock_dependencies["mock_llm_client_instance"],
+        load_config_fn=mock_dependencies["mock_load_config"],
+        save_config_fn=mock_dependencies["mock_save_config"],
+        get_system_stats_fn=mock_dependencies["mock_get_system_stats"],
+        recipe_index=mock_dependencies["mock_recipe_index"],
+        config_path=config_path,
+    )
+    with TestClient(app) as test_client:
+        assert app.state.config_watcher is None
+        updated = test_client.get("/config").json()
+        updated.update(config_reload_interval=0.02, stats_history_seconds=60, stats_sample_interval=2)
+        assert test_client.post("/config", json=updated).status_code == 200
+        assert app.state.config_watcher is not None # Enabled without a restart
+        assert app.state.stats_history.capacity == 31
+        assert app.state.stats_sampler.history is app.state.stats_history
+        test_client.portal.call(app.state.config_writer.flush) # Reloads wait for queued writes
+
+        updated["config_reload_interval"] = 0 # Disabled from a file edit, i.e. from inside the watcher
+        config_path.write_text(json.dumps(updated))
+        os.utime(config_path, ns=(0, 1))
+        deadline = time.monotonic() + 5
+        while app.state.config_watcher is not None:
+            assert time.monotonic() < deadline, "config.json edit was not picked up"
+            time.sleep(0.02)
+        assert test_client.get("/config").json()["config_reload_interval"] == 0 # The rest of the reload still applied
+
 def test_get_system_statistics(client, mock_dependencies):
     response = client.get("/system/stats")
     assert response.status_code == 200
     assert "cpu" in response.json()
     assert response.json()["cpu"]["percent"] == 10
+    assert "sample_age" in response.json()
+    assert "llm_server" in response.json()["processes"] # None when no local Ollama server is running
+    mock_dependencies["mock_get_system_stats"].assert_called_once()
+
+def test_get_system_statistics_served_from_latest_sample(client, mock_dependencies):
+    client.get("/system/stats")
+    response = client.get("/system/stats")
+    assert response.status_code == 200
+    assert response.json()["ram"]["percent"] == 20
     mock_dependencies["mock_get_system_stats"].assert_called_once()
 
+def test_get_system_statistics_history(client, mock_dependencies):
+    client.get("/system/stats")
+    response = client.get("/system/stats/history", params={"resolution": 60})
+    assert response.status_code == 200
+    assert response.json()["cpu"]["avg"] == [10]
+    assert response.json()["ram"]["max"] == [20]
+    assert client.get("/system/stats/history", params={"resolution": 0}).status_code == 400
+
 def test_start_llm_service_success(client, mock_dependencies):
     response = client.post("/llm/start")
     assert response.status_code == 200
     assert "LLM service is reachable" in response.json()["status"]
     assert "Provider 'ollama' is active" in response.json()["message"]
-    mock_dependencies["mock_llm_client_instance"].get_models.assert_called_once()
+    mock_dependencies["mock_llm_client_instance"].health_check.assert_awaited_once()
+    mock_dependencies["mock_llm_client_instance"].get_models.assert_not_called()
 
 def test_start_llm_service_failure(client, mock_dependencies):
-    mock_dependencies["mock_llm_client_instance"].get_models.side_effect = Exception("LLM not found")
+    mock_dependencies["mock_llm_client_instance"].health_check.side_effect = Exception("LLM not found")
     response = client.post("/llm/start")
     assert response.status_code == 503
     assert "LLM service not reachable" in response.json()["detail"]
@@ -176,17 +342,239 @@ def test_generate_text_with_llm_success_non_stream(client, mock_dependencies):
         "model": "llama2", "prompt": "hello world", "stream": False, "max_tokens": 50
     })
     assert response.status_code == 200
-    assert response.json() == {"choices": [{"delta": {"content": "mocked llm response"}}]}
+    assert response.json()["object"] == "chat.completion"
+    assert response.json()["choices"][0]["message"] == {"role": "assistant", "content": "mocked llm response"}
     mock_dependencies["mock_llm_client_instance"].generate.assert_called_once_with(
         "llama2", "hello world", stream=False, options={'num_predict': 50}
     )
 
+def test_generate_text_with_llm_non_stream_aggregates_all_chunks(client, mock_dependencies):
+    async def multi_chunk_generator(*args, **kwargs):
+        yield {"id": "c1", "choices": [{"index": 0, "delta": {"role": "assistant", "content": "Hello"}}]}
+        yield {"id": "c1", "choices": [{"index": 0, "delta": {"content": ", world"}, "finish_reason": "stop"}],
+               "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}}
+    mock_dependencies["mock_llm_client_instance"].generate.return_value = multi_chunk_generator()
+    response = client.post("/llm/generate", json={"model": "llama2", "prompt": "hi", "stream": False})
+    body = response.json()
+    assert body["id"] == "c1"
+    assert body["choices"] == [{"index": 0, "message": {"role": "assistant", "content": "Hello, world"}, "finish_reason": "stop"}]
+    assert body["usage"]["total_tokens"] == 5
+    assert body["timing"]["time_to_first_token_ms"] is not None
+
+def test_metrics_endpoint_records_generations_and_handler_latency(client, mock_dependencies):
+    async def streaming_generator(*args, **kwargs):
+        yield {"choices": [{"index": 0, "delta": {"content": "a"}}]}
+        yield {"choices": [{"index": 0, "delta": {"content": "b"}}]}
+    async def failing_generator(*args, **kwargs):
+        raise RuntimeError("provider down")
+        yield
+    mock_dependencies["mock_llm_client_instance"].generate.side_effect = [streaming_generator(), failing_generator()]
+    client.post("/llm/generate", json={"model": "llama2", "prompt": "hi", "stream": True})
+    assert client.post("/llm/generate", json={"model": "llama2", "prompt": "hi"}).status_code == 500
+    client.get("/miner/status/test_miner")
+    response = client.get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'llm_time_to_first_token_seconds_count{provider="ollama",model="llama2",endpoint="/llm/generate"} 1' in text
+    assert 'llm_completion_tokens_total{provider="ollama",model="llama2"} 2.0' in text
+    assert 'llm_provider_errors_total{provider="ollama",model="llama2",error="RuntimeError"} 1.0' in text
+    assert 'llm_queue_wait_seconds_count{model="llama2",priority="interactive"} 2' in text
+    assert 'http_request_duration_seconds_count{method="GET",endpoint="/miner/status/{miner_name}",status="200"} 1' in text
+
+def test_metrics_label_unlisted_models_as_other(client, mock_dependencies):
+    for model in ("made-up-1", "made-up-2", "mistral"):
+        assert client.post("/llm/generate", json={"model": model, "prompt": "hi"}).status_code == 200
+    text = client.get("/metrics").text
+    assert "made-up" not in text
+    assert 'llm_generations_total{provider="ollama",model="other",endpoint="/llm/generate",outcome="ok"} ' in text
+    client.get("/llm/models") # "mistral" is listed by the provider, so it keeps its own label once the catalog is loaded
+    assert client.post("/llm/generate", json={"model": "mistral", "prompt": "hi"}).status_code == 200
+    assert 'model="mistral"' in client.get("/metrics").text
+
+def test_generate_returns_request_id_and_unregisters(client, mock_dependencies):
+    response = client.post("/llm/generate", json={"model": "llama2", "prompt": "hello"})
+    assert response.headers["X-Request-ID"]
+    assert client.get("/llm/requests").json() == []
+
+def test_generate_rejected_with_429_when_queue_full(client, mock_dependencies):
+    scheduler = client.app.state.scheduler
+    scheduler.configure(max_concurrent_per_model=1, max_queue=0)
+    scheduler._queue_for("llama2").running = 1
+    response = client.post("/llm/generate", json={"model": "llama2", "prompt": "hello"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+    assert response.json()["detail"]["queue_position"] == 1
+    assert client.get("/llm/scheduler").json()["rejected_total"] == 1
+    mock_dependencies["mock_llm_client_instance"].generate.assert_not_called()
+
+def test_deterministic_generation_is_served_from_cache(client, mock_dependencies):
+    async def fresh_generator(*args, **kwargs):
+        yield {"choices": [{"delta": {"content": "cached"}}]}
+    mock_llm = mock_dependencies["mock_llm_client_instance"]
+    mock_llm.generate.side_effect = fresh_generator
+    client.app.state.response_cache.configure(enabled=True, max_bytes=1024)
+    payload = {"model": "llama2", "prompt": "hello", "temperature": 0, "stream": True}
+
+    first = client.post("/llm/generate", json=payload)
+    second = client.post("/llm/generate", json=payload)
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.text == first.text
+    non_stream = client.post("/llm/generate", json={**payload, "stream": False})
+    assert non_stream.json()["choices"][0]["message"]["content"] == "cached"
+    assert mock_llm.generate.call_count == 1
+
+    client.post("/llm/generate", json={**payload, "cache": "bypass"})
+    client.post("/llm/generate", json={**payload, "cache": "refresh"})
+    assert mock_llm.generate.call_count == 3
+    stats = client.get("/llm/cache").json()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["bypasses"] == 1
+
+def test_batch_generation_reports_results_and_failures_per_item(client, mock_dependencies):
+    async def echo_generator(model, prompt, stream=False, options=None):
+        if prompt == "boom":
+            raise RuntimeError("provider failed")
+        yield {"choices": [{"delta": {"content": prompt.upper()}}]}
+    mock_dependencies["mock_llm_client_instance"].generate.side_effect = echo_generator
+    response = client.post("/llm/generate/batch", json={"model": "llama2", "prompts": ["a", "boom", "c"], "concurrency": 2})
+    assert response.status_code == 200
+    lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda item: item["index"])
+    assert [item["status"] for item in lines] == ["ok", "error", "ok"]
+    assert lines[2]["result"]["choices"][0]["message"]["content"] == "C"
+    assert "provider failed" in lines[1]["error"]
+
+def test_batch_generation_from_recipe(client, mock_dependencies):
+    async def echo_generator(model, prompt, stream=False, options=None):
+        yield {"choices": [{"delta": {"content": prompt}}]}
+    mock_dependencies["mock_llm_client_instance"].generate.side_effect = echo_generator
+    response = client.post("/llm/generate/batch", json={"model": "llama2", "recipe": "category1/recipe1", "inputs": ["def f(): pass"]})
+    result = json.loads(response.text.strip())
+    assert result["result"]["choices"][0]["message"]["content"] == "Mock prompt content\n\ndef f(): pass"
+    _, kwargs = mock_dependencies["mock_llm_client_instance"].generate.call_args
+    assert kwargs["options"]["num_predict"] == 256 and kwargs["options"]["stop"] == ["###"]
+    assert client.post("/llm/generate/batch", json={"model": "llama2", "inputs": ["x"]}).status_code == 400
+
+def test_batch_recipe_parameter_error_fails_only_that_item(client, mock_dependencies):
+    from local_llm_backend.services.recipe_manager import RecipeParameterError
+    def render(category, name, params):
+        if "input" not in params:
+            raise RecipeParameterError("Missing recipe parameter 'input'.")
+        return {"prompt": params["input"], "model": None, "max_tokens": 256, "stop": None}
+    mock_dependencies["mock_render_recipe"].side_effect = render
+    async def echo_generator(model, prompt, stream=False, options=None):
+        yield {"choices": [{"delta": {"content": prompt}}]}
+    mock_dependencies["mock_llm_client_instance"].generate.side_effect = echo_generator
+    response = client.post("/llm/generate/batch", json={"model": "llama2", "recipe": "category1/recipe1", "inputs": ["a", {"other": 1}, "c"]})
+    assert response.status_code == 200
+    lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda item: item["index"])
+    assert [item["status"] for item in lines] == ["ok", "error", "ok"]
+    assert "RecipeParameterError" in lines[1]["error"]
+    mock_dependencies["mock_read_recipe"].return_value = None
+    assert client.post("/llm/generate/batch", json={"recipe": "category1/missing", "inputs": ["a"]}).status_code == 404
+
+def test_submit_and_poll_batch_job(client, mock_dependencies, tmp_path):
+    async def echo_generator(model, prompt, stream=False, options=None):
+        yield {"choices": [{"delta": {"content": prompt}}]}
+    mock_dependencies["mock_llm_client_instance"].generate.side_effect = echo_generator
+    client.app.state.config.jobs_dir = str(tmp_path)
+    input_path = tmp_path / "requests.jsonl"
+    input_path.write_text('{"prompt": "one"}\n{"prompt": "two"}\n')
+    response = client.post("/jobs", json={"input_path": "requests.jsonl", "output_path": str(tmp_path / "results.jsonl")})
+    assert response.status_code == 200
+    job_id = response.json()["id"]
+    deadline = time.monotonic() + 5
+    while (job := client.get(f"/jobs/{job_id}").json())["status"] != "COMPLETED" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job["status"] == "COMPLETED"
+    assert job["succeeded"] == 2
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.post("/jobs", json={"input_path": str(tmp_path / "missing.jsonl"), "output_path": "x"}).status_code == 400
+    assert (tmp_path / "results.jsonl").exists()
+
+def test_batch_job_paths_must_stay_inside_the_jobs_directory(client, tmp_path):
+    jobs_dir = tmp_path / "jobs"
+    jobs_dir.mkdir()
+    (jobs_dir / "requests.jsonl").write_text('{"prompt": "one"}\n')
+    (tmp_path / "outside.jsonl").write_text('{"prompt": "one"}\n')
+    client.app.state.config.jobs_dir = str(jobs_dir)
+    for input_path, output_path in [
+        ("../outside.jsonl", "results.jsonl"),
+        (str(tmp_path / "outside.jsonl"), "results.jsonl"),
+        ("requests.jsonl", "../results.jsonl"),
+        ("requests.jsonl", "/etc/cron.d/results"),
+        ("requests.jsonl", "."),
+    ]:
+        response = client.post("/jobs", json={"input_path": input_path, "output_path": output_path})
+        assert response.status_code == 400, (input_path, output_path)
+    assert not (tmp_path / "results.jsonl").exists()
+
+def assert_nothing_held(client, model):
+    state = client.app.state
+    assert state.scheduler.metrics()["models"][model]["running"] == 0
+    assert state.generations.active == {}
+    assert state.llm_clients.in_flight(state.llm_clients.current) == 0
+
+def test_stream_setup_failure_releases_slot_registration_and_client(client, mock_dependencies):
+    mock_dependencies["mock_llm_client_instance"].generate.side_effect = RuntimeError("bad request")
+    response = client.post("/llm/generate", json={"model": "llama2", "prompt": "hi", "stream": True})
+    assert response.status_code == 500
+    assert_nothing_held(client, "llama2")
+
+def test_stream_never_iterated_is_still_released(client, mock_dependencies):
+    import inspect
+    from starlette.requests import Request
+    endpoint = next(route.endpoint for route in client.app.routes if getattr(route, "path", None) == "/llm/generate")
+    body_model = inspect.signature(endpoint).parameters["request"].annotation
+    async def run():
+        async def receive():
+            return {"type": "http.disconnect"}
+        http_request = Request({"type": "http", "method": "POST", "path": "/llm/generate", "headers": []}, receive)
+        response = await endpoint(body_model(model="llama2", prompt="hi", stream=True), http_request)
+        assert client.app.state.generations.active # Held until the body runs or the response is done
+        async def send(message):
+            raise OSError("client went away") # Before the first body chunk was requested
+        with pytest.raises(Exception):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    client.portal.call(run)
+    assert_nothing_held(client, "llama2")
+
+def test_pull_never_streamed_holds_nothing(client, mock_dependencies):
+    import inspect
+    from starlette.requests import Request
+    endpoint = next(route.endpoint for route in client.app.routes if getattr(route, "path", None) == "/llm/pull")
+    body_model = inspect.signature(endpoint).parameters["request"].annotation
+    async def run():
+        async def receive():
+            return {"type": "http.disconnect"}
+        http_request = Request({"type": "http", "method": "POST", "path": "/llm/pull", "headers": []}, receive)
+        response = await endpoint(body_model(model_name="llama2"), http_request)
+        assert response.headers["X-Request-ID"]
+    client.portal.call(run)
+    state = client.app.state
+    assert state.generations.active == {} and state.llm_clients.in_flight(state.llm_clients.current) == 0
+
+def test_cancel_unknown_llm_request(client):
+    response = client.delete("/llm/requests/does-not-exist")
+    assert response.status_code == 404
+
 def test_list_llm_models_success(client, mock_dependencies):
     response = client.get("/llm/models")
     assert response.status_code == 200
     assert response.json() == {"models": [{"name": "llama2"}, {"name": "mistral"}]}
     mock_dependencies["mock_llm_client_instance"].get_models.assert_called_once()
 
+def test_list_llm_models_served_from_cache(client, mock_dependencies):
+    assert client.get("/llm/models").status_code == 200
+    response = client.get("/llm/models")
+    assert response.json() == {"models": [{"name": "llama2"}, {"name": "mistral"}]}
+    mock_dependencies["mock_llm_client_instance"].get_models.assert_called_once()
+
+def test_pull_llm_model_invalidates_model_cache(client, mock_dependencies):
+    client.get("/llm/models")
+    client.post("/llm/pull", json={"model_name": "llama2"})
+    client.get("/llm/models")
+    assert mock_dependencies["mock_llm_client_instance"].get_models.call_count == 2
+
 def test_pull_llm_model_success(client, mock_dependencies):
     response = client.post("/llm/pull", json={"model_name": "llama2"})
     assert response.status_code == 200
@@ -208,6 +596,50 @@ def test_stop_miner_success(client, mock_dependencies):
     assert "Miner 'test_miner' stopped" in response.json()["status"]
     mock_dependencies["mock_process_manager_instance"].stop_process.assert_called_once_with("miner_test_miner")
 
+def test_stop_all_miners_stops_them_in_one_call(client, mock_dependencies):
+    process_manager = mock_dependencies["mock_process_manager_instance"]
+    process_manager.processes["miner_a"] = MagicMock(pid=1, poll=lambda: None)
+    process_manager.processes["miner_b"] = MagicMock(pid=2, poll=lambda: None)
+    process_manager.processes["llm_server"] = MagicMock(pid=3, poll=lambda: None)
+    response = client.post("/miner/stop_all")
+    assert sorted(response.json()["stopped_miners"]) == ["a", "b"]
+    process_manager.stop_processes.assert_called_once_with(["miner_a", "miner_b"])
+    assert "llm_server" in process_manager.processes
+
+def test_miner_status_includes_parsed_telemetry(client, mock_dependencies):
+    client.post("/miner/start/test_miner")
+    on_output = mock_dependencies["mock_process_manager_instance"].start_process.call_args.kwargs["on_output"]
+    on_output("stdout", "20240101 12:00:00 GPU #0: RTX 3070 - 61.28 MH/s, [T:55C, P:117W, F:60%], 4/5 R:20%")
+    response = client.get("/miner/all_status", params={"history": True})
+    assert response.status_code == 200
+    entry = response.json()["test_miner"]
+    assert entry["status"] == "RUNNING" and entry["stalled"] is False
+    assert "resources" in entry # Per-process CPU/RSS/IO from the latest stats sample
+    assert entry["telemetry"]["hashrate"] == 61.28e6
+    assert entry["telemetry"]["devices"]["0"] == {"hashrate": 61.28e6, "temperature": 55, "accepted": 4, "rejected": 1}
+    assert entry["history"]["hashrate"] == [61.28e6]
+
+def test_rejected_duplicate_start_keeps_miner_telemetry(client, mock_dependencies):
+    client.post("/miner/start/test_miner")
+    on_output = mock_dependencies["mock_process_manager_instance"].start_process.call_args.kwargs["on_output"]
+    on_output("stdout", "20240101 12:00:00 GPU #0: RTX 3070 - 61.28 MH/s, [T:55C, P:117W, F:60%], 4/5 R:20%")
+    assert client.post("/miner/start/test_miner").status_code == 400
+    assert client.get("/miner/status/test_miner").json()["telemetry"]["hashrate"] == 61.28e6
+
+def test_get_miner_logs(client, mock_dependencies):
+    from local_llm_backend.utils.process_log import ProcessLog
+    log = ProcessLog()
+    for i in range(5):
+        log.append("stdout", f"line {i}\n")
+    log.append("stderr", "warning")
+    process_manager = mock_dependencies["mock_process_manager_instance"]
+    process_manager.get_process_log.side_effect = lambda name: log if name == "miner_test_miner" else None
+    response = client.get("/miner/logs/test_miner", params={"tail": 2})
+    assert response.status_code == 200
+    assert [entry["line"] for entry in response.json()["lines"]] == ["line 4", "warning"]
+    assert client.get("/miner/logs/test_miner", params={"stream": "stderr"}).json()["lines"][0]["line"] == "warning"
+    assert client.get("/miner/logs/unknown").status_code == 404
+
 # (Keep other miner and recipe tests as they are not affected by the LLM client refactoring)
 def test_get_all_recipes(client, mock_dependencies):
     response = client.get("/recipes")
@@ -215,6 +647,33 @@ def test_get_all_recipes(client, mock_dependencies):
     assert response.json() == {"category1": ["recipe1", "recipe2"]}
     mock_dependencies["mock_get_recipes"].assert_called_once()
 
+def test_get_all_recipes_honours_if_none_match(client, mock_dependencies):
+    etag = client.get("/recipes").headers["ETag"]
+    response = client.get("/recipes", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert client.get("/recipes", headers={"If-None-Match": '"stale"'}).status_code == 200
+    assert mock_dependencies["mock_get_recipes"].call_count == 2 # The 304 didn't build the listing
+    mock_dependencies["mock_recipe_index"].version = 2
+    response = client.get("/recipes", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+
+def test_recipe_index_is_built_at_startup_and_unwatched_at_shutdown(mock_dependencies):
+    from local_llm_backend.main import create_app
+    index = mock_dependencies["mock_recipe_index"]
+    app = create_app(
+        process_manager_instance=mock_dependencies["mock_process_manager_instance"],
+        llm_client_instance=mock_dependencies["mock_llm_client_instance"],
+        load_config_fn=mock_dependencies["mock_load_config"],
+        get_system_stats_fn=mock_dependencies["mock_get_system_stats"],
+        recipe_index=index,
+        config_path=None,
+    )
+    with TestClient(app):
+        index.ensure_built.assert_called_once()
+        index.start_watching.assert_called_once()
+        index.stop_watching.assert_not_called()
+    index.stop_watching.assert_called_once()
+
 def test_get_single_recipe_success(client, mock_dependencies):
     response = client.get("/recipes/category1/recipe1")
     assert response.status_code == 200
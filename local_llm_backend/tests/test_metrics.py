@@ -0,0 +1,20 @@
+from local_llm_backend.services.metrics import BackendMetrics, Counter, Histogram
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("request_seconds", "Request time.", ("endpoint",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value, "/a")
+    lines = histogram.render()
+    assert 'request_seconds_bucket{endpoint="/a",le="0.1"} 1' in lines
+    assert 'request_seconds_bucket{endpoint="/a",le="1.0"} 3' in lines
+    assert 'request_seconds_bucket{endpoint="/a",le="+Inf"} 4' in lines
+    assert 'request_seconds_count{endpoint="/a"} 4' in lines
+    assert histogram._children[("/a",)].counts == [1, 2, 1] # One preallocated slot per bucket plus +Inf
+
+def test_counter_escapes_label_values_and_renders_families():
+    counter = Counter("errors_total", "Errors.", ("error",))
+    counter.inc('Bad "quote"\n')
+    assert counter.render()[-1] == 'errors_total{error="Bad \\"quote\\"\\n"} 1.0'
+    text = BackendMetrics().render()
+    assert "# TYPE llm_time_to_first_token_seconds histogram" in text
+    assert text.endswith("\n")
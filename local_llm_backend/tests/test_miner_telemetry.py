@@ -0,0 +1,39 @@
+from local_llm_backend.services.miner_telemetry import MinerTelemetry
+
+T_REX_OUTPUT = [
+    "20240101 12:00:00 \x1b[32mGPU #0: Gigabyte RTX 3070 - 61.28 MH/s, [T:55C, P:117W, F:60%, E:524kH/W], 4/4 R:0%\x1b[0m",
+    "20240101 12:00:00 GPU #1: EVGA RTX 3060-Ti - 40.00 MH/s, [T:61C, P:117W, F:55%], 3/4 R:25%",
+    "20240101 12:00:00 Shares/min: 1.6 (Avr. 1.2)",
+    "20240101 12:00:01 [ OK ] 7/8 - 101.28 MH/s, 48ms ... GPU #0",
+]
+
+def test_parses_t_rex_devices_shares_and_hashrate():
+    telemetry = MinerTelemetry(sample_interval=0)
+    for line in T_REX_OUTPUT:
+        telemetry.feed("stdout", line)
+    snapshot = telemetry.snapshot()
+    assert snapshot["hashrate"] == 101.28e6
+    assert (snapshot["accepted"], snapshot["rejected"]) == (7, 1)
+    assert snapshot["devices"]["1"] == {"hashrate": 40e6, "temperature": 61, "accepted": 3, "rejected": 1}
+    series = telemetry.series()
+    assert series["hashrate"] == [61.28e6, 101.28e6, 101.28e6] # Device lines are summed until a total arrives
+    assert series["max_temperature"] == [55.0, 61.0, 61.0]
+
+def test_series_is_throttled_and_bounded():
+    telemetry = MinerTelemetry(capacity=3, sample_interval=0)
+    for i in range(5):
+        telemetry.feed("stdout", f"Hashrate: {i + 1}.00 kH/s")
+    assert telemetry.series()["hashrate"] == [3e3, 4e3, 5e3]
+    throttled = MinerTelemetry(sample_interval=3600)
+    for line in T_REX_OUTPUT:
+        throttled.feed("stdout", line)
+    assert len(throttled.series()["timestamps"]) == 1
+
+def test_stall_detection():
+    telemetry = MinerTelemetry(stall_seconds=60)
+    assert not telemetry.is_stalled(telemetry.started_at + 30)
+    assert telemetry.is_stalled(telemetry.started_at + 61) # Never reported anything
+    telemetry.feed("stdout", "20240101 12:00:00 GPU #0: RTX 3070 - 0.00 MH/s, [T:40C]")
+    assert telemetry.is_stalled(telemetry.started_at + 61) # Zero hashrate does not count as progress
+    telemetry.mark_resumed() # Suspended by GPU arbitration: silence while frozen is not a stall
+    assert not telemetry.is_stalled(telemetry.last_nonzero + 30)
@@ -0,0 +1,72 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from local_llm_backend.services.client_rotation import ClientRotation
+from local_llm_backend.services.llm_clients.base import LLMClient
+from local_llm_backend.services.model_catalog import ModelCatalog
+
+def make_client():
+    llm_client = MagicMock(spec=LLMClient)
+    async def slow_get_models():
+        await asyncio.sleep(0.01)
+        return {"models": [{"name": "llama2"}]}
+    llm_client.get_models = AsyncMock(side_effect=slow_get_models)
+    return llm_client
+
+def make_catalog(llm_client, ttl):
+    clients = ClientRotation()
+    clients.current = llm_client
+    return ModelCatalog(clients, ttl=ttl)
+
+def test_concurrent_lookups_share_one_refresh():
+    llm_client = make_client()
+    async def run():
+        catalog = make_catalog(llm_client, ttl=60)
+        return await asyncio.gather(*(catalog.get_models() for _ in range(5)))
+    results = asyncio.run(run())
+    assert all(r == {"models": [{"name": "llama2"}]} for r in results)
+    assert llm_client.get_models.await_count == 1
+
+def test_stale_entry_is_served_while_refreshing_in_background():
+    llm_client = make_client()
+    async def run():
+        catalog = make_catalog(llm_client, ttl=0)
+        await catalog.get_models()
+        stale = await catalog.get_models()
+        await asyncio.sleep(0.02)
+        return stale
+    assert asyncio.run(run()) == {"models": [{"name": "llama2"}]}
+    assert llm_client.get_models.await_count == 2
+
+def test_invalidate_discards_in_flight_refresh():
+    llm_client = make_client()
+    async def run():
+        catalog = make_catalog(llm_client, ttl=60)
+        task = catalog._start_refresh()
+        catalog.invalidate()
+        await task
+        return catalog.age()
+    assert asyncio.run(run()) is None
+
+def test_knows_listed_models_without_fetching():
+    llm_client = make_client()
+    async def run():
+        catalog = make_catalog(llm_client, ttl=60)
+        before = catalog.knows("llama2")
+        await catalog.get_models()
+        return catalog, before
+    catalog, before = asyncio.run(run())
+    assert not before and catalog.knows("llama2") and not catalog.knows("other-model")
+    catalog.invalidate()
+    assert not catalog.knows("llama2")
+
+def test_background_refresh_holds_a_client_lease_until_it_finishes():
+    llm_client = make_client()
+    async def run():
+        catalog = make_catalog(llm_client, ttl=60)
+        catalog.refresh_in_background()
+        await asyncio.sleep(0) # Let the refresh start
+        during = catalog.clients.in_flight(llm_client)
+        await catalog._refresh_task
+        return during, catalog.clients.in_flight(llm_client)
+    assert asyncio.run(run()) == (1, 0)
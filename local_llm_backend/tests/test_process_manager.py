@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from local_llm_backend.utils.process_log import ProcessLog
+from local_llm_backend.utils.process_manager import ProcessManager
+
+def test_ring_buffer_enforces_line_and_byte_caps():
+    log = ProcessLog(max_lines=3, max_bytes=1000)
+    for i in range(10):
+        log.append("stdout", f"line {i}")
+    assert [entry["line"] for entry in log.tail()] == ["line 7", "line 8", "line 9"]
+    assert log.tail(1)[0]["seq"] == 9
+    log.configure(max_lines=10, max_bytes=12)
+    assert [entry["line"] for entry in log.tail()] == ["line 8", "line 9"]
+    log.append("stdout", "温度") # 2 characters, 6 bytes: the byte cap counts encoded size
+    assert [entry["line"] for entry in log.tail()] == ["line 9", "温度"]
+
+def test_tail_slices_by_seq_count_and_stream():
+    log = ProcessLog(max_lines=5)
+    for i in range(8):
+        log.append("stderr" if i % 2 else "stdout", f"line {i}")
+    assert [entry["seq"] for entry in log.tail(after=5)] == [6, 7]
+    assert [entry["seq"] for entry in log.tail(after=0)] == [3, 4, 5, 6, 7] # Older lines were dropped
+    assert log.tail(after=7) == [] and log.tail(0) == []
+    assert [entry["line"] for entry in log.tail(2, stream="stdout")] == ["line 4", "line 6"]
+    assert [entry["seq"] for entry in log.tail(1, after=4, stream="stderr")] == [7]
+
+def test_follow_yields_backlog_then_new_lines():
+    log = ProcessLog()
+    log.append("stdout", "old 1")
+    log.append("stdout", "old 2")
+
+    async def scenario():
+        seen = []
+        async def producer():
+            await asyncio.sleep(0.05)
+            log.append("stderr", "new")
+        task = asyncio.create_task(producer())
+        async for entry in log.follow(tail=1, poll_interval=0.01):
+            seen.append(entry["line"])
+            if len(seen) == 2:
+                break
+        await task
+        return seen
+
+    assert asyncio.run(scenario()) == ["old 2", "new"]
+
+def test_chatty_process_is_drained_without_blocking():
+    manager = ProcessManager(log_max_lines=100000)
+    # Far more than a pipe buffer's worth of output on both streams
+    script = "import sys\nfor i in range(20000):\n    print('x' * 40, i)\n    print('err', i, file=sys.stderr)"
+    assert manager.start_process("chatty", [sys.executable, "-c", script])
+    process = manager.processes["chatty"]
+    process.wait(timeout=20) # Would deadlock if nobody read the pipes
+    deadline = time.time() + 5
+    stdout, stderr = manager.get_process_output("chatty")
+    while time.time() < deadline and not (stdout.endswith(" 19999") and stderr.endswith("err 19999")):
+        time.sleep(0.05)
+        stdout, stderr = manager.get_process_output("chatty")
+    assert stdout.endswith("19999") and stderr.endswith("err 19999")
+    manager.configure_logs(100, 1024 * 1024)
+    assert len(manager.get_process_log("chatty").tail()) == 100
+
+IGNORES_SIGTERM = "import signal, time\nsignal.signal(signal.SIGTERM, signal.SIG_IGN)\nprint('ready', flush=True)\ntime.sleep(60)"
+
+def wait_for_output(manager, name, text, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline and text not in manager.get_process_output(name)[0]:
+        time.sleep(0.02)
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signals")
+def test_stops_are_concurrent_and_escalate_to_sigkill():
+    manager = ProcessManager(stop_timeout=0.5)
+    for name in ("a", "b", "c"):
+        assert manager.start_process(name, [sys.executable, "-c", IGNORES_SIGTERM])
+        wait_for_output(manager, name, "ready") # Handler installed before we signal
+    started = time.monotonic()
+    assert manager.stop_processes(["a", "b", "c", "missing"]) == {"a": True, "b": True, "c": True, "missing": False}
+    assert time.monotonic() - started < 3 # One shared grace period, not 3 x 0.5s plus waits
+    assert manager.processes == {}
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signals")
+def test_auto_restart_backs_off_and_reports_restarts():
+    manager = ProcessManager(restart_backoff_base=0.05, supervise_interval=0.02)
+    spawns = []
+    assert manager.start_process("crashy", [sys.executable, "-c", "import sys; print('boot', flush=True); sys.exit(3)"], auto_restart=True, on_start=lambda: spawns.append(1))
+    deadline = time.time() + 10
+    while time.time() < deadline and manager.get_process_info("crashy")["restarts"] < 3:
+        time.sleep(0.02)
+    info = manager.get_process_info("crashy")
+    assert info["restarts"] >= 3 and info["auto_restart"]
+    assert manager._specs["crashy"]["failures"] >= 3 # Backoff doubles with every consecutive crash
+    with manager._lock: # Spawns happen under the lock, so the count and restarts agree
+        assert len(spawns) == manager.get_process_info("crashy")["restarts"] + 1 # The first spawn and every restart
+    assert manager.stop_process("crashy") # Cancels the pending restart
+    restarts = info["restarts"]
+    time.sleep(0.3)
+    assert "crashy" not in manager._specs and manager.get_process_info("crashy")["restarts"] == 0
+    assert manager.get_process_output("crashy")[0].count("boot") >= restarts
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signals")
+def test_suspended_process_reports_paused_and_still_stops_gracefully():
+    manager = ProcessManager(stop_timeout=5)
+    assert manager.start_process("sleeper", [sys.executable, "-c", "import time; time.sleep(60)"])
+    assert manager.suspend_process("sleeper")
+    assert manager.get_process_status("sleeper") == "PAUSED"
+    assert not manager.suspend_process("sleeper")
+    started = time.monotonic()
+    assert manager.stop_process("sleeper")
+    assert time.monotonic() - started < 4 # Resumed before SIGTERM instead of waiting for SIGKILL
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import time
+
+from local_llm_backend.services.process_stats import ProcessStatsCollector
+
+def test_collects_process_tree_with_cached_handles():
+    script = "import subprocess, sys, time\nsubprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\nprint('ready', flush=True)\ntime.sleep(30)"
+    parent = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True)
+    try:
+        parent.stdout.readline()
+        collector = ProcessStatsCollector()
+        first = collector.collect({"worker": parent.pid})["worker"]
+        assert first["process_count"] == 2 and len(first["children"]) == 1
+        assert first["rss"] > 0 and first["threads"] >= 2
+        handle = collector._handles[parent.pid]
+        collector.collect({"worker": parent.pid})
+        assert collector._handles[parent.pid] is handle # Same handle, so cpu_percent measures between samples
+    finally:
+        for child in __import__("psutil").Process(parent.pid).children(recursive=True):
+            child.kill()
+        parent.kill()
+        parent.wait()
+    assert collector.collect({"worker": parent.pid}) == {"worker": None}
+    assert collector._handles == {} # Dead handles are pruned
+
+def test_finds_named_process_and_rate_limits_lookups():
+    collector = ProcessStatsCollector(lookup_interval=60)
+    assert collector.find_named("definitely-not-running-xyz") is None
+    checked = collector._named_checked["definitely-not-running-xyz"]
+    assert collector.find_named("definitely-not-running-xyz") is None
+    assert collector._named_checked["definitely-not-running-xyz"] == checked # No second scan within the interval
+    own_name = __import__("psutil").Process(os.getpid()).name()
+    stats = collector.collect({}, {"self": own_name})["self"]
+    assert stats is not None and stats["rss"] > 0
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from local_llm_backend.services.recipe_manager import RecipeIndex, RecipeParameterError, parse_recipe
+
+def test_index_picks_up_added_edited_and_removed_recipes(tmp_path):
+    category = tmp_path / "docs"
+    category.mkdir()
+    (category / "one.txt").write_text("First\nPrompt one")
+    index = RecipeIndex(tmp_path)
+    index.ensure_built = lambda: None # Drive refreshes by hand instead of a watcher thread
+    index._scan(); index._built = True
+    assert index.get_recipes() == {"docs": ["one"]}
+
+    (category / "two.txt").write_text("Second\nPrompt two")
+    edited = category / "one.txt"
+    edited.write_text("First\nEdited prompt, longer")
+    os.utime(category, (1, 1)) # Force the directory to look changed regardless of timestamp granularity
+    assert index.refresh()
+    assert index.get_recipes() == {"docs": ["one", "two"]}
+    assert index.read_recipe("docs", "one")["prompt"] == "Edited prompt, longer"
+
+    (category / "two.txt").unlink()
+    os.utime(category, (2, 2))
+    index.refresh()
+    assert index.get_recipes() == {"docs": ["one"]}
+    assert index.read_recipe("docs", "two") is None
+    assert not index.refresh() # Nothing changed since the last pass
+
+def test_restarted_watcher_catches_up_on_edits_made_while_stopped(tmp_path):
+    category = tmp_path / "docs"
+    category.mkdir()
+    (category / "one.txt").write_text("First\nPrompt one")
+    index = RecipeIndex(tmp_path, poll_interval=60)
+    index.ensure_built()
+    index.stop_watching()
+    (category / "two.txt").write_text("Second\nPrompt two")
+    os.utime(category, (1, 1))
+    index.start_watching()
+    try:
+        assert index.get_recipes() == {"docs": ["one", "two"]}
+    finally:
+        index.stop_watching()
+
+def test_structured_recipe_headers_and_typed_placeholders():
+    recipe = parse_recipe(
+        "Recipe: Translate\nDescription: Translates code.\nModel: codellama\nMax-Tokens: 512\nStop: [\"```\"]\n"
+        "Prompt:\nTranslate to {{language:str=JavaScript}} with {{indent:int=2}} spaces:\n{{code}}"
+    )
+    assert (recipe["name"], recipe["description"], recipe["model"], recipe["max_tokens"], recipe["stop"]) == (
+        "Translate", "Translates code.", "codellama", 512, ["```"])
+    assert recipe["parameters"]["code"]["required"] and recipe["parameters"]["indent"]["default"] == 2
+    template = recipe["template"]
+    assert template.render({"code": "x = 1", "indent": "4"}) == "Translate to JavaScript with 4 spaces:\nx = 1"
+    with pytest.raises(RecipeParameterError):
+        template.render({})
+    with pytest.raises(RecipeParameterError):
+        template.render({"code": "x", "indent": "four"})
+    with pytest.raises(RecipeParameterError):
+        template.render({"code": "x", "colour": "red"})
+
+def test_plain_recipe_takes_implicit_input():
+    template = parse_recipe("Recipe: Docs\nDescription: Docstrings.\nPrompt:\nDocument this function:")["template"]
+    assert template.render() == "Document this function:"
+    assert template.render({"input": "def f(): pass"}) == "Document this function:\n\ndef f(): pass"
+    legacy = parse_recipe("Old style description\nOld style prompt")
+    assert (legacy["description"], legacy["prompt"]) == ("Old style description", "Old style prompt")
@@ -0,0 +1,77 @@
+import asyncio
+import os
+
+import pytest
+
+from local_llm_backend.services.recipe_manager import RecipeIndex
+from local_llm_backend.services.client_rotation import ClientRotation
+from local_llm_backend.services.recipe_search import RecipeSearchIndex
+
+def build_index(tmp_path):
+    (tmp_path / "code").mkdir()
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "code" / "py_to_js.txt").write_text("Recipe: Python to JavaScript\nDescription: Translates Python code to JavaScript.\nPrompt:\nTranslate this:")
+    (tmp_path / "code" / "sql_query.txt").write_text("Recipe: SQL\nDescription: Writes a SQL query.\nPrompt:\nWrite a SQL query for:")
+    (tmp_path / "docs" / "docstring.txt").write_text("Recipe: Docstring\nDescription: Documents a Python function.\nPrompt:\nWrite a docstring:")
+    recipes = RecipeIndex(tmp_path)
+    recipes.ensure_built = lambda: None # Drive refreshes by hand instead of a watcher thread
+    recipes._scan(); recipes._built = True
+    return recipes, RecipeSearchIndex(recipes)
+
+def test_bm25_ranks_and_follows_recipe_changes(tmp_path):
+    recipes, index = build_index(tmp_path)
+    results = asyncio.run(index.search("javascript translation", limit=2))
+    assert [r["name"] for r in results] == ["py_to_js"]
+    assert [r["name"] for r in asyncio.run(index.search("python"))][0] == "py_to_js" # Matches name and description
+    assert asyncio.run(index.search("haskell")) == []
+
+    (tmp_path / "docs" / "haskell.txt").write_text("Recipe: Haskell\nDescription: Explains Haskell code.\nPrompt:\nExplain:")
+    (tmp_path / "code" / "sql_query.txt").unlink()
+    os.utime(tmp_path / "docs", (1, 1)); os.utime(tmp_path / "code", (1, 1))
+    recipes.refresh()
+    assert [r["name"] for r in asyncio.run(index.search("haskell"))] == ["haskell"]
+    assert asyncio.run(index.search("sql")) == []
+    assert not index.sync() # Already applied
+
+class FakeEmbeddingClient:
+    supports_embeddings = True
+    CONCEPTS = [("python",), ("javascript",), ("sql", "database"), ("docstring", "documentation")]
+
+    def __init__(self, clients=None):
+        self.calls = 0
+        self.clients = clients
+        self.leases_seen = []
+
+    async def embed(self, model, texts):
+        self.calls += 1
+        if self.clients is not None:
+            self.leases_seen.append(self.clients.in_flight(self))
+        return [[float(any(word in text.lower() for word in words)) for words in self.CONCEPTS] for text in texts]
+
+def test_embeddings_blend_into_ranking(tmp_path):
+    pytest.importorskip("numpy")
+    _, index = build_index(tmp_path)
+    clients = ClientRotation()
+    clients.current = client = FakeEmbeddingClient(clients)
+
+    async def scenario():
+        await index.search("database", llm_clients=clients, embedding_model="embed") # Starts background embedding
+        await index._embed_task
+        assert clients.in_flight(client) == 0
+        return await index.search("database", llm_clients=clients, embedding_model="embed")
+
+    results = asyncio.run(scenario())
+    assert results[0]["name"] == "sql_query" # No BM25 hit for "database"; found through the vector side
+    assert len(index._vectors) == 3
+    assert all(count >= 1 for count in client.leases_seen) # Background embedding ran under its own lease
+
+def test_search_skips_embeddings_for_providers_without_them(tmp_path):
+    _, index = build_index(tmp_path)
+    clients = ClientRotation()
+    clients.current = client = FakeEmbeddingClient()
+    client.supports_embeddings = False
+
+    results = asyncio.run(index.search("database", llm_clients=clients, embedding_model="embed"))
+    assert results == [] # Keyword-only, and "database" has no BM25 hit
+    assert client.calls == 0
+    assert index._embed_task is None
@@ -0,0 +1,50 @@
+import asyncio
+
+from local_llm_backend.services.response_cache import ResponseCache
+
+def test_lru_evicts_by_byte_size():
+    async def run():
+        cache = ResponseCache(enabled=True, max_bytes=10)
+        await cache.put("a", b"12345")
+        await cache.put("b", b"12345")
+        await cache.get("a") # "b" is now least recently used
+        await cache.put("c", b"123")
+        return cache, await cache.get("b"), await cache.get("a")
+    cache, b, a = asyncio.run(run())
+    assert b is None and a == b"12345"
+    assert cache.size_bytes == 8
+    assert cache.evictions == 1
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    async def run():
+        await ResponseCache(enabled=True, disk_dir=str(tmp_path)).put("key", b'{"choices": []}\n')
+        restarted = ResponseCache(enabled=True, disk_dir=str(tmp_path))
+        return restarted, await restarted.get("key")
+    restarted, entry = asyncio.run(run())
+    assert entry == b'{"choices": []}\n'
+    assert restarted.disk_hits == 1
+
+def test_only_deterministic_requests_are_cacheable():
+    cache = ResponseCache(enabled=True)
+    assert cache.is_cacheable({"num_predict": 10, "temperature": 0})
+    assert not cache.is_cacheable({"num_predict": 10})
+    assert ResponseCache.make_key("ollama", None, "m", "p", {"a": 1, "b": 2}) == ResponseCache.make_key("ollama", None, "m", "p", {"b": 2, "a": 1})
+    assert ResponseCache.make_key("ollama", "http://a/v1", "m", "p", {}) != ResponseCache.make_key("ollama", "http://b/v1", "m", "p", {})
+
+def test_disk_tier_is_bounded_and_cleared(tmp_path):
+    async def run():
+        cache = ResponseCache(enabled=True, max_bytes=4, disk_dir=str(tmp_path), disk_max_bytes=10)
+        await cache.put("a", b"12345")
+        await cache.put("b", b"12345")
+        await cache.get("a") # From disk (too big for memory); "b" is now least recently used on disk
+        await cache.put("c", b"123")
+        remaining = sorted(path.name for path in tmp_path.iterdir())
+        await asyncio.gather(*(cache.put("d", b"1234") for _ in range(5))) # Concurrent writes of one key
+        after_race = sorted(path.name for path in tmp_path.iterdir())
+        await cache.clear()
+        return cache, remaining, after_race
+    cache, remaining, after_race = asyncio.run(run())
+    assert remaining == ["a.ndjson", "c.ndjson"]
+    assert cache.disk_evictions >= 1
+    assert "d.ndjson" in after_race and not any(name.endswith(".tmp") for name in after_race)
+    assert list(tmp_path.iterdir()) == [] and cache.disk_size_bytes == 0
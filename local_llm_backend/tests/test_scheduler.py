@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from local_llm_backend.services.scheduler import QueueFullError, RequestScheduler
+
+def test_interactive_requests_jump_ahead_of_batch():
+    async def run():
+        scheduler = RequestScheduler(max_concurrent_per_model=1, max_queue=10)
+        order = []
+        first = await scheduler.acquire("llama2")
+        async def worker(name, priority):
+            lease = await scheduler.acquire("llama2", priority)
+            order.append(name)
+            lease.release()
+        tasks = [asyncio.create_task(worker("batch1", "batch")), asyncio.create_task(worker("batch2", "batch"))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(worker("gui", "interactive")))
+        await asyncio.sleep(0)
+        assert scheduler.metrics()["queue_depth"] == 3
+        first.release()
+        await asyncio.gather(*tasks)
+        return order
+    assert asyncio.run(run()) == ["gui", "batch1", "batch2"]
+
+def test_full_queue_rejects_with_retry_after():
+    async def run():
+        scheduler = RequestScheduler(max_concurrent_per_model=1, max_queue=1)
+        await scheduler.acquire("llama2")
+        waiter = asyncio.create_task(scheduler.acquire("llama2"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError) as excinfo:
+            await scheduler.acquire("llama2")
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return excinfo.value, scheduler.metrics()
+    error, metrics = asyncio.run(run())
+    assert error.queue_position == 2
+    assert error.retry_after >= 1
+    assert metrics["rejected_total"] == 1
+    assert metrics["queue_depth"] == 0 # The cancelled waiter left the queue
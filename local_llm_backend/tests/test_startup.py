@@ -0,0 +1,31 @@
+import asyncio
+import json
+import subprocess
+import sys
+
+from local_llm_backend.benchmarks.startup import REPO_ROOT, measure
+from local_llm_backend.config import OllamaProviderConfig
+
+def test_importing_backend_skips_provider_sdks_and_numpy():
+    script = (
+        "import json, sys; import local_llm_backend.main; "
+        "print(json.dumps([m for m in ('local_llm_backend.services.llm_clients.vertexai', 'vertexai', 'numpy') if m in sys.modules]))"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
+
+def test_ollama_client_builds_http_client_on_first_use():
+    from local_llm_backend.services.llm_clients.ollama import OllamaClient
+
+    client = OllamaClient(OllamaProviderConfig(provider="ollama"))
+    assert client._http is None
+    asyncio.run(client.aclose()) # Nothing to close yet
+    client.warm_up()
+    assert client._http is not None and client.http is client._http
+    asyncio.run(client.aclose())
+
+def test_startup_benchmark_measures_backend_cold_start():
+    result = measure("backend")
+    assert "error" not in result
+    assert 0 < result["import_s"] <= result["ready_s"] <= result["ready_process_s"]
+    assert result["startup_event_s"] < result["ready_s"]
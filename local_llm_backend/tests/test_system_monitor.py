@@ -0,0 +1,35 @@
+from local_llm_backend.services.system_monitor import StatsHistory
+
+def sample(cpu, ram, gpu_usage=None):
+    gpus = [] if gpu_usage is None else [{"usage": gpu_usage, "memory_usage": 50, "temperature": 60}]
+    return {"cpu": {"percent": cpu}, "ram": {"percent": ram}, "gpus": gpus}
+
+def test_history_downsamples_into_min_max_avg_buckets():
+    history = StatsHistory(capacity=10)
+    for t, cpu in enumerate([10, 20, 30, 40]):
+        history.append(sample(cpu, 50, gpu_usage=cpu * 2), timestamp=100 + t)
+    result = history.query(resolution=2)
+    assert result["timestamps"] == [100, 102]
+    assert result["cpu"] == {"min": [10, 30], "max": [20, 40], "avg": [15, 35]}
+    assert result["gpus"][0]["usage"]["max"] == [40, 80]
+    assert result["last_timestamp"] == 103
+
+def test_history_wraps_and_filters_by_since():
+    history = StatsHistory(capacity=3)
+    for t in range(5):
+        history.append(sample(t, t), timestamp=float(t))
+    assert history.query()["timestamps"] == [2.0, 3.0, 4.0]
+    assert history.query(since=3.0)["cpu"]["avg"] == [4.0]
+    assert history.query(since=4.0)["timestamps"] == []
+
+def test_resized_history_keeps_the_newest_samples():
+    history = StatsHistory(capacity=4)
+    for t in range(6):
+        history.append(sample(t, t, gpu_usage=t), timestamp=float(t))
+    smaller = history.resized(2)
+    assert smaller.query()["timestamps"] == [4.0, 5.0]
+    assert smaller.query()["gpus"][0]["usage"]["avg"] == [4.0, 5.0]
+    larger = history.resized(10)
+    assert larger.query()["timestamps"] == [2.0, 3.0, 4.0, 5.0]
+    larger.append(sample(6, 6, gpu_usage=6), timestamp=6.0)
+    assert larger.query()["timestamps"][-2:] == [5.0, 6.0]
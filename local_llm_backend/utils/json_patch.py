@@ -0,0 +1,116 @@
+import copy
+from typing import Any, Dict, List, Tuple
+
+class JsonPatchError(ValueError):
+    """A malformed patch, or an operation whose path doesn't exist in the document."""
+
+class JsonPatchConflict(JsonPatchError):
+    """A `test` operation did not match, i.e. the document changed since the client read it."""
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Splits an RFC 6901 JSON Pointer ("/miners/0/name") into unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer '{pointer}': must be empty or start with '/'.")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+def _list_index(container: list, token: str, pointer: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index '{token}' in '{pointer}'.")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index {index} out of range in '{pointer}'.")
+    return index
+
+def _parent(document: Any, pointer: str) -> Tuple[Any, str]:
+    """Returns (container, last token) for a non-root pointer."""
+    tokens = parse_pointer(pointer)
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise JsonPatchError(f"Path '{pointer}' does not exist.")
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_list_index(target, token, pointer)]
+        else:
+            raise JsonPatchError(f"Path '{pointer}' does not exist.")
+    if not isinstance(target, (dict, list)):
+        raise JsonPatchError(f"Path '{pointer}' does not exist.")
+    return target, tokens[-1]
+
+def get_value(document: Any, pointer: str) -> Any:
+    if pointer == "":
+        return document
+    container, token = _parent(document, pointer)
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path '{pointer}' does not exist.")
+        return container[token]
+    return container[_list_index(container, token, pointer)]
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    if pointer == "":
+        return value
+    container, token = _parent(document, pointer)
+    if isinstance(container, dict):
+        container[token] = value
+    else:
+        container.insert(_list_index(container, token, pointer, allow_end=True), value)
+    return document
+
+def _remove(document: Any, pointer: str) -> Tuple[Any, Any]:
+    """Returns (document, removed value)."""
+    if pointer == "":
+        raise JsonPatchError("Cannot remove the whole document.")
+    container, token = _parent(document, pointer)
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path '{pointer}' does not exist.")
+        return document, container.pop(token)
+    return document, container.pop(_list_index(container, token, pointer))
+
+def apply_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Applies an RFC 6902 JSON Patch (add, remove, replace, move, copy, test) and returns the patched
+    copy. The input document is never modified, so a patch that fails halfway leaves nothing behind.
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be a list of operations.")
+    document = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError(f"Invalid operation {operation!r}: 'op' and 'path' are required.")
+        op, path = operation["op"], operation["path"]
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' operation on '{path}' is missing 'value'.")
+        if op in ("move", "copy") and "from" not in operation:
+            raise JsonPatchError(f"'{op}' operation on '{path}' is missing 'from'.")
+        if op == "add":
+            document = _add(document, path, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            document, _ = _remove(document, path)
+        elif op == "replace":
+            get_value(document, path) # The target must exist
+            if path == "":
+                document = copy.deepcopy(operation["value"])
+            else:
+                document, _ = _remove(document, path)
+                document = _add(document, path, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            source = operation["from"]
+            if path.startswith(source + "/"):
+                raise JsonPatchError(f"Cannot move '{source}' into its own child '{path}'.")
+            document, value = _remove(document, source)
+            document = _add(document, path, value)
+        elif op == "copy":
+            document = _add(document, path, copy.deepcopy(get_value(document, operation["from"])))
+        elif op == "test":
+            if get_value(document, path) != operation["value"]:
+                raise JsonPatchConflict(f"Test failed: '{path}' does not equal {operation['value']!r}.")
+        else:
+            raise JsonPatchError(f"Unknown operation '{op}'.")
+    return document
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, IO, List, Optional
+
+class ProcessLog:
+    """
+    Bounded ring buffer of a child process's output lines.
+
+    Reader threads drain the child's pipes as fast as it writes, so a chatty process never blocks
+    on a full pipe. Each line gets a sequence number so followers can ask for "everything after N".
+    Oldest lines are dropped once either the line or the byte cap (UTF-8 encoded size) is exceeded.
+    """
+    def __init__(self, max_lines: int = 2000, max_bytes: int = 1024 * 1024):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._lines: deque = deque()
+        self._bytes = 0
+        self._next_seq = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    def configure(self, max_lines: int, max_bytes: int):
+        with self._lock:
+            self.max_lines = max_lines
+            self.max_bytes = max_bytes
+            self._trim()
+
+    def add_listener(self, listener: Callable[[str, str], None]):
+        """Registers `listener(stream, line)`, called from the reader thread for every new line."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def append(self, stream: str, line: str):
+        line = line.rstrip("\r\n")
+        size = len(line.encode("utf-8", "replace"))
+        with self._lock:
+            self._lines.append((self._next_seq, time.time(), stream, line, size))
+            self._next_seq += 1
+            self._bytes += size
+            self._trim()
+        for listener in self._listeners:
+            try:
+                listener(stream, line)
+            except Exception as e:
+                print(f"Error in process log listener: {e}")
+
+    def _trim(self):
+        while self._lines and (len(self._lines) > self.max_lines or self._bytes > self.max_bytes):
+            self._bytes -= self._lines.popleft()[4]
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    def tail(self, count: Optional[int] = None, after: Optional[int] = None, stream: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            lines = self._newest(count, after, stream)
+        return self._entries(lines)
+
+    def _newest(self, count: Optional[int], after: Optional[int], stream: Optional[str]) -> list:
+        """
+        Lines after seq `after`, oldest first, keeping the last `count`. Call with the lock held.
+        Sequence numbers are contiguous, so the lines after `after` are the newest `last_seq - after`
+        ones: walking the deque from its right end touches only those, not the whole buffer.
+        """
+        available = len(self._lines)
+        if after is not None:
+            available = min(available, max(self._next_seq - 1 - after, 0))
+        newest = islice(reversed(self._lines), available)
+        if stream is not None:
+            newest = (entry for entry in newest if entry[2] == stream)
+        if count is not None:
+            newest = islice(newest, max(count, 0))
+        lines = list(newest)
+        lines.reverse()
+        return lines
+
+    @staticmethod
+    def _entries(lines) -> List[Dict[str, Any]]:
+        return [{"seq": seq, "time": timestamp, "stream": name, "line": line} for seq, timestamp, name, line, _ in lines]
+
+    def text(self, stream: str) -> str:
+        return "\n".join(entry["line"] for entry in self.tail(stream=stream))
+
+    def drain(self, pipe: IO[str], stream: str) -> threading.Thread:
+        """Starts a daemon thread that copies `pipe` into the buffer until EOF."""
+        def reader():
+            try:
+                for line in iter(pipe.readline, ""):
+                    self.append(stream, line)
+            except (OSError, ValueError): # Pipe closed underneath us
+                pass
+            finally:
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+        thread = threading.Thread(target=reader, name=f"log-{stream}", daemon=True)
+        thread.start()
+        return thread
+
+    async def follow(
+        self,
+        tail: int = 0,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        poll_interval: float = 0.5,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yields the last `tail` lines, then every new line as it arrives, until the client disconnects."""
+        with self._lock: # One snapshot, so a line arriving in between is neither skipped nor sent twice
+            after = self._next_seq - 1
+            backlog = self._newest(tail, None, None) if tail > 0 else []
+        for entry in self._entries(backlog):
+            yield entry
+        while True:
+            if is_disconnected is not None and await is_disconnected():
+                return
+            entries = self.tail(after=after)
+            for entry in entries:
+                yield entry
+            if entries:
+                after = entries[-1]["seq"]
+            else:
+                await asyncio.sleep(poll_interval)
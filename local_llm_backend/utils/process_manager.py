@@ -1,18 +1,82 @@
 import subprocess
 import os
+import psutil
 import signal
 import sys
-from typing import Optional, Dict
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from local_llm_backend.utils.process_log import ProcessLog
 
 class ProcessManager:
-    def __init__(self):
+    """
+    Starts, stops and supervises child processes.
+
+    Stops never block on one process at a time: every target gets SIGTERM up front, then they share a
+    single grace period before stragglers are SIGKILLed. Processes started with `auto_restart` are
+    watched by a supervisor thread and respawned after a crash with exponential backoff; the backoff
+    resets once a process has stayed up for `stable_seconds`.
+    """
+    def __init__(
+        self,
+        log_max_lines: int = 2000,
+        log_max_bytes: int = 1024 * 1024,
+        stop_timeout: float = 10.0,
+        restart_backoff_base: float = 2.0,
+        restart_backoff_max: float = 300.0,
+        stable_seconds: float = 60.0,
+        supervise_interval: float = 0.5,
+    ):
         self.processes: Dict[str, subprocess.Popen] = {}
+        self.logs: Dict[str, ProcessLog] = {} # Kept after a process exits so its last output can still be read
+        self.log_max_lines = log_max_lines
+        self.log_max_bytes = log_max_bytes
+        self.stop_timeout = stop_timeout
+        self.restart_backoff_base = restart_backoff_base
+        self.restart_backoff_max = restart_backoff_max
+        self.stable_seconds = stable_seconds
+        self.supervise_interval = supervise_interval
+        self._specs: Dict[str, Dict[str, Any]] = {} # name -> launch spec and supervision state
+        self._lock = threading.RLock()
+        self._supervisor: Optional[threading.Thread] = None
+        self._suspended: set = set() # Names paused with suspend_process()
 
-    def start_process(self, name: str, command: list[str], cwd: Optional[str] = None) -> bool:
-        if name in self.processes and self.processes[name].poll() is None:
-            print(f"Process {name} is already running.")
-            return False
+    def configure_logs(self, max_lines: int, max_bytes: int):
+        self.log_max_lines = max_lines
+        self.log_max_bytes = max_bytes
+        for log in self.logs.values():
+            log.configure(max_lines, max_bytes)
+
+    def get_process_log(self, name: str) -> Optional[ProcessLog]:
+        return self.logs.get(name)
 
+    def start_process(
+        self,
+        name: str,
+        command: list[str],
+        cwd: Optional[str] = None,
+        on_output: Optional[Callable[[str, str], None]] = None,
+        auto_restart: bool = False,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """`on_start` runs after every successful spawn, supervisor restarts included, before any output is read."""
+        with self._lock:
+            if name in self.processes and self.processes[name].poll() is None:
+                print(f"Process {name} is already running.")
+                return False
+            self._specs[name] = {
+                "command": command, "cwd": cwd, "on_output": on_output, "on_start": on_start, "auto_restart": auto_restart,
+                "restarts": 0, "failures": 0, "next_restart": None, "started_at": None, "exit_code": None,
+            }
+            if not self._spawn(name):
+                del self._specs[name]
+                return False
+        if auto_restart:
+            self._ensure_supervisor()
+        return True
+
+    def _spawn(self, name: str) -> bool:
+        spec = self._specs[name]
         try:
             # Use preexec_fn for Unix-like systems to create a new process group
             # This allows killing the process group to terminate all children
@@ -21,8 +85,8 @@ class ProcessManager:
                 preexec_fn = os.setsid
 
             process = subprocess.Popen(
-                command,
-                cwd=cwd,
+                spec["command"],
+                cwd=spec["cwd"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True, # Decode stdout/stderr as text
@@ -31,60 +95,196 @@ class ProcessManager:
                 preexec_fn=preexec_fn
             )
             self.processes[name] = process
+            self._suspended.discard(name) # A fresh process starts unpaused
+            spec["started_at"] = time.time()
+            spec["next_restart"] = None
+            spec["exit_code"] = None
+            if spec["on_start"] is not None:
+                spec["on_start"]()
+            if name not in self.logs:
+                self.logs[name] = ProcessLog(self.log_max_lines, self.log_max_bytes)
+            if spec["on_output"] is not None:
+                self.logs[name].add_listener(spec["on_output"])
+            # Drain both pipes continuously; an unread pipe fills up and stalls the child on write
+            self.logs[name].drain(process.stdout, "stdout")
+            self.logs[name].drain(process.stderr, "stderr")
             print(f"Process {name} started with PID: {process.pid}")
             return True
         except Exception as e:
             print(f"Error starting process {name}: {e}")
             return False
 
-    def stop_process(self, name: str) -> bool:
-        if name not in self.processes or self.processes[name].poll() is not None:
-            print(f"Process {name} is not running.")
-            return False
+    def _process_tree(self, process: subprocess.Popen) -> List[psutil.Process]:
+        root = psutil.Process(process.pid)
+        return [root] + root.children(recursive=True)
 
-        process = self.processes[name]
-        try:
-            if sys.platform == "win32":
-                # On Windows, kill the process tree
-                subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], check=True, capture_output=True)
-            else:
-                # On Unix-like, kill the process group
-                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-            process.wait(timeout=10) # Wait for process to terminate
-            print(f"Process {name} with PID {process.pid} stopped.")
-            del self.processes[name]
+    def suspend_process(self, name: str) -> bool:
+        """Freezes a running process and its children (SIGSTOP / NtSuspendProcess) without killing it."""
+        with self._lock:
+            process = self.processes.get(name)
+            if process is None or process.poll() is not None or name in self._suspended:
+                return False
+            try:
+                for member in self._process_tree(process):
+                    member.suspend()
+            except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+                print(f"Error suspending process {name}: {e}")
+                return False
+            self._suspended.add(name)
             return True
-        except (subprocess.CalledProcessError, ProcessLookupError, TimeoutError) as e:
-            print(f"Error stopping process {name} (PID {process.pid}): {e}")
-            # Ensure the process is removed from tracking even if it's stubborn
-            if name in self.processes:
-                del self.processes[name]
-            return False
-        except Exception as e:
-            print(f"Unexpected error stopping process {name}: {e}")
-            return False
+
+    def resume_process(self, name: str) -> bool:
+        with self._lock:
+            if name not in self._suspended:
+                return False
+            self._suspended.discard(name)
+            process = self.processes.get(name)
+            if process is None or process.poll() is not None:
+                return False
+            try:
+                for member in self._process_tree(process):
+                    member.resume()
+            except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+                print(f"Error resuming process {name}: {e}")
+                return False
+            return True
+
+    def _signal(self, process: subprocess.Popen, sig) -> None:
+        if sys.platform == "win32":
+            # On Windows, kill the process tree (taskkill /F is already forceful)
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], check=True, capture_output=True)
+        else:
+            # On Unix-like, signal the whole process group
+            os.killpg(os.getpgid(process.pid), sig)
+
+    def stop_processes(self, names: List[str], timeout: Optional[float] = None) -> Dict[str, bool]:
+        """
+        Stops several processes concurrently: SIGTERM to all, one shared grace period, then SIGKILL
+        for whatever is still alive. Returns {name: stopped}.
+        """
+        timeout = self.stop_timeout if timeout is None else timeout
+        results: Dict[str, bool] = {}
+        targets: Dict[str, subprocess.Popen] = {}
+        with self._lock:
+            for name in names:
+                spec = self._specs.pop(name, None) # Forget the spec first so the supervisor won't respawn it
+                process = self.processes.get(name)
+                if process is None or process.poll() is not None:
+                    if spec is not None and spec["next_restart"] is not None:
+                        results[name] = True # Cancelled a pending restart
+                    else:
+                        print(f"Process {name} is not running.")
+                        results[name] = False
+                    self.processes.pop(name, None)
+                    continue
+                targets[name] = process
+                self.resume_process(name) # A stopped process would never act on SIGTERM
+        for name, process in list(targets.items()):
+            try:
+                self._signal(process, signal.SIGTERM)
+            except (subprocess.CalledProcessError, ProcessLookupError, PermissionError) as e:
+                print(f"Error stopping process {name} (PID {process.pid}): {e}")
+        deadline = time.monotonic() + timeout
+        for name, process in targets.items():
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                print(f"Process {name} (PID {process.pid}) ignored SIGTERM for {timeout}s; killing it.")
+                try:
+                    self._signal(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+                    process.wait(timeout=5)
+                except Exception as e:
+                    print(f"Error killing process {name} (PID {process.pid}): {e}")
+        for name, process in targets.items():
+            stopped = process.poll() is not None
+            if stopped:
+                print(f"Process {name} with PID {process.pid} stopped.")
+            with self._lock:
+                if self.processes.get(name) is process:
+                    del self.processes[name]
+            results[name] = stopped
+        return results
+
+    def stop_process(self, name: str) -> bool:
+        return self.stop_processes([name])[name]
+
+    def _ensure_supervisor(self):
+        with self._lock:
+            if self._supervisor is None or not self._supervisor.is_alive():
+                self._supervisor = threading.Thread(target=self._supervise, name="process-supervisor", daemon=True)
+                self._supervisor.start()
+
+    def _supervise(self):
+        while True:
+            time.sleep(self.supervise_interval)
+            with self._lock:
+                for name, spec in list(self._specs.items()):
+                    if spec["auto_restart"]:
+                        self._check_restart(name, spec, time.time())
+
+    def _check_restart(self, name: str, spec: Dict[str, Any], now: float):
+        process = self.processes.get(name)
+        if process is not None and process.poll() is None:
+            return
+        if spec["next_restart"] is None:
+            spec["exit_code"] = process.returncode if process is not None else None
+            if spec["started_at"] is not None and now - spec["started_at"] >= self.stable_seconds:
+                spec["failures"] = 0 # It ran long enough to count as healthy
+            delay = min(self.restart_backoff_base * (2 ** spec["failures"]), self.restart_backoff_max)
+            spec["next_restart"] = now + delay
+            print(f"Process {name} exited with code {spec['exit_code']}; restarting in {delay:.0f}s.")
+        elif now >= spec["next_restart"]:
+            spec["failures"] += 1
+            spec["restarts"] += 1
+            if not self._spawn(name):
+                spec["started_at"] = None
+                spec["next_restart"] = None # Schedule the next attempt with a longer backoff
 
     def get_process_status(self, name: str) -> str:
-        if name not in self.processes:
-            return "NOT_FOUND"
-        if self.processes[name].poll() is None:
-            return "RUNNING"
-        return "STOPPED" # Process has terminated
+        with self._lock:
+            spec = self._specs.get(name)
+            if spec is not None and spec["next_restart"] is not None:
+                return "RESTARTING"
+            if name not in self.processes:
+                return "NOT_FOUND"
+            if self.processes[name].poll() is None:
+                return "PAUSED" if name in self._suspended else "RUNNING"
+            return "STOPPED" # Process has terminated
+
+    def get_process_info(self, name: str) -> Dict[str, Any]:
+        """Status plus supervision details: pid, uptime, restart count, last exit code."""
+        with self._lock:
+            spec = self._specs.get(name) or {}
+            process = self.processes.get(name)
+            running = process is not None and process.poll() is None
+            now = time.time()
+            next_restart = spec.get("next_restart")
+            return {
+                "status": self.get_process_status(name),
+                "pid": process.pid if running else None,
+                "uptime": round(now - spec["started_at"], 1) if running and spec.get("started_at") else None,
+                "restarts": spec.get("restarts", 0),
+                "auto_restart": spec.get("auto_restart", False),
+                "exit_code": spec.get("exit_code") if spec.get("exit_code") is not None else (process.returncode if process is not None else None),
+                "next_restart_in": round(max(next_restart - now, 0.0), 1) if next_restart else None,
+            }
 
     def get_process_output(self, name: str) -> tuple[str, str]:
-        if name not in self.processes:
+        """Returns the buffered (stdout, stderr) without waiting on the process."""
+        log = self.logs.get(name)
+        if log is None:
             return "", ""
-        stdout, stderr = self.processes[name].communicate() # Note: communicate blocks until process terminates
-        return stdout, stderr
+        return log.text("stdout"), log.text("stderr")
 
     def list_running_processes(self) -> Dict[str, int]:
         running = {}
-        for name, process in list(self.processes.items()): # Use list() to allow modification during iteration
-            if process.poll() is None:
-                running[name] = process.pid
-            else:
-                # Clean up processes that have terminated
-                del self.processes[name]
+        with self._lock:
+            for name, process in list(self.processes.items()): # Use list() to allow modification during iteration
+                if process.poll() is None:
+                    running[name] = process.pid
+                elif name not in self._specs or not self._specs[name]["auto_restart"]:
+                    # Clean up processes that have terminated (supervised ones are left for the supervisor)
+                    del self.processes[name]
         return running
 
 process_manager = ProcessManager() # Global instance for convenience